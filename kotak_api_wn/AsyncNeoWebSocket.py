@@ -0,0 +1,253 @@
+import asyncio
+
+from kotak_api_wn.exceptions import ApiValueError
+from kotak_api_wn.HSWebSocketLib import MAX_SCRIPS, SUBSCRIBE_PREFIXES, SNAPSHOT_PREFIXES, BinRespTypes, STAT, \
+    get_decoder, prepareConnectionRequest2, prepareSubsUnSubsRequest, prepareSnapshotRequest
+from kotak_api_wn.feed_format import FeedFormatter
+from kotak_api_wn.NeoWebSocket import json_loads
+from kotak_api_wn.settings import ReqTypeValues
+from kotak_api_wn.subscription_registry import SubscriptionRegistry
+from kotak_api_wn.urls import WEBSOCKET_URL
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AckSender:
+    """Lets the frame decoders send their acknowledgement frames on an aiohttp websocket."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.tasks = set()
+
+    def send(self, data, opcode=None):
+        task = asyncio.ensure_future(self.ws.send_bytes(data))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+
+class AsyncNeoWebSocket(FeedFormatter):
+    """
+    asyncio market-data feed over one HSM connection.
+
+    Frames are decoded by the same `HSWrapper` decoders as `NeoWebSocket`, on the event loop
+    instead of a socket thread. Subscribed feed items are yielded one by one:
+
+        async with AsyncNeoWebSocket(sid, session_token) as feed:
+            await feed.subscribe([{"instrument_token": "11536", "exchange_segment": "nse_cm"}])
+            async for tick in feed:
+                ...
+
+    Items go through a bounded queue of `max_queue` items. The reader never waits on it, because it
+    also resolves `quotes()` and connection acks, which a consumer may await from inside its
+    `async for` loop; when the queue is full its oldest item is dropped and counted in `dropped`.
+    """
+
+    def __init__(self, sid, token, decoder=None, output_mode=None, epoch_dates=False, tick_objects=False,
+                 max_queue=10000, url=WEBSOCKET_URL, session=None):
+        if aiohttp is None:
+            raise ImportError("AsyncNeoWebSocket requires aiohttp. Install with: pip install kotak_api_wn[async]")
+        self.sid = sid
+        self.access_token = token
+        self.url = url
+        self.tick_objects = tick_objects
+        self.wrapper = get_decoder(decoder, output_mode, epoch_dates, tick_objects)
+        self.subscriptions = SubscriptionRegistry()
+        self.quotes_index = None
+        self.max_queue = max_queue
+        self.queue = None
+        self.dropped = 0
+        self.session = session
+        self.own_session = session is None
+        self.ws = None
+        self.reader = None
+        self.connected = None
+        self.pending_quotes = {}
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self.queue.get()
+        if item is None:
+            # Put the end marker back so every other consumer stops too
+            self.queue.put_nowait(None)
+            raise StopAsyncIteration
+        return item
+
+    async def connect(self):
+        """Open the socket, authenticate and re-send every registered subscription."""
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        if self.queue is None:
+            self.queue = asyncio.Queue(self.max_queue)
+        self.ws = await self.session.ws_connect(self.url, ssl=False)
+        self.wrapper.ws = AckSender(self.ws)
+        self.connected = asyncio.get_running_loop().create_future()
+        self.reader = asyncio.ensure_future(self.read())
+        await self.ws.send_bytes(prepareConnectionRequest2(self.access_token, self.sid))
+        await self.connected
+        await self.send_subscriptions(self.subscriptions.channel_tokens(), BinRespTypes["SUBSCRIBE_TYPE"])
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+        if self.reader is not None:
+            await self.reader
+        if self.own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def read(self):
+        try:
+            async for msg in self.ws:
+                if msg.type == aiohttp.WSMsgType.BINARY:
+                    message = self.wrapper.parseData(msg.data)
+                elif msg.type == aiohttp.WSMsgType.TEXT:
+                    message = msg.data
+                else:
+                    break
+                if isinstance(message, str):
+                    self.handle_response(json_loads(message)[0])
+                elif message:
+                    self.dispatch(message)
+        finally:
+            if self.connected is not None and not self.connected.done():
+                self.connected.set_exception(ConnectionError("Market data connection closed before it was ready"))
+            for futures in self.pending_quotes.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(ConnectionError("Market data connection closed"))
+            self.pending_quotes = {}
+            # The end marker must not wait on a consumer that may already be gone
+            if self.queue.full():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+    def handle_response(self, response):
+        if response.get("type") == ReqTypeValues["CONNECTION"] and not self.connected.done():
+            if response.get("stat") == STAT["OK"]:
+                self.connected.set_result(True)
+            else:
+                self.connected.set_exception(ConnectionError("Market data connection failed: " +
+                                                             str(response.get("msg"))))
+
+    def dispatch(self, message):
+        tokens = self.subscriptions.tokens
+        for item in message:
+            token = self.get_message_token(item)
+            if self.pending_quotes and token in self.pending_quotes:
+                request_type = item.request_type if self.tick_objects else item.get('request_type')
+                if request_type == "SNAP":
+                    for future in self.pending_quotes.pop(token):
+                        if not future.done():
+                            future.set_result(item)
+            if token in tokens:
+                self.enqueue(item)
+
+    def enqueue(self, item):
+        if self.queue.full():
+            # A newer tick supersedes the oldest one waiting
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(item)
+
+    async def send_subscriptions(self, channel_tokens, request_type):
+        for channel, values in channel_tokens.items():
+            scrips_by_type = {}
+            for value in values:
+                scrips_by_type.setdefault(value["subscription_type"], []).append(
+                    value["exchange_segment"] + "|" + str(value["instrument_token"]))
+            for subscription_type, scrips in scrips_by_type.items():
+                prefix = SUBSCRIBE_PREFIXES[subscription_type]
+                for start in range(0, len(scrips), MAX_SCRIPS):
+                    await self.ws.send_bytes(prepareSubsUnSubsRequest("&".join(scrips[start:start + MAX_SCRIPS]),
+                                                                      request_type, prefix, channel))
+
+    def subscription_values(self, instrument_tokens, isIndex, isDepth):
+        if not self.input_validation(instrument_tokens):
+            raise ApiValueError("Invalid Inputs")
+        subscription_type = ReqTypeValues.get("SCRIP_SUBS")
+        if isIndex:
+            subscription_type = ReqTypeValues.get("INDEX_SUBS")
+        if isDepth:
+            subscription_type = ReqTypeValues.get("DEPTH_SUBS")
+        return [{'instrument_token': item['instrument_token'], 'exchange_segment': item['exchange_segment'],
+                 'subscription_type': subscription_type} for item in instrument_tokens]
+
+    async def subscribe(self, instrument_tokens, isIndex=False, isDepth=False):
+        """Subscribe to live feed; before `connect` the tokens are only registered and sent on connect."""
+        channel_tokens = {}
+        rejected = 0
+        for value in self.subscription_values(instrument_tokens, isIndex, isDepth):
+            if SubscriptionRegistry.key_of(value) in self.subscriptions:
+                continue
+            channel = self.subscriptions.add(value)
+            if channel is None:
+                rejected += 1
+            else:
+                channel_tokens.setdefault(channel, []).append(value)
+        if self.connected is not None and self.connected.done() and not self.ws.closed:
+            await self.send_subscriptions(channel_tokens, BinRespTypes["SUBSCRIBE_TYPE"])
+        if rejected:
+            raise ApiValueError("Subscription limit of " + str(SubscriptionRegistry.MAX_SUBSCRIPTIONS) +
+                                " reached, " + str(rejected) + " tokens were not subscribed")
+
+    async def unsubscribe(self, instrument_tokens, isIndex=False, isDepth=False):
+        channel_tokens = {}
+        for value in self.subscription_values(instrument_tokens, isIndex, isDepth):
+            channel = self.subscriptions.remove(SubscriptionRegistry.key_of(value))
+            if channel is not None:
+                channel_tokens.setdefault(channel, []).append(value)
+        if self.ws is not None and not self.ws.closed:
+            await self.send_subscriptions(channel_tokens, BinRespTypes["UNSUBSCRIBE_TYPE"])
+
+    async def quotes(self, instrument_tokens, quote_type=None, isIndex=False, timeout=10):
+        """Snapshot quotes for `instrument_tokens`, formatted like `NeoAPI.quotes` messages."""
+        if not self.quote_type_validation(quote_type):
+            raise ApiValueError("Quote Type which is given is not matching, expected one of "
+                                "market_depth, ohlc, ltp, 52w, circuit_limits, scrip_details")
+        if not self.input_validation(instrument_tokens):
+            raise ApiValueError("Invalid Inputs")
+        scrip_type = ReqTypeValues.get("SNAP_MW")
+        if isIndex:
+            scrip_type = ReqTypeValues.get("SNAP_IF")
+        elif quote_type and quote_type.strip().lower() == 'market_depth':
+            scrip_type = ReqTypeValues.get("SNAP_DP")
+
+        if self.ws is None or self.ws.closed:
+            raise ConnectionError("Market data connection is not open; call connect first")
+        loop = asyncio.get_running_loop()
+        futures = []
+        scrips = []
+        for item in instrument_tokens:
+            future = loop.create_future()
+            self.pending_quotes.setdefault(str(item['instrument_token']), []).append(future)
+            futures.append(future)
+            scrips.append(item['exchange_segment'] + "|" + str(item['instrument_token']))
+        try:
+            for start in range(0, len(scrips), MAX_SCRIPS):
+                await self.ws.send_bytes(prepareSnapshotRequest("&".join(scrips[start:start + MAX_SCRIPS]),
+                                                                BinRespTypes["SNAPSHOT"], SNAPSHOT_PREFIXES[scrip_type]))
+            items = await asyncio.wait_for(asyncio.gather(*futures), timeout)
+        finally:
+            # Futures of a failed send or timeout are cancelled so they are pruned with the answered ones
+            for future in futures:
+                future.cancel()
+            for token in {str(item['instrument_token']) for item in instrument_tokens}:
+                waiting = [future for future in self.pending_quotes.get(token, ()) if not future.done()]
+                if waiting:
+                    self.pending_quotes[token] = waiting
+                else:
+                    self.pending_quotes.pop(token, None)
+        self.quotes_index = isIndex
+        return self.response_format(items, quote_type=quote_type)
@@ -1,17 +1,26 @@
 import datetime
 import json
 import ssl
+import struct
+import sys
+from array import array
+from collections import namedtuple
+from functools import lru_cache
 
 import websocket
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 # from kotak_api_wn.logger import logger
 
 isEncyptOut = False
 isEncyptIn = True
 
 MAX_SCRIPS = 100
-topic_list = {}
-counter = 0
+DEFAULT_DECODER = "legacy"
 FieldTypes = {
     'FLOAT32': 1,
     'LONG': 2,
@@ -41,7 +50,6 @@ BinRespTypes = {
     "SNAPSHOT": 9,
     "OPC_SUBSCRIBE": 10
 }
-# ws = None
 BinRespStat = {
     "OK": "K",
     "NOT_OK": "N"
@@ -256,14 +264,31 @@ def getFormatDate(a):
     return formatDate
 
 
+UINT16 = struct.Struct('>H')
+INT32 = struct.Struct('>i')
+UINT32 = struct.Struct('>I')
+UINT64 = struct.Struct('>Q')
+
+
+def encode_string(d):
+    """Encode `d` one byte per character, as the frame builders have always written strings."""
+    return d.encode('latin-1')
+
+
 class ByteData:
+    """
+    Request frame builder over a preallocated bytearray.
+
+    Fixed-width fields are written with struct.pack_into and strings are copied in as one slice,
+    so building a frame no longer touches each byte through a Python list. Values are masked to
+    the field width first, which keeps the output identical to the old `(d >> n) & 255` writes.
+    """
     def __init__(self, c):
         self.pos = 0
-        self.bytes = [0] * (c)
+        self.bytes = bytearray(c)
         self.startOfMsg = 0
 
     def lenth(self):
-        # print("lenght of the bytes", self.bytes, len(self.bytes))
         pass
 
     def markStartOfMsg(self):
@@ -271,9 +296,7 @@ class ByteData:
         self.pos += 2
 
     def markEndOfMsg(self):
-        len = (self.pos - self.startOfMsg - 2)
-        self.bytes[0] = ((len >> 8) & 255)
-        self.bytes[1] = (len & 255)
+        UINT16.pack_into(self.bytes, 0, (self.pos - self.startOfMsg - 2) & 0xFFFF)
 
     def clear(self):
         self.pos = 0
@@ -282,14 +305,11 @@ class ByteData:
         return self.pos
 
     def getBytes(self):
-        return self.bytes
+        return bytes(self.bytes)
 
     def appendByte(self, d):
-        # print("in append Bytes POS", self.pos)
-        # print("in append Bytes d", d)
         self.bytes[self.pos] = d
         self.pos += 1
-        # print("in append Bytes", self.bytes)
 
     def appendByteAtPos(self, e, d):
         self.bytes[e] = d
@@ -302,83 +322,224 @@ class ByteData:
         self.bytes[e] = d
 
     def appendShort(self, d):
-        self.bytes[self.pos] = ((d >> 8) & 255)
-        self.pos += 1
-        self.bytes[self.pos] = (d & 255)
-        self.pos += 1
+        UINT16.pack_into(self.bytes, self.pos, d & 0xFFFF)
+        self.pos += 2
 
     def appendInt(self, d):
-        self.bytes[self.pos] = ((d >> 24) & 255)
-        self.pos += 1
-        self.bytes[self.pos] = ((d >> 16) & 255)
-        self.pos += 1
-        self.bytes[self.pos] = ((d >> 8) & 255)
-        self.pos += 1
-        self.bytes[self.pos] = (d & 255)
-        self.pos += 1
+        UINT32.pack_into(self.bytes, self.pos, d & 0xFFFFFFFF)
+        self.pos += 4
 
     def appendLong(self, d):
-        self.bytes[self.pos] = ((d >> 56) & 255)
-        self.pos += 1
-        self.bytes[self.pos] = ((d >> 48) & 255)
-        self.pos += 1
-        self.bytes[self.pos] = ((d >> 40) & 255)
-        self.pos += 1
-        self.bytes[self.pos] = ((d >> 32) & 255)
-        self.pos += 1
-        self.bytes[self.pos] = ((d >> 24) & 255)
-        self.pos += 1
-        self.bytes[self.pos] = ((d >> 16) & 255)
-        self.pos += 1
-        self.bytes[self.pos] = ((d >> 8) & 255)
-        self.pos += 1
-        self.bytes[self.pos] = (d & 255)
-        self.pos += 1
+        UINT64.pack_into(self.bytes, self.pos, d & 0xFFFFFFFFFFFFFFFF)
+        self.pos += 8
 
     def append_long_as_big_int(self, e):
-        d = int(e)
-        self.bytes.append((d >> 56) & 255)
-        self.bytes.append((d >> 48) & 255)
-        self.bytes.append((d >> 40) & 255)
-        self.bytes.append((d >> 32) & 255)
-        self.bytes.append((d >> 24) & 255)
-        self.bytes.append((d >> 16) & 255)
-        self.bytes.append((d >> 8) & 255)
-        self.bytes.append(d & 255)
+        self.bytes += UINT64.pack(int(e) & 0xFFFFFFFFFFFFFFFF)
 
     def append_string(self, d):
-        str_len = len(d)
-        for i in range(str_len):
-            self.bytes[self.pos] = ord(d[i])
-            self.pos += 1
-            # self.bytes.append(ord(d[i]))
+        self.append_byte_array(encode_string(d))
 
     def append_byte_array(self, d):
-        byte_len = len(d)
-        for i in range(byte_len):
-            self.bytes[self.pos] = d[i]
-            self.pos += 1
-            # self.bytes.append(d[i])
+        end = self.pos + len(d)
+        self.bytes[self.pos:end] = d
+        self.pos = end
 
     def appendByteArr(self, e, d):
-        for i in range(d):
-            self.bytes[self.pos] = e[i]
-            self.pos += 1
+        end = self.pos + d
+        self.bytes[self.pos:end] = e[:d]
+        self.pos = end
+
+
+FIELD_COUNT = 100
+_UNSET_FIELDS = array('q', [TRASH_VAL]) * FIELD_COUNT
+_CLEAN_FIELDS = bytes(FIELD_COUNT)
+_STRING_FIELDS = frozenset(range(STRING_INDEX["NAME"], STRING_INDEX["TSYMBOL"] + 1))
+
+# feed type -> (mapping, whether FLOAT32 fields are rendered with a fixed "{:.Nf}" format or round())
+FEED_MAPPINGS = {
+    TopicTypes["SCRIP"]: (SCRIP_MAPPING, True),
+    TopicTypes["INDEX"]: (INDEX_MAPPING, False),
+    TopicTypes["DEPTH"]: (DEPTH_MAPPING, False),
+}
+# "string": every value stringified (default), "numeric": native ints/floats,
+# "fixed": prices as ints scaled by 10 ** prec, with "prec" attached to every tick
+OutputModes = {
+    "STRING": "string",
+    "NUMERIC": "numeric",
+    "FIXED": "fixed"
+}
+DEFAULT_OUTPUT_MODE = OutputModes["STRING"]
+_precision_formats = {}
+_perchange_converters = {}
+_decoder_plans = {}
+
+
+def get_precision_format(precision):
+    """Return the cached bound `"{:.Nf}".format` for `precision`."""
+    fmt = _precision_formats.get(precision)
+    if fmt is None:
+        fmt = _precision_formats[precision] = ("{:." + str(precision) + "f}").format
+    return fmt
+
+
+def _same(val):
+    return val
+
+
+def _float_converter(fixed_format, output_mode, precision, multiplier, scale):
+    if output_mode == OutputModes["FIXED"]:
+        return lambda val: val // multiplier
+    if output_mode == OutputModes["NUMERIC"]:
+        return lambda val: round(val / scale, precision)
+    if fixed_format:
+        fmt = get_precision_format(precision)
+        return lambda val: fmt(val / scale)
+    return lambda val: str(round(val / scale, precision))
+
+
+def get_perchange_converter(feed_type, precision, output_mode=DEFAULT_OUTPUT_MODE):
+    """Return the cached converter applied to a derived percentage change before it is stored."""
+    key = (feed_type, precision, output_mode)
+    converter = _perchange_converters.get(key)
+    if converter is None:
+        if output_mode == OutputModes["FIXED"]:
+            converter = lambda val: int(round(val * 10 ** precision))
+        elif output_mode == OutputModes["NUMERIC"]:
+            converter = lambda val: round(val, precision)
+        elif FEED_MAPPINGS[feed_type][1]:
+            converter = get_precision_format(precision)
+        else:
+            converter = lambda val: round(val, precision)
+        converter = _perchange_converters[key] = converter
+    return converter
+
+
+def get_decoder_plan(feed_type, precision, multiplier, output_mode=DEFAULT_OUTPUT_MODE, epoch_dates=False):
+    """
+    Return the compiled decoder plan for a feed type at a given precision and multiplier.
+
+    A plan is a FIELD_COUNT long tuple holding `(index, name, converter)` for every field the
+    feed's mapping defines and None elsewhere, so prepareData can jump straight from a dirty
+    index to the converter instead of walking the whole mapping and re-checking field types.
+    Plans are shared by every topic with the same key.
+    """
+    key = (feed_type, precision, multiplier, output_mode, epoch_dates)
+    plan = _decoder_plans.get(key)
+    if plan is not None:
+        return plan
+    mapping, fixed_format = FEED_MAPPINGS[feed_type]
+    if precision is None or multiplier is None:
+        # Not known yet: FLOAT32 fields fail on use exactly like the unplanned division did
+        scale = None
+    else:
+        scale = multiplier * 10 ** precision
+    as_string = output_mode == OutputModes["STRING"]
+    if epoch_dates:
+        date_converter = str if as_string else int
+    else:
+        date_converter = getFormatDate
+    plan = [None] * FIELD_COUNT
+    for index, data_type in enumerate(mapping):
+        if data_type is None:
+            continue
+        if data_type["type"] == FieldTypes["FLOAT32"]:
+            converter = _float_converter(fixed_format, output_mode, precision, multiplier, scale)
+        elif data_type["type"] == FieldTypes["DATE"]:
+            converter = date_converter
+        elif data_type["type"] == FieldTypes["LONG"]:
+            converter = str if as_string else int
+        else:
+            converter = str if as_string else _same
+        plan[index] = (index, data_type["name"], converter)
+    plan = _decoder_plans[key] = tuple(plan)
+    return plan
+
+
+# Tick objects: one fixed attribute per field, (attribute, field index) in schema order.
+# Attributes are None until the field has been received; `request_type` is SNAP or SUB.
+SCRIP_TICK_FIELDS = (
+    ("instrument_token", STRING_INDEX["SYMBOL"]), ("exchange_segment", STRING_INDEX["EXCHG"]),
+    ("trading_symbol", STRING_INDEX["TSYMBOL"]), ("ltp", SCRIP_INDEX["LTP"]), ("ltq", 6), ("ltt", 3),
+    ("volume", SCRIP_INDEX["VOLUME"]), ("bid", 9), ("ask", 10), ("bid_qty", 11), ("ask_qty", 12),
+    ("total_buy_qty", 7), ("total_sell_qty", 8), ("avg_price", SCRIP_INDEX["VWAP"]), ("open", 20),
+    ("high", 15), ("low", 14), ("close", SCRIP_INDEX["CLOSE"]), ("change", SCRIP_INDEX["CHANGE"]),
+    ("per_change", SCRIP_INDEX["PERCHANGE"]), ("turnover", SCRIP_INDEX["TURNOVER"]), ("open_interest", 22),
+    ("lower_circuit", 16), ("upper_circuit", 17), ("year_high", 18), ("year_low", 19),
+    ("multiplier", SCRIP_INDEX["MULTIPLIER"]), ("precision", SCRIP_INDEX["PRECISION"]),
+    ("ftm0", 0), ("dtm1", 1), ("fdtm", 2)
+)
+INDEX_TICK_FIELDS = (
+    ("instrument_token", STRING_INDEX["SYMBOL"]), ("exchange_segment", STRING_INDEX["EXCHG"]),
+    ("trading_symbol", STRING_INDEX["TSYMBOL"]), ("ltp", INDEX_INDEX["LTP"]), ("open", 7), ("high", 5),
+    ("low", 6), ("close", INDEX_INDEX["CLOSE"]), ("change", INDEX_INDEX["CHANGE"]),
+    ("per_change", INDEX_INDEX["PERCHANGE"]), ("precision", INDEX_INDEX["PRECISION"]), ("tvalue", 4),
+    ("ftm0", 0), ("dtm1", 1)
+)
+DEPTH_TICK_FIELDS = (
+    (("instrument_token", STRING_INDEX["SYMBOL"]), ("exchange_segment", STRING_INDEX["EXCHG"]),
+     ("trading_symbol", STRING_INDEX["TSYMBOL"]))
+    + tuple(("bid_" + str(level + 1), 2 + level) for level in range(5))
+    + tuple(("ask_" + str(level + 1), 7 + level) for level in range(5))
+    + tuple(("bid_qty_" + str(level + 1), 12 + level) for level in range(5))
+    + tuple(("ask_qty_" + str(level + 1), 17 + level) for level in range(5))
+    + tuple(("bid_orders_" + str(level + 1), 22 + level) for level in range(5))
+    + tuple(("ask_orders_" + str(level + 1), 27 + level) for level in range(5))
+    + (("multiplier", DEPTH_INDEX["MULTIPLIER"]), ("precision", DEPTH_INDEX["PRECISION"]), ("ftm0", 0), ("dtm1", 1))
+)
+
+Tick = namedtuple("Tick", [name for name, _ in SCRIP_TICK_FIELDS] + ["request_type"])
+IndexTick = namedtuple("IndexTick", [name for name, _ in INDEX_TICK_FIELDS] + ["request_type"])
+DepthTick = namedtuple("DepthTick", [name for name, _ in DEPTH_TICK_FIELDS] + ["request_type"])
+
+
+def _tick_positions(tick_fields):
+    positions = [None] * FIELD_COUNT
+    for position, (_, index) in enumerate(tick_fields):
+        positions[index] = position
+    return tuple(positions)
+
+
+# feed type -> (tick class, field index -> attribute position)
+TICK_SCHEMAS = {
+    TopicTypes["SCRIP"]: (Tick, _tick_positions(SCRIP_TICK_FIELDS)),
+    TopicTypes["INDEX"]: (IndexTick, _tick_positions(INDEX_TICK_FIELDS)),
+    TopicTypes["DEPTH"]: (DepthTick, _tick_positions(DEPTH_TICK_FIELDS)),
+}
 
 
 class TopicData:
-    def __init__(self, feed_type):
+    """
+    Field store for one subscribed topic.
+
+    Long fields live in a preallocated array('q') where TRASH_VAL marks a field that was never
+    received, and the dirty flags in a bytearray that is cleared in place after every
+    prepareData, so a tick allocates nothing besides its output. String fields are kept in
+    slots; `perChange` holds the last derived percentage change, which is not an integer.
+    `plan` is the compiled decoder plan for the current precision/multiplier and output mode,
+    built on first use. With tick objects enabled, `tickValues` keeps the converted value of
+    every tick attribute so each tick only converts the fields that changed.
+    """
+    __slots__ = ('feedType', 'exchange', 'symbol', 'tSymbol', 'multiplier', 'precision', 'precisionValue',
+                 'perChange', 'plan', 'outputMode', 'epochDates', 'tickValues', 'fieldDataArray',
+                 'updatedFieldsArray')
+    PERCHANGE_INDEX = None
+
+    def __init__(self, feed_type, output_mode=DEFAULT_OUTPUT_MODE, epoch_dates=False, tick_objects=False):
         self.feedType = feed_type
+        self.outputMode = output_mode
+        self.epochDates = epoch_dates
+        # The trailing slot holds request_type
+        self.tickValues = [None] * len(TICK_SCHEMAS[feed_type][0]._fields) if tick_objects else None
         self.exchange = None
         self.symbol = None
         self.tSymbol = None
         self.multiplier = 1
         self.precision = 2
         self.precisionValue = 100
-        self.jsonArray = None
-        self.fieldDataArray = [None] * 100
-        self.updatedFieldsArray = [None] * 100
-        self.fieldDataArray[STRING_INDEX["NAME"]] = feed_type
+        self.perChange = None
+        self.plan = None
+        self.fieldDataArray = array('q', _UNSET_FIELDS)
+        self.updatedFieldsArray = bytearray(FIELD_COUNT)
 
     def getKey(self):
         return f"{self.exchange}|{self.symbol}"
@@ -386,31 +547,107 @@ class TopicData:
     def setLongValues(self, index_val, value):
         if self.fieldDataArray[index_val] != value and value != TRASH_VAL:
             self.fieldDataArray[index_val] = value
-            self.updatedFieldsArray[index_val] = True
+            self.updatedFieldsArray[index_val] = 1
+
+    def getFieldValue(self, index):
+        """Return the current value of field `index`, or None if it has never been set."""
+        if STRING_INDEX["NAME"] <= index <= STRING_INDEX["TSYMBOL"]:
+            return (self.feedType, self.symbol, self.exchange, self.tSymbol)[index - STRING_INDEX["NAME"]]
+        val = self.fieldDataArray[index]
+        if val == TRASH_VAL:
+            # A derived percentage change is parked outside the long array
+            return self.perChange if index == self.PERCHANGE_INDEX else None
+        return val
+
+    def setPerChange(self, value):
+        self.perChange = value
+        # Park the slot so the next value received for it always registers as a change
+        self.fieldDataArray[self.PERCHANGE_INDEX] = TRASH_VAL
+        self.updatedFieldsArray[self.PERCHANGE_INDEX] = 1
+
+    def clearUpdatedFields(self):
+        self.updatedFieldsArray[:] = _CLEAN_FIELDS
+
+    def getDecoderPlan(self):
+        plan = self.plan
+        if plan is None:
+            plan = self.plan = get_decoder_plan(self.feedType, self.precision, self.multiplier,
+                                                self.outputMode, self.epochDates)
+        return plan
+
+    def getPerChange(self, change, close):
+        converter = get_perchange_converter(self.feedType, self.precision, self.outputMode)
+        return converter(change / close * 100)
+
+    def emitUpdatedFields(self, type=None):
+        """Convert the dirty fields through the decoder plan, in index order, and clear the flags."""
+        if self.tickValues is not None:
+            return self.emitTick(type)
+        plan = self.getDecoderPlan()
+        fields = self.fieldDataArray
+        updated = self.updatedFieldsArray
+        json_res = {}
+        index = updated.find(1)
+        while index != -1:
+            entry = plan[index]
+            if entry is not None:
+                val = fields[index]
+                if val == TRASH_VAL or index in _STRING_FIELDS:
+                    val = self.getFieldValue(index)
+                if val is not None:
+                    json_res[entry[1]] = entry[2](val)
+            index = updated.find(1, index + 1)
+        self.clearUpdatedFields()
+        if self.outputMode == OutputModes["FIXED"]:
+            json_res["prec"] = self.precision
+        if type is not None:
+            json_res["request_type"] = type
+
+        return json_res
+
+    def emitTick(self, type=None):
+        """Fold the dirty fields into the topic's tick values and return them as a new tick object."""
+        tick_cls, positions = TICK_SCHEMAS[self.feedType]
+        plan = self.getDecoderPlan()
+        fields = self.fieldDataArray
+        updated = self.updatedFieldsArray
+        values = self.tickValues
+        index = updated.find(1)
+        while index != -1:
+            entry = plan[index]
+            position = positions[index]
+            if entry is not None and position is not None:
+                val = fields[index]
+                if val == TRASH_VAL or index in _STRING_FIELDS:
+                    val = self.getFieldValue(index)
+                if val is not None:
+                    values[position] = entry[2](val)
+            index = updated.find(1, index + 1)
+        self.clearUpdatedFields()
+        values[-1] = type
+        return tick_cls._make(values)
 
     def prepareCommonData(self):
-        self.updatedFieldsArray[STRING_INDEX["NAME"]] = True
-        self.updatedFieldsArray[STRING_INDEX["EXCHG"]] = True
-        self.updatedFieldsArray[STRING_INDEX["SYMBOL"]] = True
+        self.updatedFieldsArray[STRING_INDEX["NAME"]] = 1
+        self.updatedFieldsArray[STRING_INDEX["EXCHG"]] = 1
+        self.updatedFieldsArray[STRING_INDEX["SYMBOL"]] = 1
 
     def setStringValues(self, e, d):
         if e == STRING_INDEX["SYMBOL"]:
             self.symbol = d
-            self.fieldDataArray[STRING_INDEX["SYMBOL"]] = d
         elif e == STRING_INDEX["EXCHG"]:
             self.exchange = d
-            self.fieldDataArray[STRING_INDEX["EXCHG"]] = d
         elif e == STRING_INDEX["TSYMBOL"]:
             self.tSymbol = d
-            self.fieldDataArray[STRING_INDEX["TSYMBOL"]] = d
-            self.updatedFieldsArray[STRING_INDEX["TSYMBOL"]] = True
+            self.updatedFieldsArray[STRING_INDEX["TSYMBOL"]] = 1
 
 
 class DepthTopicData(TopicData):
-    def __init__(self):
+    __slots__ = ()
+
+    def __init__(self, output_mode=DEFAULT_OUTPUT_MODE, epoch_dates=False, tick_objects=False):
         # print("INSIDE DepthTopicData")
-        super().__init__(TopicTypes["DEPTH"])
-        self.updatedFieldsArray = [None] * 100
+        super().__init__(TopicTypes["DEPTH"], output_mode, epoch_dates, tick_objects)
         self.multiplier = None
         self.precision = None
         self.precisionValue = None
@@ -422,32 +659,17 @@ class DepthTopicData(TopicData):
             self.precisionValue = 10 ** self.precision
         if self.updatedFieldsArray[DEPTH_INDEX['MULTIPLIER']]:
             self.multiplier = self.fieldDataArray[DEPTH_INDEX['MULTIPLIER']]
+        self.plan = None
 
     def prepareData(self, type=None):
         # print("INSIDE prepareData")
         self.prepareCommonData()
         # print("\nDepth:", self.feedType, self.exchange, self.symbol)
-        json_res = {}
-        for d in range(len(DEPTH_MAPPING)):
-            c = DEPTH_MAPPING[d]
-            e = self.fieldDataArray[d]
-            if self.updatedFieldsArray[d] and e is not None and c:
-                if c["type"] == FieldTypes.get("FLOAT32"):
-                    e = round(e / (self.multiplier * self.precisionValue), self.precision)
-                elif c["type"] == FieldTypes.get("DATE"):
-                    e = getFormatDate(e)
-                # print(d, ":", c["name"], ":", e)
-                json_res[c["name"]] = str(e)
-        self.updatedFieldsArray = [None] * 100
-        # print("INSIDE Parse Data", json_res)
-        if type is not None:
-            json_res["request_type"] = type
-
-        return json_res
+        return self.emitUpdatedFields(type)
 
 
 def get_acknowledgement_req(a):
-    buffer = ByteData(11) #bytearray(11)
+    buffer = ByteData(11)
     buffer.markStartOfMsg()
     buffer.appendByte(BinRespTypes["ACK_TYPE"])
     buffer.appendByte(1)
@@ -508,32 +730,27 @@ def is_scrip_ok(a):
     return True
 
 
+SCRIP_SEGMENT_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=SCRIP_SEGMENT_CACHE_SIZE)
+def encode_scrip_segment(prefix, scrip):
+    """
+    Return the `[1B len][prefix|segment|token]` bytes for one scrip of a request frame.
+
+    Watchlists are stable, so the same scrips are encoded again on every re-subscribe after a
+    reconnect and on every quotes snapshot; a bounded LRU keeps the encoded segments instead.
+    """
+    data = encode_string(prefix + "|" + scrip)
+    return bytes((len(data) & 255,)) + data
+
+
 def getScripByteArray(c, a):
+    """Encode `"seg|token&seg|token"` as [2B count] followed by the cached segment of each scrip."""
     if c[-1] == "&":
         c = c[:-1]
     scripArray = c.split("&")
-    scripsCount = len(scripArray)
-    dataLen = 0
-    for index in range(scripsCount):
-        scripArray[index] = a + "|" + scripArray[index]
-        dataLen += len(scripArray[index]) + 1
-    # print("Data len ", dataLen)
-    bytes = [0] * (dataLen + 2)
-    pos = 0
-    bytes[pos] = (scripsCount >> 8) & 255
-    pos += 1
-    bytes[pos] = scripsCount & 255
-    pos += 1
-    for index in range(scripsCount):
-        currScrip = scripArray[index]
-        scripLen = len(currScrip)
-        bytes[pos] = scripLen & 255
-        pos += 1
-        for strIndex in range(scripLen):
-            bytes[pos] = ord(currScrip[strIndex])
-            pos += 1
-    # print("Bytes ", bytes)
-    return bytes
+    return UINT16.pack(len(scripArray) & 0xFFFF) + b"".join([encode_scrip_segment(a, scrip) for scrip in scripArray])
 
 
 def prepareSubsUnSubsRequest(scrips, subscribe_type, scrip_prefix, channel_num):
@@ -542,8 +759,6 @@ def prepareSubsUnSubsRequest(scrips, subscribe_type, scrip_prefix, channel_num):
         return
 
     dataArr = getScripByteArray(scrips, scrip_prefix)
-    # print("Length Arr", dataArr)
-    # buffer = [0] * (len(dataArr) + 11) #ByteData(len(dataArr) + 11)
     buffer = ByteData(len(dataArr) + 11)
     buffer.markStartOfMsg()
     buffer.appendByte(subscribe_type)
@@ -609,29 +824,7 @@ def prepareThrottlingIntervalRequest(a):
 
 
 def get_scrip_byte_array(c, a):
-    if c[-1] == "&":
-        c = c[:-1]
-    scrip_array = c.split("&")
-    scrips_count = len(scrip_array)
-    data_len = 0
-    for index in range(scrips_count):
-        scrip_array[index] = a + "|" + scrip_array[index]
-        data_len += len(scrip_array[index]) + 1
-    bytes = bytearray(data_len + 2)
-    pos = 0
-    bytes[pos] = (scrips_count >> 8) & 255
-    pos += 1
-    bytes[pos] = scrips_count & 255
-    pos += 1
-    for index in range(scrips_count):
-        curr_scrip = scrip_array[index]
-        scrip_len = len(curr_scrip)
-        bytes[pos] = scrip_len & 255
-        pos += 1
-        for str_index in range(scrip_len):
-            bytes[pos] = ord(curr_scrip[str_index])
-            pos += 1
-    return bytes
+    return getScripByteArray(c, a)
 
 
 def get_opc_chain_subs_request(d, e, a, c, f):
@@ -717,14 +910,40 @@ def buf2long(a):
     return val if val < 2 ** 31 else val - 2 ** 32
 
 
+INTERN_MAX_LEN = 64
+INTERN_CACHE_SIZE = 16384
+_interned_strings = {}
+
+
 def buf2string(a):
-    import numpy as np
-    return ''.join(map(chr, np.frombuffer(a, dtype=np.uint8)))
+    """
+    Decode a latin-1 field (bytes, bytearray or memoryview slice) without copying it per char.
+
+    Short values such as topic names, exchange segments and symbols repeat on every SNAP, so
+    they are interned and served from a bytes -> str cache on later frames.
+    """
+    if len(a) > INTERN_MAX_LEN:
+        return str(a, 'latin-1')
+    try:
+        val = _interned_strings.get(a)
+    except (TypeError, ValueError):
+        # bytearray and writable memoryviews are not hashable
+        a = bytes(a)
+        val = _interned_strings.get(a)
+    if val is None:
+        val = sys.intern(str(a, 'latin-1'))
+        if len(_interned_strings) >= INTERN_CACHE_SIZE:
+            _interned_strings.clear()
+        _interned_strings[bytes(a)] = val
+    return val
 
 
 class ScripTopicData(TopicData):
-    def __init__(self):
-        super().__init__(TopicTypes["SCRIP"])
+    __slots__ = ()
+    PERCHANGE_INDEX = SCRIP_INDEX["PERCHANGE"]
+
+    def __init__(self, output_mode=DEFAULT_OUTPUT_MODE, epoch_dates=False, tick_objects=False):
+        super().__init__(TopicTypes["SCRIP"], output_mode, epoch_dates, tick_objects)
         # print("After topic")
         self.precision = None
         self.precisionValue = None
@@ -736,52 +955,37 @@ class ScripTopicData(TopicData):
             self.precisionValue = pow(10, self.precision)
         if self.updatedFieldsArray[SCRIP_INDEX["MULTIPLIER"]]:
             self.multiplier = self.fieldDataArray[SCRIP_INDEX["MULTIPLIER"]]
+        self.plan = None
 
     def prepareData(self,type=None):
         self.prepareCommonData()
-        #hardcoded formatting is removed and made it dynamic
-        precesionFormat="{:."+str(self.precision)+"f}"
-        if self.updatedFieldsArray[SCRIP_INDEX["LTP"]] or self.updatedFieldsArray[SCRIP_INDEX["CLOSE"]]:
-            ltp = self.fieldDataArray[SCRIP_INDEX["LTP"]]
-            close = self.fieldDataArray[SCRIP_INDEX["CLOSE"]]
-            if ltp is not None and close is not None:
+        fields = self.fieldDataArray
+        updated = self.updatedFieldsArray
+        if updated[SCRIP_INDEX["LTP"]] or updated[SCRIP_INDEX["CLOSE"]]:
+            ltp = fields[SCRIP_INDEX["LTP"]]
+            close = fields[SCRIP_INDEX["CLOSE"]]
+            if ltp != TRASH_VAL and close != TRASH_VAL:
                 change = ltp - close
-                self.fieldDataArray[SCRIP_INDEX["CHANGE"]] = change
-                self.updatedFieldsArray[SCRIP_INDEX["CHANGE"]] = True
-                self.fieldDataArray[SCRIP_INDEX["PERCHANGE"]] = precesionFormat.format((change / close * 100))
-                self.updatedFieldsArray[SCRIP_INDEX["PERCHANGE"]] = True
-        if self.updatedFieldsArray[SCRIP_INDEX["VOLUME"]] or self.updatedFieldsArray[SCRIP_INDEX["VWAP"]]:
-            volume = self.fieldDataArray[SCRIP_INDEX["VOLUME"]]
-            vwap = self.fieldDataArray[SCRIP_INDEX["VWAP"]]
-            if volume is not None and vwap is not None:
-                self.fieldDataArray[SCRIP_INDEX["TURNOVER"]] = volume * vwap
-                self.updatedFieldsArray[SCRIP_INDEX["TURNOVER"]] = True
+                fields[SCRIP_INDEX["CHANGE"]] = change
+                updated[SCRIP_INDEX["CHANGE"]] = 1
+                self.setPerChange(self.getPerChange(change, close))
+        if updated[SCRIP_INDEX["VOLUME"]] or updated[SCRIP_INDEX["VWAP"]]:
+            volume = fields[SCRIP_INDEX["VOLUME"]]
+            vwap = fields[SCRIP_INDEX["VWAP"]]
+            if volume != TRASH_VAL and vwap != TRASH_VAL:
+                fields[SCRIP_INDEX["TURNOVER"]] = volume * vwap
+                updated[SCRIP_INDEX["TURNOVER"]] = 1
         # print("\nScrip::" + self.feedType + "|" + self.exchange + "|" + self.symbol)
-        jsonRes = {}
-        for index in range(len(SCRIP_MAPPING)):
-            dataType = SCRIP_MAPPING[index]
-            val = self.fieldDataArray[index]
-            if self.updatedFieldsArray[index] and val is not None and dataType:
-                if dataType["type"] == FieldTypes["FLOAT32"]:
-                   
-                    val = precesionFormat.format(val / (self.multiplier * self.precisionValue))
-                    # val = "{:.4f}".format(val / (self.multiplier * self.precisionValue))
-                elif dataType["type"] == FieldTypes["DATE"]:
-                    val = getFormatDate(val)
-                # print(str(index) + ":" + dataType["name"] + ":" + str(val))
-                jsonRes[dataType["name"]] = str(val)
-        self.updatedFieldsArray = [None] * 100
-        if type is not None:
-            jsonRes["request_type"]=type
-        
-        return jsonRes
+        return self.emitUpdatedFields(type)
 
 
 class IndexTopicData(TopicData):
-    def __init__(self):
+    __slots__ = ()
+    PERCHANGE_INDEX = INDEX_INDEX["PERCHANGE"]
+
+    def __init__(self, output_mode=DEFAULT_OUTPUT_MODE, epoch_dates=False, tick_objects=False):
         # print("INSIDE IndexTopicData")
-        super().__init__(TopicTypes["INDEX"])
-        self.updatedFieldsArray = [None] * 100
+        super().__init__(TopicTypes["INDEX"], output_mode, epoch_dates, tick_objects)
         self.multiplier = None
         self.precision = None
         self.precisionValue = None
@@ -792,54 +996,47 @@ class IndexTopicData(TopicData):
             self.precisionValue = 10 ** self.precision
         if self.updatedFieldsArray[INDEX_INDEX["MULTIPLIER"]]:
             self.multiplier = self.fieldDataArray[INDEX_INDEX["MULTIPLIER"]]
+        self.plan = None
 
     def prepareData(self, type=None):
         self.prepareCommonData()
-        if self.updatedFieldsArray[INDEX_INDEX["LTP"]] or self.updatedFieldsArray[INDEX_INDEX["CLOSE"]]:
-            ltp = self.fieldDataArray[INDEX_INDEX["LTP"]]
-            close = self.fieldDataArray[INDEX_INDEX["CLOSE"]]
-            if ltp is not None and close is not None:
+        fields = self.fieldDataArray
+        updated = self.updatedFieldsArray
+        if updated[INDEX_INDEX["LTP"]] or updated[INDEX_INDEX["CLOSE"]]:
+            ltp = fields[INDEX_INDEX["LTP"]]
+            close = fields[INDEX_INDEX["CLOSE"]]
+            if ltp != TRASH_VAL and close != TRASH_VAL:
                 change = ltp - close
-                self.fieldDataArray[INDEX_INDEX["CHANGE"]] = change
-                self.updatedFieldsArray[INDEX_INDEX["CHANGE"]] = True
-                per_change = round(change / close * 100, self.precision)
-                self.fieldDataArray[INDEX_INDEX["PERCHANGE"]] = per_change
-                self.updatedFieldsArray[INDEX_INDEX["PERCHANGE"]] = True
+                fields[INDEX_INDEX["CHANGE"]] = change
+                updated[INDEX_INDEX["CHANGE"]] = 1
+                self.setPerChange(self.getPerChange(change, close))
         # print("\nIndex::" + self.feedType + "|" + self.exchange + "|" + self.symbol)
-        json_res = {}
-        for index in range(len(INDEX_MAPPING)):
-            data_type = INDEX_MAPPING[index]
-            val = self.fieldDataArray[index]
-            if self.updatedFieldsArray[index] and val is not None and data_type is not None:
-                if data_type["type"] == FieldTypes["FLOAT32"]:
-                    val = round(val / (self.multiplier * self.precisionValue), self.precision)
-                elif data_type["type"] == FieldTypes["DATE"]:
-                    val = getFormatDate(val)
-                # print(str(index) + ":" + data_type["name"] + ":" + str(val))
-                json_res[data_type["name"]] = str(val)
-        self.updatedFieldsArray = [None] * 100
-        if type is not None:
-            json_res["request_type"] = type
-
-        return json_res
+        return self.emitUpdatedFields(type)
 
 
 class HSWrapper:
-    def __init__(self):
+    def __init__(self, output_mode=None, epoch_dates=False, tick_objects=False):
         self.counter = 0
         self.ack_num = 0
+        # Topic ids are assigned per connection, so each wrapper keeps its own table and socket
+        self.topic_list = {}
+        self.ws = None
+        # Tick objects are typed, so they default to native numbers rather than strings
+        self.output_mode = output_mode or (OutputModes["NUMERIC"] if tick_objects else DEFAULT_OUTPUT_MODE)
+        self.epoch_dates = epoch_dates
+        self.tick_objects = tick_objects
 
     def getNewTopicData(self, c):
         # print("INPUT ", c)
         feed_type, *_ = c.split("|")
         topic = None
         if feed_type == TopicTypes.get("SCRIP"):
-            topic = ScripTopicData()
+            topic = ScripTopicData(self.output_mode, self.epoch_dates, self.tick_objects)
         elif feed_type == TopicTypes.get("INDEX"):
             # print("INTO FEED TYPE index")
-            topic = IndexTopicData()
+            topic = IndexTopicData(self.output_mode, self.epoch_dates, self.tick_objects)
         elif feed_type == TopicTypes.get("DEPTH"):
-            topic = DepthTopicData()
+            topic = DepthTopicData(self.output_mode, self.epoch_dates, self.tick_objects)
         return topic
 
     def getStatus(self, c, d):
@@ -928,8 +1125,8 @@ class HSWrapper:
                     pos += 4
                     if self.counter == self.ack_num:
                         req = get_acknowledgement_req(msg_num)
-                        if ws:
-                            ws.send(req, 0x2)
+                        if self.ws:
+                            self.ws.send(req, 0x2)
                             self.counter = 0
                         # print("Acknowledgement sent for message num:", msg_num)
                 h = []
@@ -952,7 +1149,7 @@ class HSWrapper:
                         pos += name_len
                         d = self.getNewTopicData(topic_name)
                         if d:
-                            topic_list[f] = d
+                            self.topic_list[f] = d
                             fcount = buf2long(e[pos: pos + 1])
                             pos += 1
                             for index in range(fcount):
@@ -983,7 +1180,7 @@ class HSWrapper:
                             f = buf2long(e[pos: pos + 4])
                             # print("topic Id:", f)
                             pos += 4
-                            d = topic_list[f]
+                            d = self.topic_list[f]
                             if not d:
                                 print("Topic Not Available in TopicList!")
                             else:
@@ -1099,8 +1296,267 @@ class HSWrapper:
                         return None
 
 
+_int32_blocks = {}
+
+
+def int32_block(count):
+    """Return a cached struct.Struct that unpacks `count` big-endian int32 fields in one call."""
+    unpacker = _int32_blocks.get(count)
+    if unpacker is None:
+        unpacker = _int32_blocks[count] = struct.Struct('>' + str(count) + 'i')
+    return unpacker
+
+
+# Columns of a FeedBatch: name -> {feed type: field index}; feeds without the field leave it missing
+BATCH_PRICE_COLUMNS = {
+    "ltp": {TopicTypes["SCRIP"]: SCRIP_INDEX["LTP"], TopicTypes["INDEX"]: INDEX_INDEX["LTP"]},
+    "close": {TopicTypes["SCRIP"]: SCRIP_INDEX["CLOSE"], TopicTypes["INDEX"]: INDEX_INDEX["CLOSE"]},
+    "bid": {TopicTypes["SCRIP"]: 9, TopicTypes["DEPTH"]: 2},
+    "ask": {TopicTypes["SCRIP"]: 10, TopicTypes["DEPTH"]: 7},
+}
+BATCH_INT_COLUMNS = {
+    "volume": {TopicTypes["SCRIP"]: SCRIP_INDEX["VOLUME"]},
+    "bid_qty": {TopicTypes["SCRIP"]: 11, TopicTypes["DEPTH"]: 12},
+    "ask_qty": {TopicTypes["SCRIP"]: 12, TopicTypes["DEPTH"]: 17},
+    "ltt": {TopicTypes["SCRIP"]: 3, TopicTypes["INDEX"]: 4, TopicTypes["DEPTH"]: 0},
+}
+# feed type -> field index per column (price columns first), -1 where the feed has no such field
+_BATCH_INDICES = {
+    feed_type: tuple(columns.get(feed_type, -1)
+                     for columns in list(BATCH_PRICE_COLUMNS.values()) + list(BATCH_INT_COLUMNS.values()))
+    for feed_type in TopicTypes.values()
+}
+
+
+class FeedBatch:
+    """
+    Struct-of-arrays view of the feed rows decoded from one frame, one row per SNAP/UPDATE packet.
+
+    `feed_types`, `tokens`, `exchanges` and `request_types` are lists. Price columns (ltp, close,
+    bid, ask) are float64 already divided by multiplier * 10 ** precision, NaN when missing.
+    Integer columns (volume, bid_qty, ask_qty, ltt) are int64 with TRASH_VAL marking a missing
+    value; ltt is in epoch seconds. Columns are NumPy arrays when numpy is installed and
+    array('d') / array('q') otherwise. `as_dict()` can be handed to pyarrow.table or pandas.
+    """
+    __slots__ = ('feed_types', 'tokens', 'exchanges', 'request_types') + tuple(BATCH_PRICE_COLUMNS) + \
+                tuple(BATCH_INT_COLUMNS)
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class FeedBatchBuilder:
+    """Collects a copy of each decoded topic's field array while a frame is parsed."""
+    __slots__ = ('feed_types', 'tokens', 'exchanges', 'request_types', 'scales', 'blocks')
+
+    def __init__(self):
+        self.feed_types = []
+        self.tokens = []
+        self.exchanges = []
+        self.request_types = []
+        self.scales = []
+        self.blocks = []
+
+    def add(self, d, request_type):
+        self.feed_types.append(d.feedType)
+        self.tokens.append(d.symbol)
+        self.exchanges.append(d.exchange)
+        self.request_types.append(request_type)
+        if d.multiplier is None or d.precisionValue is None:
+            self.scales.append(float("nan"))
+        else:
+            self.scales.append(d.multiplier * d.precisionValue)
+        self.blocks.append(d.fieldDataArray.tobytes())
+
+    def build(self):
+        batch = FeedBatch()
+        batch.feed_types = self.feed_types
+        batch.tokens = self.tokens
+        batch.exchanges = self.exchanges
+        batch.request_types = self.request_types
+        indices = [_BATCH_INDICES[feed_type] for feed_type in self.feed_types]
+        price_count = len(BATCH_PRICE_COLUMNS)
+        if np is not None:
+            # One gather for every column of every row straight out of the field arrays
+            raw = np.frombuffer(b"".join(self.blocks), dtype=np.int64).reshape(len(self.blocks), FIELD_COUNT)
+            index_matrix = np.array(indices, dtype=np.intp)
+            values = raw[np.arange(len(self.blocks))[:, None], index_matrix]
+            missing = (index_matrix < 0) | (values == TRASH_VAL)
+            scales = np.array(self.scales, dtype=np.float64)[:, None]
+            prices = np.where(missing[:, :price_count], np.nan, values[:, :price_count] / scales)
+            ints = np.where(missing[:, price_count:], TRASH_VAL, values[:, price_count:])
+            for column, name in enumerate(BATCH_PRICE_COLUMNS):
+                setattr(batch, name, np.ascontiguousarray(prices[:, column]))
+            for column, name in enumerate(BATCH_INT_COLUMNS):
+                setattr(batch, name, np.ascontiguousarray(ints[:, column]))
+            return batch
+        price_columns = [array('d') for _ in BATCH_PRICE_COLUMNS]
+        int_columns = [array('q') for _ in BATCH_INT_COLUMNS]
+        for row_indices, scale, block in zip(indices, self.scales, self.blocks):
+            fields = array('q')
+            fields.frombytes(block)
+            for column, index in enumerate(row_indices):
+                val = fields[index] if index >= 0 else TRASH_VAL
+                if column < price_count:
+                    price_columns[column].append(float("nan") if val == TRASH_VAL else val / scale)
+                else:
+                    int_columns[column - price_count].append(val)
+        for name, values in zip(BATCH_PRICE_COLUMNS, price_columns):
+            setattr(batch, name, values)
+        for name, values in zip(BATCH_INT_COLUMNS, int_columns):
+            setattr(batch, name, values)
+        return batch
+
+
+class StructHSWrapper(HSWrapper):
+    """
+    Drop-in HSWrapper that decodes DATA frames from a single memoryview.
+
+    Field blocks are read with precompiled struct unpackers instead of slicing every field
+    into a new bytes object and folding it through buf2long. Output is identical to
+    HSWrapper.parseData; control frames (connection, subscribe acks, ...) are rare and are
+    handed to the legacy path unchanged.
+
+    With `batch_handler` set, every data packet of a frame is also collected into one
+    FeedBatch passed to the handler, and UPDATE packets skip per-topic dict output.
+    """
+    batch_handler = None
+
+    def setFieldBlock(self, topic_id, d, mv, pos, fcount):
+        for index, fvalue in enumerate(int32_block(fcount).unpack_from(mv, pos)):
+            d.setLongValues(index, fvalue)
+
+    def parseData(self, e):
+        if len(e) < 3 or e[2] != BinRespTypes["DATA_TYPE"]:
+            return super().parseData(e)
+        mv = memoryview(e)
+        pos = 3
+        if self.ack_num > 0:
+            self.counter += 1
+            msg_num = INT32.unpack_from(mv, pos)[0]
+            pos += 4
+            if self.counter == self.ack_num:
+                req = get_acknowledgement_req(msg_num)
+                if self.ws:
+                    self.ws.send(req, 0x2)
+                    self.counter = 0
+        h = []
+        batch = FeedBatchBuilder() if self.batch_handler is not None else None
+        g = UINT16.unpack_from(mv, pos)[0]
+        pos += 2
+        for n in range(g):
+            pos += 2
+            c = mv[pos]
+            pos += 1
+            if c == ResponseTypes["SNAP"]:
+                f = INT32.unpack_from(mv, pos)[0]
+                pos += 4
+                name_len = mv[pos]
+                pos += 1
+                topic_name = buf2string(mv[pos:pos + name_len])
+                pos += name_len
+                d = self.getNewTopicData(topic_name)
+                if d:
+                    self.topic_list[f] = d
+                    fcount = mv[pos]
+                    pos += 1
+                    self.setFieldBlock(f, d, mv, pos, fcount)
+                    pos += 4 * fcount
+                    d.setMultiplierAndPrec()
+                    fcount = mv[pos]
+                    pos += 1
+                    for index in range(fcount):
+                        fid = mv[pos]
+                        data_len = mv[pos + 1]
+                        pos += 2
+                        d.setStringValues(fid, buf2string(mv[pos:pos + data_len]))
+                        pos += data_len
+                    if batch is not None:
+                        batch.add(d, "SNAP")
+                    h.append(d.prepareData("SNAP"))
+                else:
+                    print("Invalid topic feed type !")
+            elif c == ResponseTypes["UPDATE"]:
+                f = INT32.unpack_from(mv, pos)[0]
+                pos += 4
+                d = self.topic_list[f]
+                if not d:
+                    print("Topic Not Available in TopicList!")
+                else:
+                    fcount = mv[pos]
+                    pos += 1
+                    self.setFieldBlock(f, d, mv, pos, fcount)
+                    pos += 4 * fcount
+                if batch is not None:
+                    batch.add(d, "SUB")
+                    d.clearUpdatedFields()
+                else:
+                    h.append(d.prepareData("SUB"))
+            else:
+                print("Invalid ResponseType: " + str(c))
+        if batch is not None and batch.blocks:
+            self.batch_handler(batch.build())
+        return h
+
+
+class NumpyHSWrapper(StructHSWrapper):
+    """
+    StructHSWrapper that applies each field block as one vectorized step.
+
+    The block is viewed in place as big-endian int32 and compared against zero-copy views of
+    the topic's field array and dirty flags; TRASH_VAL and unchanged fields are masked out
+    and the rest is written and flagged for prepareData without a per-field Python loop.
+    """
+
+    def __init__(self, output_mode=None, epoch_dates=False, tick_objects=False):
+        super().__init__(output_mode, epoch_dates, tick_objects)
+        self.topic_views = {}
+
+    def setFieldBlock(self, topic_id, d, mv, pos, fcount):
+        views = self.topic_views.get(topic_id)
+        if views is None or views[2] is not d:
+            # New or re-snapped topic
+            views = self.topic_views[topic_id] = (np.frombuffer(d.fieldDataArray, dtype=np.int64),
+                                                  np.frombuffer(d.updatedFieldsArray, dtype=np.uint8), d)
+        current = views[0][:fcount]
+        block = np.frombuffer(mv, dtype='>i4', count=fcount, offset=pos)
+        changed = (block != TRASH_VAL) & (block != current)
+        np.copyto(current, block, where=changed)
+        updated = views[1][:fcount]
+        updated |= changed
+
+
+DECODERS = {
+    "legacy": HSWrapper,
+    "struct": StructHSWrapper
+}
+if np is not None:
+    DECODERS["numpy"] = NumpyHSWrapper
+
+
+def get_decoder(name=None, output_mode=None, epoch_dates=False, tick_objects=False, on_batch=None):
+    if on_batch is not None and not name:
+        name = "numpy" if "numpy" in DECODERS else "struct"
+    name = name or DEFAULT_DECODER
+    if name not in DECODERS:
+        raise ValueError("Unknown decoder '" + str(name) + "', expected one of " + ", ".join(DECODERS))
+    if output_mode is not None and output_mode not in OutputModes.values():
+        raise ValueError("Unknown output mode '" + str(output_mode) + "', expected one of " +
+                         ", ".join(OutputModes.values()))
+    wrapper = DECODERS[name](output_mode, epoch_dates, tick_objects)
+    if on_batch is not None:
+        if not isinstance(wrapper, StructHSWrapper):
+            raise ValueError("Decoder '" + name + "' does not support on_batch, use 'struct' or 'numpy'")
+        wrapper.batch_handler = on_batch
+    return wrapper
+
+
 class StartServer:
-    def __init__(self, a, token, sid, onopen, onmessage, onerror, onclose):
+    def __init__(self, a, token, sid, onopen, onmessage, onerror, onclose, decoder=None, output_mode=None,
+                 epoch_dates=False, tick_objects=False, on_batch=None):
         self.userSocket = self
         self.a = a
         self.onopen = onopen
@@ -1108,25 +1564,25 @@ class StartServer:
         self.onerror = onerror
         self.onclose = onclose
         self.token, self.sid = token, sid
-        global ws
+        self.ws = None
         try:
             # websocket.enableTrace(True)
-            ws = websocket.WebSocketApp(a,
-                                        on_open=self.on_open,
-                                        on_message=self.on_message,
-                                        on_error=self.on_error,
-                                        on_close=self.on_close)
+            self.ws = websocket.WebSocketApp(a,
+                                             on_open=self.on_open,
+                                             on_message=self.on_message,
+                                             on_error=self.on_error,
+                                             on_close=self.on_close)
         except Exception:
             print("WebSocket not supported!")
 
-        if ws:
-            # print("WS is a array buffer ")
-            self.hsWrapper = HSWrapper()
-            # print("HS WRAPPER IS DONE ")
+        if self.ws:
+            self.hsWrapper = get_decoder(decoder, output_mode, epoch_dates, tick_objects, on_batch)
+            self.hsWrapper.ws = self.ws
         else:
             print("WebSocket not initialized!")
 
-        ws.run_forever(ping_interval=0, reconnect=5,sslopt={"cert_reqs": ssl.CERT_NONE})
+    def run(self):
+        self.ws.run_forever(ping_interval=0, reconnect=5,sslopt={"cert_reqs": ssl.CERT_NONE})
 
     def on_open(self, ws):
         # print("[OnOpen]: Function is running in HSWebscoket")
@@ -1158,6 +1614,26 @@ class StartServer:
 SCRIP_PREFIX = "sf"
 INDEX_PREFIX = "if"
 DEPTH_PREFIX = "dp"
+# request type -> scrip prefix, for the JSON request types hs_send accepts
+SUBSCRIBE_PREFIXES = {
+    ReqTypeValues["SCRIP_SUBS"]: SCRIP_PREFIX,
+    ReqTypeValues["INDEX_SUBS"]: INDEX_PREFIX,
+    ReqTypeValues["DEPTH_SUBS"]: DEPTH_PREFIX
+}
+UNSUBSCRIBE_PREFIXES = {
+    ReqTypeValues["SCRIP_UNSUBS"]: SCRIP_PREFIX,
+    ReqTypeValues["INDEX_UNSUBS"]: INDEX_PREFIX,
+    ReqTypeValues["DEPTH_UNSUBS"]: DEPTH_PREFIX
+}
+SNAPSHOT_PREFIXES = {
+    ReqTypeValues["SNAP_MW"]: SCRIP_PREFIX,
+    ReqTypeValues["SNAP_IF"]: INDEX_PREFIX,
+    ReqTypeValues["SNAP_DP"]: DEPTH_PREFIX
+}
+
+
+def join_scrips(scrips):
+    return scrips if isinstance(scrips, str) else "&".join(scrips)
 
 
 def convert_to_dict(scrips=None, channelnum=None):
@@ -1170,12 +1646,18 @@ class HSWebSocket:
     OPEN = 0
     readyState = 0
 
-    def __init__(self):
+    def __init__(self, decoder=None, output_mode=None, epoch_dates=False, tick_objects=False, on_batch=None):
         self.onclose = None
         self.url = None
         self.onopen = None
         self.onmessage = None
         self.on_error = None
+        self.server = None
+        self.decoder = decoder
+        self.output_mode = output_mode
+        self.epoch_dates = epoch_dates
+        self.tick_objects = tick_objects
+        self.on_batch = on_batch
 
     def open_connection(self, url, token, sid, on_open, on_message, on_error, on_close):
         self.url = url
@@ -1183,80 +1665,96 @@ class HSWebSocket:
         self.onmessage = on_message
         self.on_error = on_error
         self.onclose = on_close
-        StartServer(self.url, token, sid, self.onopen, self.onmessage, self.on_error, self.onclose)
+        self.server = StartServer(self.url, token, sid, self.onopen, self.onmessage, self.on_error, self.onclose,
+                                  decoder=self.decoder, output_mode=self.output_mode, epoch_dates=self.epoch_dates,
+                                  tick_objects=self.tick_objects, on_batch=self.on_batch)
+        self.server.run()
+
+    @property
+    def ws(self):
+        """The websocket of this connection, or None before open_connection."""
+        return self.server.ws if self.server else None
+
+    def send_request(self, req):
+        ws = self.ws
+        if ws and req:
+            ws.send(req, 0x2)
+            return True
+        print("Unable to send request !, Reason: Connection faulty or request not valid !")
+        return False
+
+    def connect(self, jwt, sid):
+        """Authenticate the connection with the session token and sid."""
+        if jwt and sid:
+            return self.send_request(prepareConnectionRequest2(jwt, sid))
+        print("Authorization mode is enabled: Authorization or Sid not found !")
+        return self.send_request(None)
+
+    def subscribe(self, prefix, scrips, channel):
+        """Subscribe `scrips` ("segment|token" strings, or one "&"-joined string) on `channel`."""
+        return self.send_request(prepareSubsUnSubsRequest(join_scrips(scrips), BinRespTypes["SUBSCRIBE_TYPE"],
+                                                          prefix, channel))
+
+    def unsubscribe(self, prefix, scrips, channel):
+        return self.send_request(prepareSubsUnSubsRequest(join_scrips(scrips), BinRespTypes["UNSUBSCRIBE_TYPE"],
+                                                          prefix, channel))
+
+    def snapshot(self, prefix, scrips):
+        return self.send_request(prepareSnapshotRequest(join_scrips(scrips), BinRespTypes["SNAPSHOT"], prefix))
+
+    def pause_channels(self, channels):
+        return self.send_request(prepareChannelRequest(BinRespTypes["CHPAUSE_TYPE"], channels))
+
+    def resume_channels(self, channels):
+        return self.send_request(prepareChannelRequest(BinRespTypes["CHRESUME_TYPE"], channels))
+
+    def set_throttle(self, ms):
+        return self.send_request(prepareThrottlingIntervalRequest(ms))
 
     def hs_send(self, d):
+        """Compatibility shim: decode a JSON request and forward it to the typed request methods."""
         req_json = json.loads(d)
         req_type = req_json[Keys.get("TYPE")]
         # print("Req Type", req_type)
         req = {}
         if Keys.get("SCRIPS") in req_json:
             scrips = req_json[Keys.get("SCRIPS")]
-            # print("scrips ", scrips)
             channelnum = req_json[Keys.get("CHANNEL_NUM")]
-            # print("CHANNEL NUM ", channelnum)
         else:
             scrips = None
             channelnum = 1
-        # scrips = None
-        # channelnum = req_json[Keys.get("CHANNEL_NUM")]
         if req_type == ReqTypeValues.get("CONNECTION"):
             if Keys.get("USER_ID") in req_json:
-                user = req_json[Keys.get("USER_ID")]
-                req = prepare_connection_request(user)
+                return self.send_request(prepare_connection_request(req_json[Keys.get("USER_ID")]))
             elif Keys.get("SESSION_ID") in req_json:
-                # print("INSIDE SESSION_ID")
-                session_id = req_json[Keys.get("SESSION_ID")]
-                req = prepare_connection_request(session_id)
+                return self.send_request(prepare_connection_request(req_json[Keys.get("SESSION_ID")]))
             elif Keys.get("AUTHORIZATION") in req_json:
-                # print("INSIDE AUTHORIZATION")
-                jwt = req_json[Keys.get("AUTHORIZATION")]
-                redis_key = req_json[Keys.get("SID")]
-                if jwt and redis_key:
-                    req = prepareConnectionRequest2(jwt, redis_key)
-                    # req = {"Authorization": jwt, "Sid": redis_key}
-                else:
-                    print("Authorization mode is enabled: Authorization or Sid not found !")
+                return self.connect(req_json[Keys.get("AUTHORIZATION")], req_json[Keys.get("SID")])
             else:
                 print("Invalid conn mode !")
-        elif req_type == ReqTypeValues.get("SCRIP_SUBS"):
-            req = prepareSubsUnSubsRequest(scrips, BinRespTypes.get("SUBSCRIBE_TYPE"), SCRIP_PREFIX, channelnum)
-            # print("*********** SUB SCRIPS req", req)
-        elif req_type == ReqTypeValues.get("SCRIP_UNSUBS"):
-            req = prepareSubsUnSubsRequest(scrips, BinRespTypes.get("UNSUBSCRIBE_TYPE"), SCRIP_PREFIX, channelnum)
-        elif req_type == ReqTypeValues.get("INDEX_SUBS"):
-            req = prepareSubsUnSubsRequest(scrips, BinRespTypes.get("SUBSCRIBE_TYPE"), INDEX_PREFIX, channelnum)
-        elif req_type == ReqTypeValues.get("INDEX_UNSUBS"):
-            req = prepareSubsUnSubsRequest(scrips, BinRespTypes.get("UNSUBSCRIBE_TYPE"), INDEX_PREFIX, channelnum)
-        elif req_type == ReqTypeValues.get("DEPTH_SUBS"):
-            req = prepareSubsUnSubsRequest(scrips, BinRespTypes.get("SUBSCRIBE_TYPE"), DEPTH_PREFIX, channelnum)
-        elif req_type == ReqTypeValues.get("DEPTH_UNSUBS"):
-            req = prepareSubsUnSubsRequest(scrips, BinRespTypes.get("UNSUBSCRIBE_TYPE"), DEPTH_PREFIX, channelnum)
+        elif req_type in SUBSCRIBE_PREFIXES:
+            return self.subscribe(SUBSCRIBE_PREFIXES[req_type], scrips, channelnum)
+        elif req_type in UNSUBSCRIBE_PREFIXES:
+            return self.unsubscribe(UNSUBSCRIBE_PREFIXES[req_type], scrips, channelnum)
         elif req_type == ReqTypeValues.get("CHANNEL_PAUSE"):
-            req = prepareChannelRequest(BinRespTypes.get("CHPAUSE_TYPE"), channelnum)
+            return self.pause_channels(channelnum)
         elif req_type == ReqTypeValues.get("CHANNEL_RESUME"):
-            req = prepareChannelRequest(BinRespTypes.get("CHRESUME_TYPE"), channelnum)
-        elif req_type == ReqTypeValues.get("SNAP_MW"):
-            req = prepareSnapshotRequest(scrips, BinRespTypes.get("SNAPSHOT"), SCRIP_PREFIX)
-        elif req_type == ReqTypeValues.get("SNAP_DP"):
-            req = prepareSnapshotRequest(scrips, BinRespTypes.get("SNAPSHOT"), DEPTH_PREFIX)
-        elif req_type == ReqTypeValues.get("SNAP_IF"):
-            req = prepareSnapshotRequest(scrips, BinRespTypes.get("SNAPSHOT"), INDEX_PREFIX)
+            return self.resume_channels(channelnum)
+        elif req_type in SNAPSHOT_PREFIXES:
+            return self.snapshot(SNAPSHOT_PREFIXES[req_type], scrips)
         elif req_type == ReqTypeValues.get("OPC_SUBS"):
-            req = get_opc_chain_subs_request(req[Keys.get("OPC_KEY")], req[Keys.get("STK_PRC")],
-                                             req[Keys.get("HIGH_STK")],
-                                             req[Keys.get("LOW_STK")], channelnum)
+            return self.send_request(get_opc_chain_subs_request(req[Keys.get("OPC_KEY")], req[Keys.get("STK_PRC")],
+                                                                req[Keys.get("HIGH_STK")],
+                                                                req[Keys.get("LOW_STK")], channelnum))
         elif req_type == ReqTypeValues.get("THROTTLING_INTERVAL"):
-            req = prepareThrottlingIntervalRequest(scrips)
+            return self.set_throttle(scrips)
         elif req_type == ReqTypeValues.get("LOG"):
             enable_log(req.get('enable'))
-        if ws and req:
-            ws.send(req, 0x2)
-        else:
-            print("Unable to send request !, Reason: Connection faulty or request not valid !")
+        return self.send_request(req)
 
     def close(self):
-        ws.close()
+        if self.ws:
+            self.ws.close()
         if self.onclose:
             self.onclose()
 
@@ -1270,19 +1768,22 @@ class StartHSIServer:
         self.onmessage = onmessage
         self.onerror = onerror
         self.onclose = onclose
-        # self.token, self.sid = token, sid
-        global hsiWs
+        self.ws = None
         try:
             # websocket.enableTrace(True)
-            hsiWs = websocket.WebSocketApp(self.url,
-                                           on_open=self.on_open,
-                                           on_message=self.on_message,
-                                           on_error=self.on_error,
-                                           on_close=self.on_close)
-            hsiWs.run_forever(ping_interval=5,reconnect=5,sslopt={"cert_reqs": ssl.CERT_NONE})
+            self.ws = websocket.WebSocketApp(self.url,
+                                             on_open=self.on_open,
+                                             on_message=self.on_message,
+                                             on_error=self.on_error,
+                                             on_close=self.on_close)
+        except Exception:
+            print("WebSocket not supported!")
+
+    def run(self):
+        try:
+            self.ws.run_forever(ping_interval=5,reconnect=5,sslopt={"cert_reqs": ssl.CERT_NONE})
         except Exception:
             print("WebSocket not supported!")
-        
 
     def on_message(self, ws, message):
         # print("Received message:", message)
@@ -1296,8 +1797,8 @@ class StartHSIServer:
         # print("Connection closed")
         self.OPEN = 0
         self.readyState = 0
-        if hsiWs:
-            hsiWs.close()
+        if self.ws:
+            self.ws.close()
         self.onclose()
 
     def on_open(self, ws):
@@ -1309,7 +1810,6 @@ class StartHSIServer:
 
 class HSIWebSocket:
     def __init__(self):
-        # self.hsiWs = None
         self.hsiSocket = None
         self.reqData = None
         self.OPEN = 0
@@ -1327,7 +1827,13 @@ class HSIWebSocket:
         self.onmessage = onmessage
         self.onclose = onclose
         self.onerror = onerror
-        StartHSIServer(self.url, self.onopen, self.onmessage, self.onerror, self.onclose)
+        self.hsiSocket = StartHSIServer(self.url, self.onopen, self.onmessage, self.onerror, self.onclose)
+        self.hsiSocket.run()
+
+    @property
+    def ws(self):
+        """The order-feed websocket of this connection, or None before open_connection."""
+        return self.hsiSocket.ws if self.hsiSocket else None
 
     def send(self, d):
         reqJson = json.loads(d)
@@ -1363,14 +1869,15 @@ class HSIWebSocket:
                 req = self.reqData
             else:
                 print("Invalid Request !")
-        if hsiWs and req:
+        ws = self.ws
+        if ws and req:
             js_obj = json.dumps(req)
-            hsiWs.send(js_obj)
+            ws.send(js_obj)
         else:
             print("Unable to send request! Reason: Connection faulty or request not valid!")
 
     def close(self):
         self.OPEN = 0
         self.readyState = 0
-        if hsiWs:
-            hsiWs.close()
+        if self.ws:
+            self.ws.close()
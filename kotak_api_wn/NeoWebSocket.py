@@ -1,10 +1,13 @@
 import copy
 import threading
 import time
+from collections import deque
 
 import kotak_api_wn
-from kotak_api_wn.settings import stock_key_mapping, MarketDepthResp, QuotesChannel, \
-    ReqTypeValues, index_key_mapping
+from kotak_api_wn.settings import MarketDepthResp, ReqTypeValues
+from kotak_api_wn.feed_format import FeedFormatter
+from kotak_api_wn.subscription_registry import SubscriptionRegistry
+from kotak_api_wn.HSWebSocketLib import MAX_SCRIPS, SUBSCRIBE_PREFIXES, UNSUBSCRIBE_PREFIXES, SNAPSHOT_PREFIXES
 from kotak_api_wn.urls import ORDER_FEED_URL
 
 # Try to use orjson for faster JSON serialization
@@ -23,8 +26,9 @@ except ImportError:
 # from kotak_api_wn.logger import logger
 
 
-class NeoWebSocket:
-    def __init__(self, sid, token, server_id):
+class NeoWebSocket(FeedFormatter):
+    def __init__(self, sid, token, server_id, decoder=None, output_mode=None, epoch_dates=False,
+                 tick_objects=False):
         self.hsiWebsocket = None
         self.is_hsi_open = 0
         self.un_sub_token = False
@@ -33,23 +37,44 @@ class NeoWebSocket:
         self.server_id = server_id
         self.is_hsw_open = 0
         self.quotes_arr = []
-        self.sub_list = []
+        self.subscriptions = SubscriptionRegistry()
         self.un_sub_list = []
         self.un_sub_channel_token = {}
+        # Unsubscribe frames sent and not yet acknowledged, oldest first
+        self.un_sub_pending = deque()
         # self.quotes_api_callback = None
         self.hsWebsocket = None
-        self.channel_tokens = {}
         self.live_scrip_type = None
         self.on_message = None
         self.on_error = None
         self.on_close = None
         self.on_open = None
+        self.on_batch = None
+        self.token_handlers = {}
+        self.token_listeners = {}
+        self.order_feed_listeners = []
+        self.batch_listeners = []
         self.quotes_index = None
         self.un_sub_list_count = 0
         self.un_sub_channel = None
         self.token_limit_reached = False
         self.hsw_thread = None
         self.hsi_thread = None
+        self.decoder = decoder
+        self.output_mode = output_mode
+        self.epoch_dates = epoch_dates
+        self.tick_objects = tick_objects
+
+    @property
+    def sub_list(self):
+        """Current subscriptions as `[{instrument_token: value}, ...]`, kept for backward compatibility."""
+        return [{value['instrument_token']: value} for value in self.subscriptions.values()]
+
+    @property
+    def channel_tokens(self):
+        """Current subscriptions per channel as `{channel: [{instrument_token: value}, ...]}`."""
+        return {channel: [{value['instrument_token']: value} for value in values]
+                for channel, values in self.subscriptions.channel_tokens().items()}
 
     def start_hsi_ping_thread(self):
         while self.hsiWebsocket and self.is_hsi_open:
@@ -64,7 +89,9 @@ class NeoWebSocket:
             self.hsWebsocket.hs_send(payload)
 
     def start_websocket(self):
-        self.hsWebsocket = kotak_api_wn.HSWebSocket()
+        self.hsWebsocket = kotak_api_wn.HSWebSocket(decoder=self.decoder, output_mode=self.output_mode,
+                                                    epoch_dates=self.epoch_dates, tick_objects=self.tick_objects,
+                                                    on_batch=self.on_hsm_batch if self.on_batch else None)
         self.hsWebsocket.open_connection(kotak_api_wn.WEBSOCKET_URL, self.access_token, self.sid,
                                          self.on_hsm_open, self.on_hsm_message,
                                          self.on_hsm_error, self.on_hsm_close)
@@ -75,8 +102,7 @@ class NeoWebSocket:
 
     def on_hsm_open(self):
         # print("On Open Function in Neo Websocket")
-        req_params = json_dumps({"type": "cn", "Authorization": self.access_token, "Sid": self.sid})
-        self.hsWebsocket.hs_send(req_params)
+        self.hsWebsocket.connect(self.access_token, self.sid)
         if self.on_open:
             self.on_open()
 
@@ -107,18 +133,15 @@ class NeoWebSocket:
 
                     if len(self.quotes_arr) >= 1:
                         self.call_quotes()
-                    if len(self.sub_list) >= 1:
-                        self.subscribe_scripts(self.channel_tokens)
+                    if len(self.subscriptions) >= 1:
+                        self.subscribe_scripts(self.subscriptions.channel_tokens())
                 if req_type == "unsub":
-                    if len(self.un_sub_channel_token) > 0 and self.un_sub_channel:
-                        # remove from sub_list and sub_token
-                        self.remove_items(self.un_sub_channel_token[self.un_sub_channel])
-                        del self.un_sub_channel_token[self.un_sub_channel]
-                    if len(self.un_sub_channel_token) == 0:
-                        if self.token_limit_reached:
-                            self.sub_list = []
-                            self.channel_tokens = {}
-                            self.un_sub_channel_token = {}
+                    # Acks arrive in request order, one per unsubscribe frame; None marks a frame whose tokens
+                    # were already dropped from the registry
+                    if self.un_sub_pending:
+                        chunk = self.un_sub_pending.popleft()
+                        if chunk is not None:
+                            self.remove_items(chunk)
                     if self.on_message:
                         self.on_message("Un-Subscribed Successfully!")
             elif type(message) == list:
@@ -126,7 +149,7 @@ class NeoWebSocket:
                     # print("raw message ",message)
 
                     # print("quotes ",self.quotes_arr)
-                    request_type=message[0].get('request_type')
+                    request_type = message[0].request_type if self.tick_objects else message[0].get('request_type')
                     if request_type and request_type == "SNAP" and (len(self.quotes_arr) >= 1):
                         
                         out_list, quote_type = self.quote_response_formatter(message)
@@ -136,30 +159,92 @@ class NeoWebSocket:
                             if self.on_message:
                                 self.on_message({"type": "quotes", "data": quote_message})
                             self.quotes_arr = []
-                    if len(self.sub_list) >= 1 and self.is_message_for_subscription(message):
+                    if len(self.subscriptions) >= 1 and self.is_message_for_subscription(message):
                         if self.on_message:
                             self.on_message({"type": "stock_feed", "data": message})
+                        if self.token_handlers or self.token_listeners:
+                            self.route_to_token_handlers(message)
                     
                     # If there is no other tokens in quotes_arr and sub_list. disconnect the socket
-                    # print("sublist size ",len(self.sub_list))
-                    if(len(self.sub_list)<=0):
+                    # print("sublist size ",len(self.subscriptions))
+                    if(len(self.subscriptions)<=0):
                         self.hsWebsocket.close()
 
 
+    def on_hsm_batch(self, batch):
+        if self.on_batch:
+            self.on_batch(batch)
+        for listener in self.batch_listeners:
+            listener(batch)
+
     def is_message_for_subscription(self,message):
-        # print("message ==== ",message)
-        is_for_sub = False
-        keys_in_sublist = list({outer_key for data_dict in self.sub_list for outer_key in data_dict})
-        # print("sublist keys ",keys_in_sublist)
+        tokens = self.subscriptions.tokens
         for item in message:
-            if 'tk' in item:
-                if item['tk'] in keys_in_sublist:
-                    is_for_sub = True
+            if self.get_message_token(item) in tokens:
+                return True
+        return False
+
+    def set_token_handler(self, instrument_token, handler):
+        """Route every subscribed feed item for `instrument_token` to `handler(item)`; None removes it."""
+        if handler is None:
+            self.token_handlers.pop(str(instrument_token), None)
+        else:
+            self.token_handlers[str(instrument_token)] = handler
+
+    def add_order_feed_listener(self, listener):
+        """
+        Feed every parsed order-feed message to `listener.apply(message)`, and call `listener.connected()` and
+        `listener.disconnected()` as the order feed connects and drops. Adding a listener twice has no effect.
+        """
+        if listener not in self.order_feed_listeners:
+            self.order_feed_listeners = self.order_feed_listeners + [listener]
+
+    def remove_order_feed_listener(self, listener):
+        self.order_feed_listeners = [item for item in self.order_feed_listeners if item is not listener]
+
+    def add_batch_listener(self, listener):
+        """
+        Call `listener(batch)` with every FeedBatch as well as `on_batch`. While `on_batch` is set the feed is
+        decoded in batch mode and token handlers receive no per-tick items, so handlers that must keep working
+        then also listen here. Adding a listener twice has no effect.
+        """
+        if listener not in self.batch_listeners:
+            self.batch_listeners = self.batch_listeners + [listener]
+
+    def remove_batch_listener(self, listener):
+        self.batch_listeners = [item for item in self.batch_listeners if item != listener]
+
+    def add_token_listener(self, instrument_token, listener):
+        """
+        Also route feed items for `instrument_token` to `listener(item)`. Unlike set_token_handler, any number of
+        listeners can share a token and none of them replaces the handler. Adding a listener twice has no effect.
+        """
+        token = str(instrument_token)
+        listeners = self.token_listeners.get(token, ())
+        if listener not in listeners:
+            self.token_listeners[token] = listeners + (listener,)
+
+    def remove_token_listener(self, instrument_token, listener):
+        token = str(instrument_token)
+        listeners = tuple(item for item in self.token_listeners.get(token, ()) if item != listener)
+        if listeners:
+            self.token_listeners[token] = listeners
+        else:
+            self.token_listeners.pop(token, None)
 
-            if is_for_sub:
-                break
-        return is_for_sub
-        
+    def route_to_token_handlers(self, message):
+        handlers = self.token_handlers
+        listeners = self.token_listeners
+        tokens = self.subscriptions.tokens
+        for item in message:
+            token = self.get_message_token(item)
+            if token not in tokens:
+                continue
+            handler = handlers.get(token)
+            if handler is not None:
+                handler(item)
+            for listener in listeners.get(token, ()):
+                listener(item)
 
     def on_hsi_message(self, message):
         # print("HSI on message called here")
@@ -169,6 +254,11 @@ class NeoWebSocket:
                 if req["type"] == 'cn':
                     self.is_hsi_open = 1
                     threading.Thread(target=self.start_hsi_ping_thread).start()
+                    for listener in self.order_feed_listeners:
+                        listener.connected()
+                else:
+                    for listener in self.order_feed_listeners:
+                        listener.apply(req)
 
         # print("on message callback, ", self.on_message)
         if self.on_message:
@@ -187,6 +277,8 @@ class NeoWebSocket:
         # print("On Close Function is running!")
         if self.is_hsi_open == 1:
             self.is_hsi_open = 0
+        for listener in self.order_feed_listeners:
+            listener.disconnected()
         if self.on_close:
             self.on_close()
 
@@ -207,6 +299,8 @@ class NeoWebSocket:
 
         if self.is_hsi_open == 1:
             self.is_hsi_open = 0
+        for listener in self.order_feed_listeners:
+            listener.disconnected()
 
         if self.on_error:
             self.on_error(error)
@@ -216,44 +310,11 @@ class NeoWebSocket:
 
     def remove_items(self, un_sub_json):
         for unsubscribe_token in un_sub_json:
-            token_value = unsubscribe_token[list(unsubscribe_token.keys())[0]]['instrument_token']
-            segment_value = unsubscribe_token[list(unsubscribe_token.keys())[0]]['exchange_segment']
-            sub_type_value = unsubscribe_token[list(unsubscribe_token.keys())[0]]['subscription_type']
-
-            # self.sub_list = [token for token in self.sub_list if str(list(token.keys())[0]) != str(token_value)]
-            self.sub_list = [token for token in self.sub_list if token != unsubscribe_token]
-
-            for channel_token_list in self.channel_tokens.values():
-                for channel_token_dict in channel_token_list:
-                    for channel_token_key, channel_token_value in channel_token_dict.items():
-
-                        if token_value == channel_token_value['instrument_token'] and segment_value == \
-                                channel_token_value['exchange_segment'] and sub_type_value == \
-                                channel_token_value['subscription_type']:
-                            channel_token_list.remove(channel_token_dict)
-                            break
+            for value in unsubscribe_token.values():
+                self.subscriptions.remove(SubscriptionRegistry.key_of(value))
 
         return
 
-    def input_validation(self, instrument_tokens):
-        valid_params = ["instrument_token", "exchange_segment"]
-        ret_obj = True
-        if len(instrument_tokens) > 0:
-            for item in instrument_tokens:
-                if ret_obj:
-                    keys_lst = list(item.keys())
-                    for key in valid_params:
-                        if key in keys_lst:
-                            pass
-                        else:
-                            ret_obj = False
-                            break
-                else:
-                    break
-        else:
-            ret_obj = False
-        return ret_obj
-
     def get_formatted_data(self, instrument_tokens):
         scrips = ""
         quote_type = ""
@@ -295,17 +356,8 @@ class NeoWebSocket:
             if quote_type:
                 if quote_type.strip().lower() == 'market_depth':
                     scrip_type = ReqTypeValues.get("SNAP_DP")
-        
-        req_params = json_dumps({"type": scrip_type, "scrips": scrips, "channelnum": QuotesChannel})
-        self.hsWebsocket.hs_send(req_params)
-
-    def quote_type_validation(self, quote_type):
-        Q_type = True
-        if quote_type:
-            if str(quote_type).strip().lower() not in ['market_depth', 'ohlc', 'ltp', '52w', 'circuit_limits',
-                                                       'scrip_details']:
-                Q_type = False
-        return Q_type
+
+        self.hsWebsocket.snapshot(SNAPSHOT_PREFIXES[scrip_type], scrips)
 
     def get_quotes(self, instrument_tokens, quote_type=None, isIndex=None):
         if self.quote_type_validation(quote_type):
@@ -340,42 +392,36 @@ class NeoWebSocket:
                 print(str(e))
 
     def subscribe_scripts(self, channel_tokens):
-        # print("self.channel_tokens.items()", self.channel_tokens)
+        # channel_tokens: {channel: [subscription value, ...]}, packed MAX_SCRIPS per frame and subscription type
         for channel, token_list in channel_tokens.items():
+            scrips_by_type = {}
             for tokens in token_list:
-                tokens = list(tokens.values())
-                scrips = self.format_tokens_live(tokens[0])
-                req_params1 = json_dumps(
-                    {"type": tokens[0]["subscription_type"], "scrips": scrips, "channelnum": channel})
-                self.hsWebsocket.hs_send(req_params1)
+                scrips_by_type.setdefault(tokens["subscription_type"], []).append(self.format_tokens_live(tokens))
+            for subscription_type, scrips in scrips_by_type.items():
+                prefix = SUBSCRIBE_PREFIXES[subscription_type]
+                for start in range(0, len(scrips), MAX_SCRIPS):
+                    self.hsWebsocket.subscribe(prefix, scrips[start:start + MAX_SCRIPS], channel)
 
     def prepare_un_sub(self):
         # print("IN Prepare UNSUB")
-        for key, value in self.channel_tokens.items():
-            # Loop through each item in the value list
+        for key, value in self.subscriptions.channel_tokens().items():
             for item in value:
-                # Extract the subscription_type from the item
-                subscription_type = list(item.values())[0]["subscription_type"]
-                subscription_type = subscription_type.replace('s', 'u')
-                # Create a new key by appending the subscription_type to the original key
+                subscription_type = item["subscription_type"].replace('s', 'u')
                 new_key = f"{key}-{subscription_type}"
-                # Create a list to store the items as the value
-                new_value = [{list(item.values())[0]["instrument_token"]: list(item.values())[0]}]
-                # Add the item to the new_value list
-                # Add the new key-value pair to un_sub_channel_token
-                if new_key in self.un_sub_channel_token:
-                    self.un_sub_channel_token[new_key].extend(new_value)
-                else:
-                    self.un_sub_channel_token[new_key] = new_value
+                self.un_sub_channel_token.setdefault(new_key, []).append({item["instrument_token"]: item})
 
 
     def get_live_feed(self, instrument_tokens, isIndex, isDepth):
-        if len(self.sub_list) + len(instrument_tokens) > 3000:
+        if len(self.subscriptions) + len(instrument_tokens) > SubscriptionRegistry.MAX_SUBSCRIPTIONS:
             self.token_limit_reached = True
             self.prepare_un_sub()
             self.un_subscription()
+            # Everything was just unsubscribed; free the channels for the new tokens right away. The acks still
+            # to come must not remove tokens this request subscribes again, so they only consume their slot
+            self.subscriptions.clear()
+            self.un_sub_pending = deque([None] * len(self.un_sub_pending))
 
-        tmp_token_list = []
+        channel_tokens = {}
         subscription_type = ReqTypeValues.get("SCRIP_SUBS")
         if isIndex:
             subscription_type = ReqTypeValues.get("INDEX_SUBS")
@@ -384,31 +430,15 @@ class NeoWebSocket:
 
         if self.input_validation(instrument_tokens):
             for item in instrument_tokens:
-                key = item['instrument_token']
                 value = {'instrument_token': item['instrument_token'],
                          'exchange_segment': item['exchange_segment'],
                          'subscription_type': subscription_type}
                 if 'subscription_type' not in item:
                     item['subscription_type'] = subscription_type
-                # if key not in [list(x.keys())[0] for x in self.sub_list]:
-                if {key: value} not in self.sub_list:
-                    self.sub_list.append({key: value})
-                    tmp_token_list.append({key: value})
-                # else:
-                #     index = [list(x.keys())[0] for x in self.sub_list].index(key)
-                #     print("index, key === ", index, key)
-                #     print("sub list item === ", self.sub_list[index][key], item)
-                #     if self.sub_list[index][key]['exchange_segment'] != item['exchange_segment'] or \
-                #             self.sub_list[index][key]['subscription_type'] != item['subscription_type']:
-                #         self.sub_list.append({key: value})
-                #         tmp_token_list.append({key: value})
-                #         print("here 2")
-                #
-                #     else:
-                #         self.sub_list[index][key].update(value)
-                #         print("here 3 ")
-
-            channel_tokens = self.channel_segregation(tmp_token_list)
+                channel = self.subscriptions.add(value)
+                if channel is not None:
+                    channel_tokens.setdefault(channel, []).append(value)
+
             if self.hsWebsocket and self.is_hsw_open == 1:
                 self.subscribe_scripts(channel_tokens)
 
@@ -419,115 +449,6 @@ class NeoWebSocket:
             if self.on_error:
                 self.on_error(Exception("Invalid Inputs"))
 
-    def append_ohlc_data(self, new_dict):
-        new_dict["ohlc"] = {}
-        if 'open' in new_dict.keys():
-            new_dict["ohlc"]["open"] = new_dict['open']
-            new_dict.pop('open')
-        else:
-            new_dict["ohlc"]["open"] = None
-        if 'high' in new_dict.keys():
-            new_dict["ohlc"]["high"] = new_dict['high']
-            new_dict.pop('high')
-        else:
-            new_dict["ohlc"]["high"] = None
-        if 'low' in new_dict.keys():
-            new_dict["ohlc"]["low"] = new_dict['low']
-            new_dict.pop('low')
-        else:
-            new_dict["ohlc"]["low"] = None
-        if 'close' in new_dict.keys():
-            new_dict["ohlc"]["close"] = new_dict['close']
-            new_dict.pop('close')
-        else:
-            new_dict["ohlc"]["close"] = None
-
-        return new_dict
-
-    def quote_type_filter(self, new_dict, quote_type):
-        if quote_type:
-            resp_dict = {'instrument_token': new_dict['instrument_token'],
-                         'trading_symbol': new_dict['trading_symbol'],
-                         'exchange_segment': new_dict['exchange_segment']}
-            if quote_type.strip().lower() == 'ohlc':
-                resp_dict['ohlc'] = new_dict['ohlc']
-                return resp_dict
-            elif quote_type.strip().lower() == 'ltp':
-                resp_dict['ltp'] = new_dict['last_traded_price']
-                return resp_dict
-            elif quote_type.strip().lower() == '52w':
-                resp_dict['52week_high'] = new_dict['52week_high']
-                resp_dict['52week_low'] = new_dict['52week_low']
-                return resp_dict
-            elif quote_type.strip().lower() == 'circuit_limits':
-                resp_dict['upper_circuit_limit'] = new_dict['upper_circuit_limit']
-                resp_dict['lower_circuit_limit'] = new_dict['lower_circuit_limit']
-                return resp_dict
-            elif quote_type.strip().lower() == 'scrip_details':
-                if "open_interest" in new_dict:
-                    resp_dict['open_interest'] = new_dict['open_interest']
-                resp_dict['last_traded_time'] = new_dict['last_traded_time']
-                resp_dict['ltp'] = new_dict['last_traded_price']
-                resp_dict['last_traded_quantity'] = new_dict['last_traded_quantity']
-                resp_dict['total_buy_quantity'] = new_dict['total_buy_quantity']
-                resp_dict['total_sell_quantity'] = new_dict['total_sell_quantity']
-                resp_dict['volume'] = new_dict['volume']
-                resp_dict['average_price'] = new_dict['average_price']
-                resp_dict['volume'] = new_dict['volume']
-                resp_dict['change'] = new_dict['change']
-                resp_dict['net_change_percentage'] = new_dict['net_change_percentage']
-                return resp_dict
-            else:
-                return new_dict
-        else:
-            return new_dict
-
-    def depth_resp_mapping(self, response_data):
-        final_response = []
-        for item in response_data:
-            depth_resp = {
-                'instrument_token': item['tk'],
-                'trading_symbol': item['ts'],
-                'exchange_segment': item['e'],
-                'depth': {
-                    'buy': [
-                        {'price': item['bp'], 'quantity': item['bq'], 'orders': item['bno1']},
-                        {'price': item['bp1'], 'quantity': item['bq1'], 'orders': item['bno2']},
-                        {'price': item['bp2'], 'quantity': item['bq2'], 'orders': item['bno3']},
-                        {'price': item['bp3'], 'quantity': item['bq3'], 'orders': item['bno4']},
-                        {'price': item['bp4'], 'quantity': item['bq4'], 'orders': item['bno5']},
-                    ],
-                    'sell': [
-                        {'price': item['sp'], 'quantity': item['bs'], 'orders': item['sno1']},
-                        {'price': item['sp1'], 'quantity': item['bs1'], 'orders': item['sno2']},
-                        {'price': item['sp2'], 'quantity': item['bs2'], 'orders': item['sno3']},
-                        {'price': item['sp3'], 'quantity': item['bs3'], 'orders': item['sno4']},
-                        {'price': item['sp4'], 'quantity': item['bs4'], 'orders': item['sno5']},
-                    ]
-                }
-            }
-            final_response.append(depth_resp)
-        return final_response
-
-    def quote_resp_mapper(self, response_data, quote_type=None):
-        out_resp = []
-        if len(response_data) >= 1:
-            for item in response_data:
-                if type(item) == dict:
-                    new_dict = {stock_key_mapping.get(k, k): v for k, v in item.items()}
-                    for key in list(new_dict.keys()):
-                        if key not in list(stock_key_mapping.values()):
-                            new_dict.pop(key)
-                    new_dict = self.append_ohlc_data(new_dict)
-                    if quote_type:
-                        if quote_type.strip().lower() != 'market_depth':
-                            out_resp.append(self.quote_type_filter(new_dict, quote_type))
-                    else:
-                        out_resp.append(new_dict)
-                else:
-                    out_resp = response_data
-        return out_resp
-
     def quote_response_formatter(self, message):
         # print("quote response formatter ",message)
         quote_type = ''
@@ -537,81 +458,35 @@ class NeoWebSocket:
         if "quote_type" in quotes_arr_list:
             quotes_arr_list.remove("quote_type")
         for item in message:
-            if 'tk' in item:
-                if item['tk'] in quotes_arr_list:
+            token = self.get_message_token(item)
+            if token is not None:
+                if token in quotes_arr_list:
                     out_list.append(item)
                     for i in range(len(self.quotes_arr)):
-                        if self.quotes_arr[i].get(item['tk']):
+                        if self.quotes_arr[i].get(token):
                             quote_type = self.quotes_arr[i]["quote_type"]
                             # print("quote type --- ",self.quotes_arr)
-                        if self.quotes_arr[i].get(item['tk']):
+                        if self.quotes_arr[i].get(token):
                             del self.quotes_arr[i]
                             break
         return out_list, quote_type
 
-    def response_format(self, response_data, quote_type):
-        # print("response formatter ",response_data)
-        # print("quote type ",quote_type)
-        out_resp = []
-        if self.quotes_index:
-            if len(response_data) >= 1:
-                for item in response_data:
-                    if type(item) == dict:
-                        new_dict = {index_key_mapping.get(k, k): v for k, v in item.items()}
-                        for key in list(new_dict.keys()):
-                            if key not in list(index_key_mapping.values()):
-                                new_dict.pop(key)
-                        out_resp.append(new_dict)
-
-        else:
-            if quote_type:
-                if quote_type.strip().lower() == 'market_depth':
-                    out_resp = self.depth_resp_mapping(response_data)
-                else:
-                    out_resp = self.quote_resp_mapper(response_data, quote_type)
-            else:
-                out_resp = self.quote_resp_mapper(response_data, quote_type)
-        return out_resp
-
-    def channel_segregation(self, tmp_token_list):
-        # print("****** tmp_token_list", tmp_token_list)
-        out_channel_list = {}
-        for channel_num in range(2, 17):
-            # Check if there is an existing channel array for this channel number
-            if channel_num not in self.channel_tokens:
-                self.channel_tokens[channel_num] = []
-            if channel_num not in out_channel_list:
-                out_channel_list[channel_num] = []
-
-            # Check if there is space to add all the input JSON objects to this channel
-            if len(self.channel_tokens[channel_num]) + len(tmp_token_list) <= 200:
-                # Add all the input JSON objects to this channel
-                self.channel_tokens[channel_num].extend(tmp_token_list)
-                if out_channel_list[channel_num]:
-                    out_channel_list[channel_num].extend(tmp_token_list)
-                else:
-                    out_channel_list[channel_num] = tmp_token_list
-                # Exit the loop since all objects have been added to a channel
-                break
-
-            # Otherwise, add as many input JSON objects as possible to this channel
-            num_to_add = 200 - len(self.channel_tokens[channel_num])
-            self.channel_tokens[channel_num].extend(tmp_token_list[:num_to_add])
-            out_channel_list[channel_num].extend(tmp_token_list[:num_to_add])
-            # Remove the added objects from the input array
-            tmp_token_list = tmp_token_list[num_to_add:]
-
-        return out_channel_list
-
     def un_subscription(self):
         for channels, token_list in self.un_sub_channel_token.items():
-            tokens_list = [list(tokens.values())[0] for tokens in token_list]
-            scrips = self.format_un_sub_list(tokens_list)
             self.un_sub_channel = channels
             channel, sub_type = channels.split('-')
-            req_params1 = json_dumps(
-                {"type": sub_type, "scrips": scrips, "channelnum": channel})
-            self.hsWebsocket.hs_send(req_params1)
+            for start in range(0, len(token_list), MAX_SCRIPS):
+                chunk = token_list[start:start + MAX_SCRIPS]
+                scrips = self.format_un_sub_list([list(tokens.values())[0] for tokens in chunk])
+                # Queued before sending so a fast ack finds it, and withdrawn if the frame never went out
+                self.un_sub_pending.append(chunk)
+                sent = False
+                try:
+                    sent = self.hsWebsocket.unsubscribe(UNSUBSCRIBE_PREFIXES[sub_type], scrips, channel)
+                finally:
+                    if not sent:
+                        self.un_sub_pending.remove(chunk)
+        self.un_sub_channel_token = {}
 
     def un_subscribe_list(self, instrument_tokens, isIndex=False, isDepth=False):
         # print("INTO UNSUBSCRIBE", instrument_tokens)
@@ -625,25 +500,15 @@ class NeoWebSocket:
             subscription_type = ReqTypeValues.get("DEPTH_SUBS")
 
         if self.input_validation(instrument_tokens):
-            extracted_tokens = [{'instrument_token': item[key]['instrument_token'],
-                                 'exchange_segment': item[key]['exchange_segment'],
-                                 'subscription_type': item[key]['subscription_type']}
-                                for item in self.sub_list for key in item]
-
             for token in instrument_tokens:
                 token["subscription_type"] = subscription_type
-                if token in extracted_tokens:
-                    for key, value in self.channel_tokens.items():
-                        for obj in value:
-                            if list(obj.values())[0] == token:
-                                in_key = token['instrument_token']
-                                value = {'instrument_token': token['instrument_token'],
-                                         'exchange_segment': token['exchange_segment'],
-                                         'subscription_type': subscription_type}
-                                key = str(key) + '-' + un_subscription_type
-                                if key not in self.un_sub_channel_token:
-                                    self.un_sub_channel_token[key] = []
-                                self.un_sub_channel_token[key].append({in_key: value})
+                channel = self.subscriptions.channel_of(SubscriptionRegistry.key_of(token))
+                if channel is not None:
+                    value = {'instrument_token': token['instrument_token'],
+                             'exchange_segment': token['exchange_segment'],
+                             'subscription_type': subscription_type}
+                    key = str(channel) + '-' + un_subscription_type
+                    self.un_sub_channel_token.setdefault(key, []).append({token['instrument_token']: value})
 
                 else:
                     print("The Given Token is not in Subscription list")
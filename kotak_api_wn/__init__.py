@@ -21,13 +21,32 @@ from kotak_api_wn.api.margin_api import MarginAPI
 from kotak_api_wn.api.scrip_master_api import ScripMasterAPI
 from kotak_api_wn.api.limits_api import LimitsAPI
 from kotak_api_wn.api.logout_api import LogoutAPI
+from kotak_api_wn.api.order_api import AsyncOrderAPI
+from kotak_api_wn.api.order_history_api import AsyncOrderHistoryAPI
+from kotak_api_wn.api.trade_report_api import AsyncTradeReportAPI
+from kotak_api_wn.api.order_report_api import AsyncOrderReportAPI
+from kotak_api_wn.api.modify_order_api import AsyncModifyOrder
+from kotak_api_wn.api.positions_api import AsyncPositionsAPI
+from kotak_api_wn.api.portfolio_holdings_api import AsyncPortfolioAPI
+from kotak_api_wn.api.margin_api import AsyncMarginAPI
+from kotak_api_wn.api.scrip_master_api import AsyncScripMasterAPI
+from kotak_api_wn.api.limits_api import AsyncLimitsAPI
+from kotak_api_wn.api.logout_api import AsyncLogoutAPI
 from kotak_api_wn.settings import stock_key_mapping
 from kotak_api_wn.NeoWebSocket import NeoWebSocket
+from kotak_api_wn.sharded_feed import ShardedNeoWebSocket
+from kotak_api_wn.order_book_cache import OrderBookCache
+from kotak_api_wn.positions_engine import PositionsEngine
+from kotak_api_wn.AsyncNeoWebSocket import AsyncNeoWebSocket
 from kotak_api_wn.HSWebSocketLib import HSWebSocket
 from kotak_api_wn.HSWebSocketLib import HSIWebSocket
+from kotak_api_wn.HSWebSocketLib import Tick, IndexTick, DepthTick, FeedBatch
 from kotak_api_wn.urls import WEBSOCKET_URL, PROD_BASE_URL, SESSION_PROD_BASE_URL, SESSION_UAT_BASE_URL, UAT_BASE_URL
 from kotak_api_wn.neo_api import NeoAPI
+from kotak_api_wn.async_neo_api import AsyncNeoAPI
 from kotak_api_wn.api.scrip_search import ScripSearch
+from kotak_api_wn.scrip_master_store import ScripMasterStore
+from kotak_api_wn.instrument_index import InstrumentIndex
 from kotak_api_wn import settings
 from kotak_api_wn import req_data_validation
 
@@ -37,6 +56,7 @@ __version__ = "1.0.0"
 # Module level imports for convenience
 __all__ = [
     'NeoAPI',
+    'AsyncNeoAPI',
     'NeoUtility',
     'LoginAPI',
     'OrderAPI',
@@ -50,10 +70,31 @@ __all__ = [
     'ScripMasterAPI',
     'LimitsAPI',
     'LogoutAPI',
+    'AsyncOrderAPI',
+    'AsyncOrderHistoryAPI',
+    'AsyncTradeReportAPI',
+    'AsyncOrderReportAPI',
+    'AsyncModifyOrder',
+    'AsyncPositionsAPI',
+    'AsyncPortfolioAPI',
+    'AsyncMarginAPI',
+    'AsyncScripMasterAPI',
+    'AsyncLimitsAPI',
+    'AsyncLogoutAPI',
     'NeoWebSocket',
+    'ShardedNeoWebSocket',
+    'OrderBookCache',
+    'PositionsEngine',
+    'AsyncNeoWebSocket',
     'HSWebSocket',
     'HSIWebSocket',
+    'Tick',
+    'IndexTick',
+    'DepthTick',
+    'FeedBatch',
     'ScripSearch',
+    'ScripMasterStore',
+    'InstrumentIndex',
     'ApiException',
     'ApiValueError',
     'ApiTypeError',
@@ -13,3 +13,14 @@ from kotak_api_wn.api.margin_api import MarginAPI
 from kotak_api_wn.api.scrip_master_api import ScripMasterAPI
 from kotak_api_wn.api.limits_api import LimitsAPI
 from kotak_api_wn.api.logout_api import LogoutAPI
+from kotak_api_wn.api.order_api import AsyncOrderAPI
+from kotak_api_wn.api.order_report_api import AsyncOrderReportAPI
+from kotak_api_wn.api.order_history_api import AsyncOrderHistoryAPI
+from kotak_api_wn.api.trade_report_api import AsyncTradeReportAPI
+from kotak_api_wn.api.modify_order_api import AsyncModifyOrder
+from kotak_api_wn.api.positions_api import AsyncPositionsAPI
+from kotak_api_wn.api.portfolio_holdings_api import AsyncPortfolioAPI
+from kotak_api_wn.api.margin_api import AsyncMarginAPI
+from kotak_api_wn.api.scrip_master_api import AsyncScripMasterAPI
+from kotak_api_wn.api.limits_api import AsyncLimitsAPI
+from kotak_api_wn.api.logout_api import AsyncLogoutAPI
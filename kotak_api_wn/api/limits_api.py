@@ -8,7 +8,7 @@ class LimitsAPI(object):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
 
-    def limit_init(self, segment=None, exchange=None, product=None):
+    def limit_init_params(self, segment=None, exchange=None, product=None):
         header_params = {'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
                          "Sid": self.api_client.configuration.edit_sid,
                          "Auth": self.api_client.configuration.edit_token,
@@ -22,14 +22,23 @@ class LimitsAPI(object):
         body_params = {"seg": segment, "exch": exchange, "prod": product}
 
         URL = self.api_client.configuration.get_url_details("limits")
+        return {"url": URL, "method": 'POST', "query_params": query_params, "headers": header_params,
+                "body": body_params}
+
+    def limit_init(self, segment=None, exchange=None, product=None):
+        params = self.limit_init_params(segment, exchange, product)
+        try:
+            limits_report = self.rest_client.request(**params)
+            return limits_report.json()
+        except ApiException as ex:
+            return {"error": ex}
+
 
+class AsyncLimitsAPI(LimitsAPI):
+    async def limit_init(self, segment=None, exchange=None, product=None):
+        params = self.limit_init_params(segment, exchange, product)
         try:
-            limits_report = self.rest_client.request(
-                url=URL, method='POST',
-                query_params=query_params,
-                headers=header_params,
-                body=body_params
-            )
+            limits_report = await self.rest_client.request(**params)
             return limits_report.json()
         except ApiException as ex:
             return {"error": ex}
@@ -7,7 +7,7 @@ class LogoutAPI(object):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
 
-    def logging_out(self):
+    def logging_out_params(self):
         header_params = {'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
                          "Sid": self.api_client.configuration.edit_sid,
                          "Auth": self.api_client.configuration.edit_token,
@@ -15,12 +15,24 @@ class LogoutAPI(object):
                          "Content-Type": "application/x-www-form-urlencoded"}
 
         URL = self.api_client.configuration.get_url_details("logout")
+        return {"url": URL, "method": 'POST', "headers": header_params}
+
+    def logging_out(self):
+        params = self.logging_out_params()
+
+        try:
+            logout_report = self.rest_client.request(**params)
+            return {"data": logout_report.text}
+        except ApiException as ex:
+            return {"error": ex}
+
+
+class AsyncLogoutAPI(LogoutAPI):
+    async def logging_out(self):
+        params = self.logging_out_params()
 
         try:
-            logout_report = self.rest_client.request(
-                url=URL, method='POST',
-                headers=header_params
-            )
+            logout_report = await self.rest_client.request(**params)
             return {"data": logout_report.text}
         except ApiException as ex:
             return {"error": ex}
@@ -8,9 +8,9 @@ class MarginAPI(object):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
 
-    def margin_init(self, exchange_segment, price, order_type, product, quantity, instrument_token, transaction_type,
-                    trigger_price, broker_name, branch_id, stop_loss_type, stop_loss_value,
-                    square_off_type, square_off_value, trailing_stop_loss, trailing_sl_value):
+    def margin_init_params(self, exchange_segment, price, order_type, product, quantity, instrument_token,
+                           transaction_type, trigger_price, broker_name, branch_id, stop_loss_type, stop_loss_value,
+                           square_off_type, square_off_value, trailing_stop_loss, trailing_sl_value):
 
         header_params = {'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
                          "Sid": self.api_client.configuration.edit_sid,
@@ -26,15 +26,36 @@ class MarginAPI(object):
                        "trailSL": trailing_stop_loss, "tSLTks": trailing_sl_value}
 
         query_params = {"sId": self.api_client.configuration.serverId}
+        URL = self.api_client.configuration.get_url_details("margin")
+        return {"url": URL, "method": 'POST', "query_params": query_params, "headers": header_params,
+                "body": body_params}
+
+    def margin_init(self, exchange_segment, price, order_type, product, quantity, instrument_token, transaction_type,
+                    trigger_price, broker_name, branch_id, stop_loss_type, stop_loss_value,
+                    square_off_type, square_off_value, trailing_stop_loss, trailing_sl_value):
+        params = self.margin_init_params(exchange_segment, price, order_type, product, quantity, instrument_token,
+                                         transaction_type, trigger_price, broker_name, branch_id, stop_loss_type,
+                                         stop_loss_value, square_off_type, square_off_value, trailing_stop_loss,
+                                         trailing_sl_value)
+        try:
+            margin_resp = self.rest_client.request(**params)
+
+            return {"data": json.loads(margin_resp.text)}
+
+        except ApiException as ex:
+            return {"error": ex}
+
 
+class AsyncMarginAPI(MarginAPI):
+    async def margin_init(self, exchange_segment, price, order_type, product, quantity, instrument_token,
+                          transaction_type, trigger_price, broker_name, branch_id, stop_loss_type, stop_loss_value,
+                          square_off_type, square_off_value, trailing_stop_loss, trailing_sl_value):
+        params = self.margin_init_params(exchange_segment, price, order_type, product, quantity, instrument_token,
+                                         transaction_type, trigger_price, broker_name, branch_id, stop_loss_type,
+                                         stop_loss_value, square_off_type, square_off_value, trailing_stop_loss,
+                                         trailing_sl_value)
         try:
-            URL = self.api_client.configuration.get_url_details("margin")
-            margin_resp = self.rest_client.request(
-                url=URL, method='POST',
-                query_params=query_params,
-                headers=header_params,
-                body=body_params
-            )
+            margin_resp = await self.rest_client.request(**params)
 
             return {"data": json.loads(margin_resp.text)}
 
@@ -1,5 +1,6 @@
 import kotak_api_wn
 from kotak_api_wn import rest
+from kotak_api_wn.api.order_report_api import AsyncOrderReportAPI
 from kotak_api_wn.exceptions import ApiException
 
 
@@ -8,29 +9,86 @@ class ModifyOrder(object):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
 
-    def quick_modification(self, order_id, price, order_type, quantity, validity, instrument_token,
-                           exchange_segment, product, trading_symbol, transaction_type, trigger_price,
-                           dd, market_protection, disclosed_quantity, filled_quantity, amo):
-        header_params = {'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
-                         "Sid": self.api_client.configuration.edit_sid,
-                         "Auth": self.api_client.configuration.edit_token,
-                         "neo-fin-key": self.api_client.configuration.get_neo_fin_key(),
-                         "Content-Type": "application/x-www-form-urlencoded"}
+    def modification_headers(self):
+        return {'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
+                "Sid": self.api_client.configuration.edit_sid,
+                "Auth": self.api_client.configuration.edit_token,
+                "neo-fin-key": self.api_client.configuration.get_neo_fin_key(),
+                "Content-Type": "application/x-www-form-urlencoded"}
 
+    def quick_modification_params(self, order_id, price, order_type, quantity, validity, instrument_token,
+                                  exchange_segment, product, trading_symbol, transaction_type, trigger_price,
+                                  dd, market_protection, disclosed_quantity, filled_quantity, amo):
         body_params = {"tk": instrument_token, "mp": market_protection, "pc": product, "dd": dd,
                        "dq": disclosed_quantity, "vd": validity, "ts": trading_symbol, "tt": transaction_type,
                        "pr": price, "pt": order_type, "fq": filled_quantity, 'am': amo,
                        "tp": trigger_price, "qt": quantity, "no": order_id, "es": exchange_segment}
 
         query_params = {"sId": self.api_client.configuration.serverId}
+        URL = self.api_client.configuration.get_url_details("modify_order")
+        return {"url": URL, "method": 'POST', "query_params": query_params, "headers": self.modification_headers(),
+                "body": body_params}
+
+    def order_book_modification_params(self, order_book_resp, order_id, price, order_type, quantity, validity,
+                                       instrument_token, exchange_segment, product, trading_symbol,
+                                       transaction_type, trigger_price, dd, market_protection, disclosed_quantity,
+                                       filled_quantity, amo):
+        """
+        Fill the fields the caller left empty from the order's order-book entry. Returns (params, None) when the
+        order can be modified, or (None, error_dict) with the same messages modification_with_orderid always used.
+        """
+        if "data" not in order_book_resp:
+            return None, {"Message": "There is no Data in the Order Book"}
+        for item in order_book_resp["data"]:
+            if item["nOrdNo"] == order_id:
+                if item["ordSt"] in ["rejected", "cancelled", "complete", "traded"]:
+                    if item["ordSt"] == 'complete':
+                        item["ordSt"] = 'Traded'
+                    return None, {"Error": "The Given Order Status is " + str(item["ordSt"]) +
+                                           ", So we can't proceed further",
+                                  "Reason": item["rejRsn"]}
+                trading_symbol = trading_symbol or item['trdSym']
+                instrument_token = instrument_token or item['tok']
+                product = product or item['prod']
+                transaction_type = transaction_type or item['trnsTp']
+                exchange_segment = exchange_segment or item['exSeg']
+                if trigger_price == "0":
+                    trigger_price = item['trgPrc']
+
+                body_params = {
+                    "tk": instrument_token,
+                    "mp": market_protection,
+                    "pc": product,
+                    "dd": dd,
+                    "dq": disclosed_quantity,
+                    "vd": validity,
+                    "ts": trading_symbol,
+                    "tt": transaction_type,
+                    "pr": price,
+                    "pt": order_type,
+                    "fq": filled_quantity,
+                    "tp": trigger_price,
+                    "qt": quantity,
+                    "no": order_id,
+                    "es": exchange_segment,
+                    "am": amo
+                }
+                query_params = {"sId": self.api_client.configuration.serverId}
+                URL = self.api_client.configuration.get_url_details("modify_order")
+                return {"url": URL, "method": 'POST', "query_params": query_params,
+                        "headers": self.modification_headers(), "body": body_params}, None
+        return None, {"Message": f"The Given Order Number is {order_id} and it is not matching with anyOrder of "
+                                 f"the orders"}
+
+    def quick_modification(self, order_id, price, order_type, quantity, validity, instrument_token,
+                           exchange_segment, product, trading_symbol, transaction_type, trigger_price,
+                           dd, market_protection, disclosed_quantity, filled_quantity, amo):
         try:
-            URL = self.api_client.configuration.get_url_details("modify_order")
-            orders_resp = self.rest_client.request(
-                url=URL, method='POST',
-                query_params=query_params,
-                headers=header_params,
-                body=body_params
-            )
+            params = self.quick_modification_params(order_id, price, order_type, quantity, validity,
+                                                    instrument_token, exchange_segment, product, trading_symbol,
+                                                    transaction_type, trigger_price, dd, market_protection,
+                                                    disclosed_quantity, filled_quantity, amo)
+            orders_resp = self.rest_client.request(**params)
 
             return orders_resp.json()
 
@@ -39,67 +97,56 @@ class ModifyOrder(object):
 
     def modification_with_orderid(self, order_id, price, order_type, quantity, validity, instrument_token,
                                   exchange_segment, product, trading_symbol, transaction_type, trigger_price,
-                                  dd, market_protection, disclosed_quantity, filled_quantity, amo):
-        header_params = {'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
-                         "Sid": self.api_client.configuration.edit_sid,
-                         "Auth": self.api_client.configuration.edit_token,
-                         "neo-fin-key": self.api_client.configuration.get_neo_fin_key(),
-                         "Content-Type": "application/x-www-form-urlencoded"}
+                                  dd, market_protection, disclosed_quantity, filled_quantity, amo, order_book_resp=None):
+        if order_book_resp is None:
+            order_book_resp = kotak_api_wn.OrderReportAPI(self.api_client).ordered_books()
+        params, error = self.order_book_modification_params(order_book_resp, order_id, price, order_type, quantity,
+                                                            validity, instrument_token, exchange_segment, product,
+                                                            trading_symbol, transaction_type, trigger_price, dd,
+                                                            market_protection, disclosed_quantity, filled_quantity,
+                                                            amo)
+        if error:
+            return error
+        try:
+            orders_resp = self.rest_client.request(**params)
+            return orders_resp.json()
 
-        order_book_resp = kotak_api_wn.OrderReportAPI(self.api_client).ordered_books()
-        if "data" not in order_book_resp:
-            return {"Message": "There is no Data in the Order Book"}
-        else:
-            for item in order_book_resp["data"]:
-                if item["nOrdNo"] == order_id:
-                    if item["ordSt"] in ["rejected", "cancelled", "complete", "traded"]:
-                        if item["ordSt"] == 'complete':
-                            item["ordSt"] = 'Traded'
-                        return {"Error": "The Given Order Status is " + str(item["ordSt"]) +
-                                         ", So we can't proceed further",
-                                "Reason": item["rejRsn"]}
-                    else:
-                        trading_symbol = trading_symbol or item['trdSym']
-                        instrument_token = instrument_token or item['tok']
-                        product = product or item['prod']
-                        transaction_type = transaction_type or item['trnsTp']
-                        exchange_segment = exchange_segment or item['exSeg']
-                        if trigger_price != "0":
-                            trigger_price = trigger_price
-                        else:
-                            trigger_price = item['trgPrc']
-
-                        body_params = {
-                            "tk": instrument_token,
-                            "mp": market_protection,
-                            "pc": product,
-                            "dd": dd,
-                            "dq": disclosed_quantity,
-                            "vd": validity,
-                            "ts": trading_symbol,
-                            "tt": transaction_type,
-                            "pr": price,
-                            "pt": order_type,
-                            "fq": filled_quantity,
-                            "tp": trigger_price,
-                            "qt": quantity,
-                            "no": order_id,
-                            "es": exchange_segment,
-                            "am": amo
-                        }
-                        query_params = {"sId": self.api_client.configuration.serverId}
-                        try:
-                            URL = self.api_client.configuration.get_url_details("modify_order")
-                            orders_resp = self.rest_client.request(
-                                url=URL, method='POST',
-                                query_params=query_params,
-                                headers=header_params,
-                                body=body_params
-                            )
-                            return orders_resp.json()
-
-                        except ApiException as ex:
-                            return {"error": ex}
-            else:
-                return {"Message": f"The Given Order Number is {order_id} and it is not matching with anyOrder of "
-                                   f"the orders"}
+        except ApiException as ex:
+            return {"error": ex}
+
+
+class AsyncModifyOrder(ModifyOrder):
+    async def quick_modification(self, order_id, price, order_type, quantity, validity, instrument_token,
+                                 exchange_segment, product, trading_symbol, transaction_type, trigger_price,
+                                 dd, market_protection, disclosed_quantity, filled_quantity, amo):
+        try:
+            params = self.quick_modification_params(order_id, price, order_type, quantity, validity,
+                                                    instrument_token, exchange_segment, product, trading_symbol,
+                                                    transaction_type, trigger_price, dd, market_protection,
+                                                    disclosed_quantity, filled_quantity, amo)
+            orders_resp = await self.rest_client.request(**params)
+
+            return orders_resp.json()
+
+        except ApiException as ex:
+            return {"error": ex}
+
+    async def modification_with_orderid(self, order_id, price, order_type, quantity, validity, instrument_token,
+                                        exchange_segment, product, trading_symbol, transaction_type, trigger_price,
+                                        dd, market_protection, disclosed_quantity, filled_quantity, amo,
+                                        order_book_resp=None):
+        if order_book_resp is None:
+            order_book_resp = await AsyncOrderReportAPI(self.api_client).ordered_books()
+        params, error = self.order_book_modification_params(order_book_resp, order_id, price, order_type, quantity,
+                                                            validity, instrument_token, exchange_segment, product,
+                                                            trading_symbol, transaction_type, trigger_price, dd,
+                                                            market_protection, disclosed_quantity, filled_quantity,
+                                                            amo)
+        if error:
+            return error
+        try:
+            orders_resp = await self.rest_client.request(**params)
+            return orders_resp.json()
+
+        except ApiException as ex:
+            return {"error": ex}
@@ -1,51 +1,72 @@
 import kotak_api_wn
 from kotak_api_wn import rest
+from kotak_api_wn.api.order_report_api import AsyncOrderReportAPI
 from kotak_api_wn.exceptions import ApiException
 
+TERMINAL_ORDER_STATUSES = frozenset(["rejected", "cancelled", "complete", "traded"])
+
 
 class OrderAPI(object):
     def __init__(self, api_client):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
 
+    def order_placing_params(self, exchange_segment, product, price, order_type, quantity, validity, trading_symbol,
+                             transaction_type, amo=None, disclosed_quantity=None, market_protection=None, pf=None,
+                             trigger_price=None, tag=None):
+        header_params = {'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
+                         "Sid": self.api_client.configuration.edit_sid,
+                         "Auth": self.api_client.configuration.edit_token,
+                         "neo-fin-key": self.api_client.configuration.get_neo_fin_key(),
+                         "Content-Type": "application/x-www-form-urlencoded"}
+        body_params = {"am": amo, "dq": disclosed_quantity, "es": exchange_segment, "mp": market_protection,
+                       "pc": product, "pf": pf, "pr": price, "pt": order_type, "qt": quantity, "rt": validity,
+                       "tp": trigger_price, "ts": trading_symbol, "tt": transaction_type, "ig": tag}
+
+        query_params = {"sId": self.api_client.configuration.serverId}
+        URL = self.api_client.configuration.get_url_details("place_order")
+        return {"url": URL, "method": 'POST', "query_params": query_params, "headers": header_params,
+                "body": body_params}
+
     def order_placing(self, exchange_segment, product, price, order_type, quantity, validity, trading_symbol,
                       transaction_type, amo=None, disclosed_quantity=None, market_protection=None, pf=None,
                       trigger_price=None, tag=None):
         try:
-            header_params = {'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
-                             "Sid": self.api_client.configuration.edit_sid,
-                             "Auth": self.api_client.configuration.edit_token,
-                             "neo-fin-key": self.api_client.configuration.get_neo_fin_key(),
-                             "Content-Type": "application/x-www-form-urlencoded"}
-            body_params = {"am": amo, "dq": disclosed_quantity, "es": exchange_segment, "mp": market_protection,
-                           "pc": product, "pf": pf, "pr": price, "pt": order_type, "qt": quantity, "rt": validity,
-                           "tp": trigger_price, "ts": trading_symbol, "tt": transaction_type, "ig": tag}
-
-            query_params = {"sId": self.api_client.configuration.serverId}
-            URL = self.api_client.configuration.get_url_details("place_order")
-            orders_resp = self.rest_client.request(
-                url=URL, method='POST',
-                query_params=query_params,
-                headers=header_params,
-                body=body_params
-            )
+            orders_resp = self.rest_client.request(**self.order_placing_params(
+                exchange_segment, product, price, order_type, quantity, validity, trading_symbol, transaction_type,
+                amo, disclosed_quantity, market_protection, pf, trigger_price, tag))
 
             return orders_resp.json()
         except ApiException as ex:
             return {"error": ex}
 
-    def order_cancelling(self, order_id, isVerify, amo=None):
-        if isVerify:
-            order_book_resp = kotak_api_wn.OrderReportAPI(self.api_client).ordered_books()
-            if "data" in order_book_resp:
-                for item in order_book_resp["data"]:
-                    if item["nOrdNo"] == order_id.strip():
-                        if item["ordSt"] in ["rejected", "cancelled", "complete", "traded"]:
-                            if item["ordSt"] == 'complete':
-                                item["ordSt"] = 'Traded'
-                            return {"Error": "The Given Order Status is " + str(item["ordSt"]),
-                                    "Reason": item["rejRsn"]}
+    @staticmethod
+    def terminal_status_error(item):
+        """The error response if the order-book `item` is already rejected, cancelled or traded, else None."""
+        if item["ordSt"] in TERMINAL_ORDER_STATUSES:
+            if item["ordSt"] == 'complete':
+                item["ordSt"] = 'Traded'
+            return {"Error": "The Given Order Status is " + str(item["ordSt"]),
+                    "Reason": item["rejRsn"]}
+        return None
 
+    @staticmethod
+    def order_status_error(order_book_resp, order_id):
+        """The error response if `order_id` is already rejected, cancelled or traded in the order book, else None."""
+        if "data" in order_book_resp:
+            for item in order_book_resp["data"]:
+                if item["nOrdNo"] == order_id.strip():
+                    status_error = OrderAPI.terminal_status_error(item)
+                    if status_error:
+                        return status_error
+        return None
+
+    @staticmethod
+    def index_order_book(order_book_resp):
+        """Map nOrdNo to order-book item so many orders can be checked against one book download."""
+        return {item["nOrdNo"]: item for item in order_book_resp.get("data") or ()}
+
+    def order_cancelling_params(self, order_id, amo=None):
         header_params = {'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
                          "Sid": self.api_client.configuration.edit_sid,
                          "Auth": self.api_client.configuration.edit_token,
@@ -55,16 +76,47 @@ class OrderAPI(object):
 
         query_params = {"sId": self.api_client.configuration.serverId}
         URL = self.api_client.configuration.get_url_details("cancel_order")
+        return {"url": URL, "method": 'POST', "query_params": query_params, "headers": header_params,
+                "body": body_params}
+
+    def order_cancelling(self, order_id, isVerify, amo=None):
+        if isVerify:
+            order_book_resp = kotak_api_wn.OrderReportAPI(self.api_client).ordered_books()
+            status_error = self.order_status_error(order_book_resp, order_id)
+            if status_error:
+                return status_error
+
+        params = self.order_cancelling_params(order_id, amo)
         try:
-            cancel_resp = self.rest_client.request(
-                url=URL, method='POST',
-                query_params=query_params,
-                headers=header_params,
-                body=body_params
-            )
+            cancel_resp = self.rest_client.request(**params)
             return cancel_resp.json()
         except ApiException as ex:
             return {"error": ex}
 
 
+class AsyncOrderAPI(OrderAPI):
+    async def order_placing(self, exchange_segment, product, price, order_type, quantity, validity, trading_symbol,
+                            transaction_type, amo=None, disclosed_quantity=None, market_protection=None, pf=None,
+                            trigger_price=None, tag=None):
+        try:
+            orders_resp = await self.rest_client.request(**self.order_placing_params(
+                exchange_segment, product, price, order_type, quantity, validity, trading_symbol, transaction_type,
+                amo, disclosed_quantity, market_protection, pf, trigger_price, tag))
 
+            return orders_resp.json()
+        except ApiException as ex:
+            return {"error": ex}
+
+    async def order_cancelling(self, order_id, isVerify, amo=None):
+        if isVerify:
+            order_book_resp = await AsyncOrderReportAPI(self.api_client).ordered_books()
+            status_error = self.order_status_error(order_book_resp, order_id)
+            if status_error:
+                return status_error
+
+        params = self.order_cancelling_params(order_id, amo)
+        try:
+            cancel_resp = await self.rest_client.request(**params)
+            return cancel_resp.json()
+        except ApiException as ex:
+            return {"error": ex}
@@ -9,7 +9,7 @@ class OrderHistoryAPI(object):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
 
-    def ordered_history(self, order_id):
+    def ordered_history_params(self, order_id):
         header_params = {'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
                          "Sid": self.api_client.configuration.edit_sid,
                          "Auth": self.api_client.configuration.edit_token,
@@ -19,14 +19,23 @@ class OrderHistoryAPI(object):
         body_params = {"nOrdNo": order_id}
         query_params = {"sId": self.api_client.configuration.serverId}
         URL = self.api_client.configuration.get_url_details("order_history")
+        return {"url": URL, "method": 'POST', "query_params": query_params, "headers": header_params,
+                "body": body_params}
+
+    def ordered_history(self, order_id):
+        params = self.ordered_history_params(order_id)
+        try:
+            history_report = self.rest_client.request(**params)
+            return {"data": json.loads(history_report.text)}
+        except ApiException as ex:
+            return {"error": ex}
+
 
+class AsyncOrderHistoryAPI(OrderHistoryAPI):
+    async def ordered_history(self, order_id):
+        params = self.ordered_history_params(order_id)
         try:
-            history_report = self.rest_client.request(
-                url=URL, method='POST',
-                query_params=query_params,
-                headers=header_params,
-                body=body_params
-            )
+            history_report = await self.rest_client.request(**params)
             return {"data": json.loads(history_report.text)}
         except ApiException as ex:
             return {"error": ex}
@@ -7,7 +7,7 @@ class OrderReportAPI(object):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
 
-    def ordered_books(self):
+    def ordered_books_params(self):
         header_params = {
             'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
             "Sid": self.api_client.configuration.edit_sid,
@@ -18,14 +18,19 @@ class OrderReportAPI(object):
         query_params = {"sId": self.api_client.configuration.serverId}
 
         URL = self.api_client.configuration.get_url_details("order_book")
+        return {"url": URL, "method": 'GET', "query_params": query_params, "headers": header_params}
 
+    def ordered_books(self):
+        params = self.ordered_books_params()
         try:
-            order_report = self.rest_client.request(
-                url=URL, method='GET',
-                query_params=query_params,
-                headers=header_params
-            )
+            order_report = self.rest_client.request(**params)
             return order_report.json()
         except requests.exceptions.RequestException as e:
             # handle any exceptions that might be raised here
             print(f"Error occurred: {e}")
+
+
+class AsyncOrderReportAPI(OrderReportAPI):
+    async def ordered_books(self):
+        order_report = await self.rest_client.request(**self.ordered_books_params())
+        return order_report.json()
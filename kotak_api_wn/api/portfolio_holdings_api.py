@@ -7,7 +7,7 @@ class PortfolioAPI(object):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
 
-    def portfolio_holdings(self):
+    def portfolio_holdings_params(self):
         header_params = {
             'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
             "Sid": self.api_client.configuration.edit_sid,
@@ -17,14 +17,19 @@ class PortfolioAPI(object):
         params = {"sId": self.api_client.configuration.serverId}
 
         URL = self.api_client.configuration.get_url_details("holdings")
+        return {"url": URL, "method": 'GET', "query_params": params, "headers": header_params}
 
+    def portfolio_holdings(self):
+        params = self.portfolio_holdings_params()
         try:
-            portfolio_report = self.rest_client.request(
-                url=URL, method='GET',
-                query_params=params,
-                headers=header_params
-            )
+            portfolio_report = self.rest_client.request(**params)
             return portfolio_report.json()
         except requests.exceptions.RequestException as e:
             # handle any exceptions that might be raised here
             print(f"Error occurred: {e}")
+
+
+class AsyncPortfolioAPI(PortfolioAPI):
+    async def portfolio_holdings(self):
+        portfolio_report = await self.rest_client.request(**self.portfolio_holdings_params())
+        return portfolio_report.json()
@@ -7,7 +7,7 @@ class PositionsAPI(object):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
 
-    def position_init(self):
+    def position_init_params(self):
         header_params = {
             'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
             "Sid": self.api_client.configuration.edit_sid,
@@ -18,14 +18,19 @@ class PositionsAPI(object):
         query_params = {"sId": self.api_client.configuration.serverId}
 
         URL = self.api_client.configuration.get_url_details("positions")
+        return {"url": URL, "method": 'GET', "query_params": query_params, "headers": header_params}
 
+    def position_init(self):
+        params = self.position_init_params()
         try:
-            position_report = self.rest_client.request(
-                url=URL, method='GET',
-                query_params=query_params,
-                headers=header_params
-            )
+            position_report = self.rest_client.request(**params)
             return position_report.json()
         except requests.exceptions.RequestException as e:
             # handle any exceptions that might be raised here
             print(f"Error occurred: {e}")
+
+
+class AsyncPositionsAPI(PositionsAPI):
+    async def position_init(self):
+        position_report = await self.rest_client.request(**self.position_init_params())
+        return position_report.json()
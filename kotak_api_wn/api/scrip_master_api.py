@@ -8,19 +8,38 @@ class ScripMasterAPI(object):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
 
-    def scrip_master_init(self, exchange_segment=None):
+    def scrip_master_init_params(self):
         URL = self.rest_client.configuration.get_url_details("scrip_master")
         header_params = {'Authorization': "Bearer " + self.rest_client.configuration.bearer_token}
+        return {"url": URL, "method": 'GET', "headers": header_params}
+
+    @staticmethod
+    def segment_file(scrip_report, exchange_segment):
+        if exchange_segment:
+            exchange_segment = settings.exchange_segment[exchange_segment]
+            exchange_segment_csv = [file for file in scrip_report["filesPaths"] if exchange_segment.lower() in file.lower()]
+            if exchange_segment_csv:
+                return exchange_segment_csv[0]
+            else:
+                return {"Error": "Exchange segment not found"}
+        return scrip_report
+
+    def scrip_master_init(self, exchange_segment=None):
+        params = self.scrip_master_init_params()
+
+        try:
+            scrip_report = self.rest_client.request(**params).json()["data"]
+            return self.segment_file(scrip_report, exchange_segment)
+        except ApiException as ex:
+            return {"error": ex}
+
+
+class AsyncScripMasterAPI(ScripMasterAPI):
+    async def scrip_master_init(self, exchange_segment=None):
+        params = self.scrip_master_init_params()
 
         try:
-            scrip_report = self.rest_client.request(url=URL, method='GET', headers=header_params).json()["data"]
-            if exchange_segment:
-                exchange_segment = settings.exchange_segment[exchange_segment]
-                exchange_segment_csv = [file for file in scrip_report["filesPaths"] if exchange_segment.lower() in file.lower()]
-                if exchange_segment_csv:
-                    return exchange_segment_csv[0]
-                else:
-                    return {"Error": "Exchange segment not found"}
-            return scrip_report
+            scrip_report = (await self.rest_client.request(**params)).json()["data"]
+            return self.segment_file(scrip_report, exchange_segment)
         except ApiException as ex:
             return {"error": ex}
@@ -1,60 +1,37 @@
-import io
+import datetime
 import json
 
-import requests
+import numpy as np
+
 from kotak_api_wn import rest
 from kotak_api_wn.exceptions import ApiException
-import pandas as pd
+from kotak_api_wn.scrip_master_store import IST, ScripMasterStore
 
 
 class ScripSearch(object):
     def __init__(self, api_client):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
+        self.store = ScripMasterStore(api_client)
 
     def scrip_search(self, symbol, exchange_segment, expiry, option_type, strike_price,
                      ignore_50multiple):
-        header_params = {'Authorization': "Bearer " + self.api_client.configuration.bearer_token}
-
-        URL = self.api_client.configuration.get_url_details("scrip_master")
-
         try:
-            scrip_report = self.rest_client.request(
-                url=URL, method='GET',
-                headers=header_params
-            )
-
-            data = scrip_report.json()["data"]
             if exchange_segment is not None:
-                exchange_segment_csv = [file for file in data["filesPaths"] if exchange_segment.lower() in file.lower()]
-                response = requests.get(exchange_segment_csv[0])
-                csv_text = response.text
-                df = pd.read_csv(io.StringIO(csv_text))
-                df = df.rename(columns=lambda x: x.strip())
+                index = self.store.index(exchange_segment)
                 if expiry and strike_price and not exchange_segment.endswith('fo') and exchange_segment != 'mcx':
                     return {'error': [
                         {'code': '10300', 'message': "The given segment doesn't have expire and strike price"}]}
 
-                if exchange_segment.endswith('fo'):
-                    if not (exchange_segment == 'mcx' or exchange_segment == 'mcx_fo'):
-                        df['pExpiryDate'] = pd.to_datetime(df['pExpiryDate'], unit='s')
-                        df['pExpiryDate'] = df['pExpiryDate'] + pd.DateOffset(years=10)
-                        df['pExpiryDate'] = df['pExpiryDate'].dt.strftime('%d%b%Y')
-                else:
-                    if exchange_segment == 'mcx' or exchange_segment == 'mcx_fo':
-                        df['pExpiryDate'] = pd.to_datetime(df['pExpiryDate'], unit='s')
-                        df['pExpiryDate'] = df['pExpiryDate'].dt.strftime('%d%b%Y')
-
+                # Each filter selects row positions from the prebuilt index; the frame is only sliced at the end
+                symbol_rows = option_rows = expiry_rows = strike_rows = None
                 if symbol != '':
-                    mask = df["pSymbolName"].str.lower().str.strip().str.contains(symbol)
-                    df = df[mask]
+                    symbol_rows = index.symbol_search_rows(symbol)
 
                 if option_type:
                     option_type = str(option_type).lower()
                     option_type = option_type.split(",")
-                    df["pOptionType"] = df["pOptionType"].str.lower()
-                    mask = df["pOptionType"].isin(option_type)
-                    df = df[mask]
+                    option_rows = index.option_type_rows(option_type)
 
                 if expiry:
                     list_expiry = expiry.split('-')
@@ -64,25 +41,19 @@ class ScripSearch(object):
                                 {'message': "Format of expiry date is not proper. Kindly pass DDMMYYYY(01MAY2023)"}]}
                         return error
                     elif len(list_expiry) == 2:
-                        df['pExpiryDate'] = pd.to_datetime(df['pExpiryDate'], format='%d%b%Y')
-                        df = df[(df['pExpiryDate'] >= pd.to_datetime(list_expiry[0])) & (
-                                df['pExpiryDate'] <= pd.to_datetime(list_expiry[1]))]
-                        df['pExpiryDate'] = df['pExpiryDate'].dt.strftime('%d%b%Y')
+                        expiry_rows = index.expiry_rows(list_expiry[0], list_expiry[1])
                     else:
-                        df['pExpiryDate'] = pd.to_datetime(df['pExpiryDate'], format='%d%b%Y')
-                        df = df[df['pExpiryDate'] == pd.to_datetime(list_expiry[0])]
-                        df['pExpiryDate'] = df['pExpiryDate'].dt.strftime('%d%b%Y')
+                        expiry_rows = index.expiry_rows(list_expiry[0])
 
                 if strike_price:
-                    df['dStrikePrice;'] = df['dStrikePrice;'].astype(float)
                     if '>' in strike_price:
                         strike_price = strike_price.split('>')
                         min_strike_price = float(str(strike_price[1]) + str('00.0'))
-                        df = df[df['dStrikePrice;'] >= min_strike_price]
+                        strike_rows = index.strike_rows(low=min_strike_price)
                     elif '<' in strike_price:
                         strike_price = strike_price.split('<')
                         max_strike_price = float(str(strike_price[1]) + str('00.0'))
-                        df = df[df['dStrikePrice;'] <= max_strike_price]
+                        strike_rows = index.strike_rows(high=max_strike_price)
                     else:
                         list_strike_price = strike_price.split('-')
                         if len(list_strike_price) == 2:
@@ -96,8 +67,7 @@ class ScripSearch(object):
                                 }
                                 return error
                             else:
-                                df = df[(df['dStrikePrice;'] >= min_strike_price) & (
-                                        df['dStrikePrice;'] <= max_strike_price)]
+                                strike_rows = index.strike_rows(low=min_strike_price, high=max_strike_price)
                         elif len(list_strike_price) == 1:
                             if (float(list_strike_price[0]) * 100) <= 0:
                                 error = {
@@ -108,7 +78,8 @@ class ScripSearch(object):
                                 }
                                 return error
                             else:
-                                df = df[df['dStrikePrice;'] == float(list_strike_price[0]) * 100]
+                                strike_value = float(list_strike_price[0]) * 100
+                                strike_rows = index.strike_rows(low=strike_value, high=strike_value)
                         else:
                             error = {
                                 'error': [
@@ -117,6 +88,14 @@ class ScripSearch(object):
                             }
                             return error
 
+                rows = index.intersect(symbol_rows, option_rows, expiry_rows, strike_rows)
+                df = index.frame if rows is None else index.frame.iloc[rows]
+                df = df.copy(deep=False)
+                if option_rows is not None:
+                    df["pOptionType"] = df["pOptionType"].str.lower()
+                if strike_rows is not None:
+                    df['dStrikePrice;'] = df['dStrikePrice;'].astype(float)
+
                 df = df.dropna(how='all')
                 if len(df) > 0:
                     df = df.sort_values('dStrikePrice;', ascending=True)  # Add sorting step here
@@ -129,3 +108,70 @@ class ScripSearch(object):
 
         except ApiException as ex:
             return {"error": ex}
+
+    @staticmethod
+    def chain_contract(token, trading_symbol, lot_size):
+        contract = {"instrument_token": str(token), "trading_symbol": trading_symbol}
+        if lot_size is not None and lot_size == lot_size:
+            contract["lot_size"] = int(lot_size)
+        return contract
+
+    def option_chain(self, underlying, exchange_segment, expiry=None, strikes_around=None, spot=None):
+        """
+        CE and PE contracts of one underlying and expiry from the indexed scrip master, grouped by strike.
+        `expiry` (DDMONYYYY) defaults to the nearest expiry from today; with `strikes_around` and `spot` only the
+        at-the-money strike and `strikes_around` strikes either side of it are returned.
+        """
+        if strikes_around is not None and spot is None:
+            return {'error': [{'code': '10300', 'message': 'spot is required to select strikes around the money'}]}
+        try:
+            index = self.store.index(exchange_segment)
+            rows = index.intersect(index.symbol_rows(underlying), index.option_type_rows(["ce", "pe"]))
+            if len(rows) == 0:
+                return {'error': [{'code': '10300', 'message': f'No options found for {underlying} in '
+                                                               f'{exchange_segment}'}]}
+            if expiry:
+                rows = index.intersect(rows, index.expiry_rows(expiry))
+            else:
+                upcoming = index.upcoming_expiries(rows, after=datetime.datetime.now(IST).date())
+                if upcoming:
+                    rows = index.intersect(rows, index.expiry_rows(upcoming[0]))
+                else:
+                    rows = rows[:0]
+            if len(rows) == 0:
+                return {'error': [{'code': '10300', 'message': f'No {underlying} options expire on '
+                                                               f'{expiry or "or after today"}'}]}
+
+            strikes = np.unique(index.strikes[rows])
+            atm_strike = None
+            if spot is not None:
+                # Nearest listed strike to the spot; strikes are in paise
+                position = int(np.searchsorted(strikes, float(spot) * 100))
+                if position == len(strikes) or (position > 0 and float(spot) * 100 - strikes[position - 1] <=
+                                                strikes[position] - float(spot) * 100):
+                    position -= 1
+                atm_strike = float(strikes[position]) / 100
+                if strikes_around is not None:
+                    low = strikes[max(position - int(strikes_around), 0)]
+                    high = strikes[min(position + int(strikes_around), len(strikes) - 1)]
+                    rows = index.intersect(rows, index.strike_rows(low=low, high=high))
+
+            chain = {}
+            lot_sizes = index.values('lLotSize')[rows] if 'lLotSize' in index.frame.columns else [None] * len(rows)
+            for token, trading_symbol, lot_size, option_type, strike in zip(
+                    index.values('pSymbol')[rows], index.values('pTrdSymbol')[rows], lot_sizes,
+                    index.option_types[rows], index.strikes[rows]):
+                entry = chain.setdefault(float(strike), {"strike": float(strike) / 100, "CE": None, "PE": None})
+                key = option_type.upper()
+                if entry[key] is None:
+                    entry[key] = self.chain_contract(token, trading_symbol, lot_size)
+            strikes = [chain[strike] for strike in sorted(chain)]
+            tokens = [{"instrument_token": entry[key]["instrument_token"], "exchange_segment": exchange_segment}
+                      for entry in strikes for key in ("CE", "PE") if entry[key] is not None]
+            return {"underlying": str(index.values('pSymbolName')[rows[0]]).strip(),
+                    "exchange_segment": exchange_segment,
+                    "expiry": index.values('pExpiryDate')[rows[0]],
+                    "spot": spot, "atm_strike": atm_strike, "strikes": strikes, "instrument_tokens": tokens}
+
+        except ApiException as ex:
+            return {"error": ex}
@@ -7,7 +7,7 @@ class TradeReportAPI(object):
         self.api_client = api_client
         self.rest_client = api_client.rest_client
 
-    def trading_report(self, order_id):
+    def trading_report_params(self):
         header_params = {
             'Authorization': "Bearer " + self.api_client.configuration.bearer_token,
             "Sid": self.api_client.configuration.edit_sid,
@@ -17,26 +17,35 @@ class TradeReportAPI(object):
         }
         query_params = {"sId": self.api_client.configuration.serverId}
         URL = self.api_client.configuration.get_url_details("trade_report")
-        try:
-            trade_report = self.rest_client.request(
-                url=URL, method='GET',
-                query_params=query_params,
-                headers=header_params
-            ).json()
+        return {"url": URL, "method": 'GET', "query_params": query_params, "headers": header_params}
 
-            if order_id:
-                output_json = {}
-                if 'data' in trade_report:
-                    output_json['tid'] = trade_report['tid']
-                    output_json['stat'] = trade_report['stat']
-                    output_json['stCode'] = trade_report['stCode']
-                    for item in trade_report['data']:
-                        if item['nOrdNo'] == order_id:
-                            output_json["data"] = item
-                    return output_json
-                else:
-                    return {"Error": "There is no trades available with the given order id"}
+    @staticmethod
+    def filter_trades(trade_report, order_id):
+        if order_id:
+            output_json = {}
+            if 'data' in trade_report:
+                output_json['tid'] = trade_report['tid']
+                output_json['stat'] = trade_report['stat']
+                output_json['stCode'] = trade_report['stCode']
+                for item in trade_report['data']:
+                    if item['nOrdNo'] == order_id:
+                        output_json["data"] = item
+                return output_json
             else:
-                return trade_report
+                return {"Error": "There is no trades available with the given order id"}
+        else:
+            return trade_report
+
+    def trading_report(self, order_id):
+        params = self.trading_report_params()
+        try:
+            trade_report = self.rest_client.request(**params).json()
+            return self.filter_trades(trade_report, order_id)
         except requests.exceptions.RequestException as e:
             return {'Error': e}
+
+
+class AsyncTradeReportAPI(TradeReportAPI):
+    async def trading_report(self, order_id):
+        trade_report = (await self.rest_client.request(**self.trading_report_params())).json()
+        return self.filter_trades(trade_report, order_id)
@@ -10,9 +10,11 @@ class ApiClient(object):
         the API.
     """
 
+    rest_client_class = rest.RESTClientObject
+
     def __init__(self, configuration, header_name=None, header_value=None):
         self.configuration = configuration
-        self.rest_client = rest.RESTClientObject(configuration)
+        self.rest_client = self.rest_client_class(configuration)
         self.default_headers = {}
         if header_name is not None:
             self.default_headers[header_name] = header_value
@@ -29,3 +31,8 @@ class ApiClient(object):
 
     def set_default_header(self, header_name, header_value):
         self.default_headers[header_name] = header_value
+
+
+class AsyncApiClient(ApiClient):
+    """ApiClient whose rest_client is an AsyncRESTClientObject; used by the Async* API classes."""
+    rest_client_class = rest.AsyncRESTClientObject
@@ -0,0 +1,353 @@
+import asyncio
+import time
+
+import kotak_api_wn
+from kotak_api_wn.api_client import AsyncApiClient
+from kotak_api_wn.neo_api import NeoAPI
+
+
+class AsyncNeoAPI(NeoAPI):
+    """
+        asyncio variant of NeoAPI for the order, report and portfolio endpoints.
+
+        Session setup, login, 2FA, scrip search, quotes and the websocket feeds are inherited unchanged and stay
+        synchronous. The REST endpoints below are coroutines with the same arguments, validation and response shapes
+        as their NeoAPI counterparts, issued on a pooled aiohttp session so many calls can be awaited together:
+
+            async with AsyncNeoAPI(environment="prod", access_token=token, reuse_session=session) as client:
+                positions, holdings, limits = await asyncio.gather(client.positions(), client.holdings(),
+                                                                   client.limits())
+
+        Requires the optional aiohttp dependency (pip install kotak_api_wn[async]).
+    """
+
+    def __init__(self, environment="uat", access_token=None, consumer_key=None, consumer_secret=None,
+                 neo_fin_key=None, reuse_session=None):
+        super().__init__(environment=environment, access_token=access_token, consumer_key=consumer_key,
+                         consumer_secret=consumer_secret, neo_fin_key=neo_fin_key, reuse_session=reuse_session)
+        self.async_api_client = AsyncApiClient(self.configuration)
+        self._async_api_cache = {}
+
+    def _get_async_api(self, api_class):
+        """Get cached async API instance or create new one on the shared aiohttp client."""
+        if api_class not in self._async_api_cache:
+            self._async_api_cache[api_class] = api_class(self.async_api_client)
+        return self._async_api_cache[api_class]
+
+    async def place_order(self, exchange_segment, product, price, order_type, quantity, validity, trading_symbol,
+                          transaction_type, amo="NO", disclosed_quantity="0", market_protection="0", pf="N",
+                          trigger_price="0", tag=None):
+        """Awaitable NeoAPI.place_order."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                kotak_api_wn.req_data_validation.place_order_validation(exchange_segment, product, price, order_type,
+                                                                        quantity, validity,
+                                                                        trading_symbol, transaction_type)
+
+                exchange_segment = kotak_api_wn.settings.exchange_segment[exchange_segment]
+                product = kotak_api_wn.settings.product[product]
+                order_type = kotak_api_wn.settings.order_type[order_type]
+                return await self._get_async_api(kotak_api_wn.AsyncOrderAPI).order_placing(
+                    exchange_segment=exchange_segment, product=product, price=price, order_type=order_type,
+                    quantity=quantity, validity=validity, trading_symbol=trading_symbol,
+                    transaction_type=transaction_type, amo=amo, disclosed_quantity=disclosed_quantity,
+                    market_protection=market_protection, pf=pf, trigger_price=trigger_price, tag=tag)
+            except Exception as e:
+                return {'Error': e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def place_basket_leg(self, index, leg, semaphore):
+        """Places one basket leg once a concurrency slot is free and returns its response with its timing."""
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await self._get_async_api(kotak_api_wn.AsyncOrderAPI).order_placing(**leg)
+            except Exception as e:
+                response = {'Error': e}
+        return {"leg": index, "trading_symbol": leg["trading_symbol"], "response": response,
+                "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    async def place_orders(self, list_of_orders, max_concurrency=10):
+        """Awaitable NeoAPI.place_orders; legs share the aiohttp session, at most `max_concurrency` in flight."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                legs = self.basket_legs(list_of_orders)
+            except Exception as e:
+                return {'Error': e}
+            start = time.perf_counter()
+            semaphore = asyncio.Semaphore(max(1, max_concurrency))
+            results = await asyncio.gather(*(self.place_basket_leg(index, leg, semaphore)
+                                             for index, leg in enumerate(legs)))
+            return {"data": list(results), "elapsed_ms": (time.perf_counter() - start) * 1000}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def cancel_order(self, order_id, amo="NO", isVerify=False):
+        """Awaitable NeoAPI.cancel_order."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                kotak_api_wn.req_data_validation.cancel_order_validation(order_id)
+                if isVerify:
+                    status_error, isVerify = self.cached_status_error(await self.ready_order_book_cache(), order_id)
+                    if status_error:
+                        return status_error
+                return await self._get_async_api(kotak_api_wn.AsyncOrderAPI).order_cancelling(
+                    order_id=order_id, isVerify=isVerify, amo=amo)
+            except Exception as e:
+                return {'Error': e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def cancel_basket_leg(self, order_id, amo, semaphore):
+        """Cancels one order once a concurrency slot is free and returns its response and round-trip time."""
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                response = await self._get_async_api(kotak_api_wn.AsyncOrderAPI).order_cancelling(
+                    order_id=order_id, isVerify=False, amo=amo)
+            except Exception as e:
+                response = {'Error': e}
+        return {"order_id": order_id, "skipped": False, "response": response,
+                "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    async def cancel_planned(self, plan, amo, max_concurrency):
+        """Awaitable NeoAPI.cancel_planned."""
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def skipped(order_id, status_error):
+            return {"order_id": order_id, "skipped": True, "response": status_error, "elapsed_ms": 0.0}
+
+        results = await asyncio.gather(*(skipped(order_id, status_error) if status_error
+                                         else self.cancel_basket_leg(order_id, amo, semaphore)
+                                         for order_id, status_error in plan))
+        return {"data": list(results), "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    async def cancel_orders(self, order_ids, amo="NO", max_concurrency=10):
+        """Awaitable NeoAPI.cancel_orders."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                for order_id in order_ids:
+                    kotak_api_wn.req_data_validation.cancel_order_validation(order_id)
+                order_book_resp = await self.verification_order_book()
+                return await self.cancel_planned(self.cancel_plan(order_book_resp, order_ids), amo, max_concurrency)
+            except Exception as e:
+                return {'Error': e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def cancel_all(self, filter=None, amo="NO", max_concurrency=10):
+        """Awaitable NeoAPI.cancel_all."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                order_book_resp = await self.verification_order_book()
+                if "data" not in order_book_resp:
+                    return {"Message": "There is no Data in the Order Book"}
+                plan = [(order_id, None) for order_id in self.open_order_ids(order_book_resp, filter)]
+                return await self.cancel_planned(plan, amo, max_concurrency)
+            except Exception as e:
+                return {'Error': e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def ready_order_book_cache(self):
+        """Awaitable NeoAPI.ready_order_book_cache; reseeds over the aiohttp session."""
+        cache = self.order_book_cache
+        if cache is None or not cache.live:
+            return None
+        if cache.stale:
+            cache.seed(await self._get_async_api(kotak_api_wn.AsyncOrderReportAPI).ordered_books())
+        return cache if cache.ready else None
+
+    async def verification_order_book(self):
+        """Awaitable NeoAPI.verification_order_book."""
+        cache = await self.ready_order_book_cache()
+        if cache is not None:
+            return cache.order_book()
+        return await self._get_async_api(kotak_api_wn.AsyncOrderReportAPI).ordered_books()
+
+    async def order_status(self, order_id):
+        """Awaitable NeoAPI.order_status."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                kotak_api_wn.req_data_validation.order_history_validation(order_id)
+                cached = self.cached_order_entry(await self.ready_order_book_cache(), order_id)
+                if cached is not None:
+                    return {"data": cached["data"][0]}
+                order_book_resp = await self._get_async_api(kotak_api_wn.AsyncOrderReportAPI).ordered_books()
+                item = kotak_api_wn.OrderAPI.index_order_book(order_book_resp).get(order_id.strip())
+                if item is None:
+                    return {"Message": f"The Given Order Number is {order_id} and it is not matching with anyOrder "
+                                       f"of the orders"}
+                return {"data": item}
+            except Exception as e:
+                return {'Error': e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def order_report(self):
+        """Awaitable NeoAPI.order_report."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                return await self._get_async_api(kotak_api_wn.AsyncOrderReportAPI).ordered_books()
+            except Exception as e:
+                return {'Error': e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def order_history(self, order_id):
+        """Awaitable NeoAPI.order_history."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                kotak_api_wn.req_data_validation.order_history_validation(order_id)
+                return await self._get_async_api(kotak_api_wn.AsyncOrderHistoryAPI).ordered_history(
+                    order_id=order_id)
+            except Exception as e:
+                return {'Error': e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def trade_report(self, order_id=None):
+        """Awaitable NeoAPI.trade_report."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                return await self._get_async_api(kotak_api_wn.AsyncTradeReportAPI).trading_report(
+                    order_id=order_id)
+            except Exception as e:
+                return {'Error': e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def modify_order(self, order_id, price, order_type, quantity, validity, instrument_token=None,
+                           exchange_segment=None, product=None, trading_symbol=None, transaction_type=None,
+                           trigger_price="0", dd="NA", market_protection="0", disclosed_quantity="0",
+                           filled_quantity="0", amo='NO'):
+        """Awaitable NeoAPI.modify_order."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            if order_id and instrument_token and exchange_segment and product and trading_symbol:
+                exchange_segment = kotak_api_wn.settings.exchange_segment[exchange_segment]
+                product = kotak_api_wn.settings.product[product]
+                order_type = kotak_api_wn.settings.order_type[order_type]
+                try:
+                    return await self._get_async_api(kotak_api_wn.AsyncModifyOrder). \
+                        quick_modification(order_id=order_id, price=price, order_type=order_type, quantity=quantity,
+                                           validity=validity, instrument_token=instrument_token, product=product,
+                                           exchange_segment=exchange_segment, trading_symbol=trading_symbol,
+                                           transaction_type=transaction_type, trigger_price=trigger_price,
+                                           dd=dd, market_protection=market_protection,
+                                           disclosed_quantity=disclosed_quantity,
+                                           filled_quantity=filled_quantity, amo=amo)
+                except Exception:
+                    return {'Error': "Exception has been occurred while connecting to API"}
+            elif order_id and not instrument_token and not exchange_segment and not trading_symbol:
+                try:
+                    return await self._get_async_api(kotak_api_wn.AsyncModifyOrder).modification_with_orderid(
+                        order_id=order_id, price=price, order_type=order_type, quantity=quantity,
+                        validity=validity, instrument_token=instrument_token, product=product,
+                        exchange_segment=exchange_segment, trading_symbol=trading_symbol,
+                        transaction_type=transaction_type, trigger_price=trigger_price,
+                        dd=dd, market_protection=market_protection, disclosed_quantity=disclosed_quantity,
+                        filled_quantity=filled_quantity, amo=amo,
+                        order_book_resp=self.cached_order_entry(await self.ready_order_book_cache(), order_id))
+                except Exception:
+                    return {'Error': "Exception has been occurred while connecting to API"}
+            else:
+                raise ValueError("Order ID is Mandate if we need to proceed further!")
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def positions(self):
+        """Awaitable NeoAPI.positions."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                return await self._get_async_api(kotak_api_wn.AsyncPositionsAPI).position_init()
+            except Exception as e:
+                return {"Error": e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def holdings(self):
+        """Awaitable NeoAPI.holdings."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                return await self._get_async_api(kotak_api_wn.AsyncPortfolioAPI).portfolio_holdings()
+            except Exception as e:
+                return {"Error": e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def margin_required(self, exchange_segment, price, order_type, product, quantity, instrument_token,
+                              transaction_type, trigger_price=None, broker_name="KOTAK", branch_id="ONLINE",
+                              stop_loss_type=None, stop_loss_value=None, square_off_type=None,
+                              square_off_value=None, trailing_stop_loss=None, trailing_sl_value=None):
+        """Awaitable NeoAPI.margin_required."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                kotak_api_wn.req_data_validation.margin_validation(exchange_segment, price, order_type, product,
+                                                                   quantity, instrument_token, transaction_type)
+
+                exchange_segment = kotak_api_wn.settings.exchange_segment[exchange_segment]
+                product = kotak_api_wn.settings.product[product]
+                order_type = kotak_api_wn.settings.order_type[order_type]
+                return await self._get_async_api(kotak_api_wn.AsyncMarginAPI).margin_init(
+                    exchange_segment=exchange_segment, price=price, order_type=order_type, product=product,
+                    quantity=quantity, instrument_token=instrument_token, transaction_type=transaction_type,
+                    trigger_price=trigger_price, broker_name=broker_name, branch_id=branch_id,
+                    stop_loss_type=stop_loss_type, stop_loss_value=stop_loss_value, square_off_type=square_off_type,
+                    square_off_value=square_off_value, trailing_stop_loss=trailing_stop_loss,
+                    trailing_sl_value=trailing_sl_value)
+            except Exception as e:
+                return {"Error": e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def scrip_master(self, exchange_segment=None):
+        """Awaitable NeoAPI.scrip_master."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                return await self._get_async_api(kotak_api_wn.AsyncScripMasterAPI).scrip_master_init(
+                    exchange_segment=exchange_segment)
+            except Exception as e:
+                return {"Error": 'Exchange Segment is not available'}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def limits(self, segment="ALL", exchange="ALL", product="ALL"):
+        """Awaitable NeoAPI.limits."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                kotak_api_wn.req_data_validation.limits_validation(segment, exchange, product)
+
+                return await self._get_async_api(kotak_api_wn.AsyncLimitsAPI).limit_init(
+                    segment=segment, exchange=exchange, product=product)
+            except Exception as e:
+                return {"Error": e, "message": 'Exchange Segment is not available'}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def logout(self):
+        """Awaitable NeoAPI.logout."""
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                await self._get_async_api(kotak_api_wn.AsyncLogoutAPI).logging_out()
+                self.configuration.bearer_token = None
+                self.configuration.edit_sid = None
+                self.configuration.edit_token = None
+                return {"State": "OK", "message": "You have been successfully logged out"}
+
+            except Exception as e:
+                return {"State": "NOT_OK", "message": "Some Exception with the Logout Functionality"}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    async def close(self):
+        """Close the aiohttp session and the synchronous requests session."""
+        await self.async_api_client.rest_client.close()
+        self.api_client.rest_client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -6,6 +6,8 @@ This script measures and compares:
 2. Data structure lookup performance (frozenset vs list)
 3. API instance caching benefits
 4. Connection pooling overhead
+5. Binary market-data frame decoding (legacy vs struct decoder)
+6. Subscribe request frame building (list-of-ints vs bytearray)
 
 Run: python benchmark.py
 Output: benchmark_results.png
@@ -18,6 +20,7 @@ import os
 
 # Add parent to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # ============================================================================
 # BENCHMARK CONFIGURATION
@@ -95,6 +98,40 @@ EXCHANGE_SEGMENTS_LIST = [
 ]
 EXCHANGE_SEGMENTS_FROZENSET = frozenset(EXCHANGE_SEGMENTS_LIST)
 
+# Recorded HSM DATA frames (hex): SNAP for scrip/index/depth topics followed by UPDATE ticks.
+# Used to check that every frame decoder produces exactly the output of the legacy HSWrapper.
+RECORDED_FRAMES = [
+    bytes.fromhex(
+        "0002060002009e53000000010f73667c6e73655f636d7c31313533361c6553f1006553f1006553f1006553f1000012d6"
+        "870003bd3a0000000a0000138800001b580003bd210003bd53000001f4000002ee0003bcf40003b7450003c32f00035b"
+        "9200041a96000493e000030d400003b9200003bb14000000000000000100000002800000008000000080000000033405"
+        "313135333635066e73655f636d36065443532d455100a953000000020f73667c6e73655f666f7c34333231301c6553f1"
+        "006553f1006553f1006553f1000012d687000251b60000000a0000138800001b580003bd210003bd53000001f4000002"
+        "ee0003bcf40003b7450003c32f00035b9200041a96000493e000030d400003b920000251f20000000000000001000000"
+        "02800000008000000080000000033405343332313035066e73655f666f36114e49465459323444454332343030304345"),
+    bytes.fromhex(
+        "0001060001005453000000031269667c6e73655f636d7c4e696674792035300a6553f1006553f100001dea39001dd4c2"
+        "6553f100001e0f50001dc130001dd6ac00000001000000020234084e6966747920353035066e73655f636d"),
+    bytes.fromhex(
+        "000106000100b653000000040f64707c6e73655f636d7c3131353336226553f1006553f1000003bd210003bd1c0003bd"
+        "170003bd120003bd0d0003bd530003bd580003bd5d0003bd620003bd6700000064000000650000006600000067000000"
+        "68000000c8000000c9000000ca000000cb000000cc000000030000000400000005000000060000000700000004000000"
+        "050000000600000007000000080000000100000002033405313135333635066e73655f636d36065443532d4551"),
+    bytes.fromhex(
+        "0002060002007655000000011c8000000080000000800000006553f1050012d6a80003bd6c8000000080000000800000"
+        "008000000080000000800000008000000080000000800000008000000080000000800000008000000080000000800000"
+        "0080000000800000008000000080000000800000008000000080000000005e5500000002168000000080000000800000"
+        "008000000080000000000251c0800000008000000080000000000251bb80000000800000008000000080000000800000"
+        "0080000000800000008000000080000000800000008000000080000000"),
+    bytes.fromhex(
+        "000106000100165500000003046553f10680000000001dec2880000000"),
+    bytes.fromhex(
+        "0001060001003655000000040c80000000800000000003bd26800000008000000080000000800000000003bd4e800000"
+        "00800000008000000080000000"),
+    bytes.fromhex(
+        "0001060001001e550000000106800000008000000080000000800000008000000080000000"),
+]
+
 
 def benchmark(func, iterations=ITERATIONS, warmup=WARMUP):
     """Run benchmark and return statistics."""
@@ -121,6 +158,56 @@ def benchmark(func, iterations=ITERATIONS, warmup=WARMUP):
     }
 
 
+def decode_frames(wrapper, frames=RECORDED_FRAMES):
+    """Decode `frames` in order with a fresh topic table and return every parseData result."""
+    wrapper.topic_list.clear()
+    return [wrapper.parseData(frame) for frame in frames]
+
+
+def check_decoder_parity():
+    """Differential check: in every output mode, each registered decoder must match the legacy HSWrapper exactly."""
+    from kotak_api_wn import HSWebSocketLib
+    modes = [(output_mode, epoch_dates, tick_objects) for output_mode in HSWebSocketLib.OutputModes.values()
+             for epoch_dates in (False, True) for tick_objects in (False, True)]
+    for mode in modes:
+        expected = decode_frames(HSWebSocketLib.HSWrapper(*mode))
+        for name, decoder_cls in HSWebSocketLib.DECODERS.items():
+            actual = decode_frames(decoder_cls(*mode))
+            if actual != expected:
+                raise AssertionError(f"Decoder '{name}' output differs from legacy HSWrapper "
+                                     f"(output_mode={mode[0]}, epoch_dates={mode[1]}, tick_objects={mode[2]})")
+    return sorted(HSWebSocketLib.DECODERS)
+
+
+# A full subscribe request: MAX_SCRIPS scrips of one exchange segment on a single channel.
+SUBSCRIBE_SCRIPS = "&".join("nse_cm|" + str(11536 + i) for i in range(100))
+
+
+def legacy_subscribe_frame(scrips, subscribe_type, scrip_prefix, channel_num):
+    """Reference list-of-ints builder: the subscribe frame as written byte by byte before the bytearray ByteData."""
+    scrip_array = [scrip_prefix + "|" + scrip for scrip in scrips.split("&")]
+    data = [0] * (sum(len(scrip) + 1 for scrip in scrip_array) + 2)
+    data[0] = (len(scrip_array) >> 8) & 255
+    data[1] = len(scrip_array) & 255
+    pos = 2
+    for scrip in scrip_array:
+        data[pos] = len(scrip) & 255
+        pos += 1
+        for index in range(len(scrip)):
+            data[pos] = ord(scrip[index])
+            pos += 1
+    frame = [0] * (len(data) + 11)
+    frame[2:7] = [subscribe_type, 2, 1, (len(data) >> 8) & 255, len(data) & 255]
+    pos = 7
+    for index in range(len(data)):
+        frame[pos] = data[index]
+        pos += 1
+    frame[pos:pos + 4] = [2, 0, 1, int(channel_num)]
+    frame[0] = ((len(frame) - 2) >> 8) & 255
+    frame[1] = (len(frame) - 2) & 255
+    return frame
+
+
 def run_benchmarks():
     """Run all benchmarks and collect results."""
     results = {}
@@ -134,7 +221,7 @@ def run_benchmarks():
     # ========================================================================
     # 1. JSON SERIALIZATION BENCHMARK
     # ========================================================================
-    print("[1/5] JSON Serialization Benchmark...")
+    print("[1/7] JSON Serialization Benchmark...")
     
     # Standard json
     import json
@@ -166,7 +253,7 @@ def run_benchmarks():
     # ========================================================================
     # 2. JSON DESERIALIZATION BENCHMARK
     # ========================================================================
-    print("[2/5] JSON Deserialization Benchmark...")
+    print("[2/7] JSON Deserialization Benchmark...")
     
     json_str = json.dumps(SAMPLE_ORDER_RESPONSE)
     json_str_large = json.dumps(LARGE_PAYLOAD)
@@ -196,7 +283,7 @@ def run_benchmarks():
     # ========================================================================
     # 3. MEMBERSHIP TESTING BENCHMARK (list vs frozenset)
     # ========================================================================
-    print("[3/5] Membership Testing Benchmark (list vs frozenset)...")
+    print("[3/7] Membership Testing Benchmark (list vs frozenset)...")
     
     test_values = ["nse_fo", "mcx_fo", "invalid_segment", "nse_cm"]
     
@@ -214,7 +301,7 @@ def run_benchmarks():
     # ========================================================================
     # 4. OBJECT CREATION BENCHMARK (simulating API caching)
     # ========================================================================
-    print("[4/5] Object Creation Benchmark (API caching simulation)...")
+    print("[4/7] Object Creation Benchmark (API caching simulation)...")
     
     class MockAPI:
         """Simulates API class instantiation overhead."""
@@ -242,7 +329,7 @@ def run_benchmarks():
     # ========================================================================
     # 5. DICT ACCESS PATTERNS
     # ========================================================================
-    print("[5/5] Dictionary Access Patterns...")
+    print("[5/7] Dictionary Access Patterns...")
     
     def dict_get_with_default():
         d = SAMPLE_ORDER_RESPONSE
@@ -257,6 +344,56 @@ def run_benchmarks():
     
     results["dict_get_default"] = benchmark(dict_get_with_default)
     results["dict_direct_access"] = benchmark(dict_direct_access)
+
+    # ========================================================================
+    # 6. BINARY FRAME DECODING (legacy vs struct decoder)
+    # ========================================================================
+    print("[6/7] Binary Frame Decoding (legacy vs struct)...")
+
+    from kotak_api_wn import HSWebSocketLib
+    print(f"  ✓ Decoder parity verified for: {', '.join(check_decoder_parity())}")
+
+    legacy_wrapper = HSWebSocketLib.HSWrapper()
+    struct_wrapper = HSWebSocketLib.StructHSWrapper()
+
+    def decode_legacy():
+        return decode_frames(legacy_wrapper)
+
+    def decode_struct():
+        return decode_frames(struct_wrapper)
+
+    results["decode_legacy"] = benchmark(decode_legacy, iterations=2000, warmup=200)
+    results["decode_struct"] = benchmark(decode_struct, iterations=2000, warmup=200)
+
+    if "numpy" in HSWebSocketLib.DECODERS:
+        numpy_wrapper = HSWebSocketLib.NumpyHSWrapper()
+
+        def decode_numpy():
+            return decode_frames(numpy_wrapper)
+
+        results["decode_numpy"] = benchmark(decode_numpy, iterations=2000, warmup=200)
+    else:
+        print("  ⚠ numpy not installed - skipping vectorized decoder benchmark")
+
+    # ========================================================================
+    # 7. REQUEST FRAME BUILDING (list-of-ints vs bytearray)
+    # ========================================================================
+    print("[7/7] Subscribe Request Frame Building (list-of-ints vs bytearray)...")
+
+    subscribe_type = HSWebSocketLib.BinRespTypes["SUBSCRIBE_TYPE"]
+    expected_frame = bytes(legacy_subscribe_frame(SUBSCRIBE_SCRIPS, subscribe_type, "sf", 2))
+    if HSWebSocketLib.prepareSubsUnSubsRequest(SUBSCRIBE_SCRIPS, subscribe_type, "sf", 2) != expected_frame:
+        raise AssertionError("bytearray subscribe frame differs from the list-of-ints reference")
+    print("  ✓ Subscribe frame is byte-identical to the list-of-ints reference")
+
+    def build_frame_list():
+        return bytes(legacy_subscribe_frame(SUBSCRIBE_SCRIPS, subscribe_type, "sf", 2))
+
+    def build_frame_bytearray():
+        return HSWebSocketLib.prepareSubsUnSubsRequest(SUBSCRIBE_SCRIPS, subscribe_type, "sf", 2)
+
+    results["frame_build_list"] = benchmark(build_frame_list, iterations=2000, warmup=200)
+    results["frame_build_bytearray"] = benchmark(build_frame_bytearray, iterations=2000, warmup=200)
     
     return results, orjson_available
 
@@ -304,6 +441,15 @@ def print_results(results, orjson_available):
     print("\n📊 API INSTANCE CREATION (with vs without caching)")
     print("-" * 70)
     print_comparison("New instance vs Cached instance", "api_create_no_cache", "api_create_with_cache")
+
+    print("\n📊 BINARY FRAME DECODING (recorded SNAP + UPDATE frames)")
+    print("-" * 70)
+    print_comparison("Legacy HSWrapper vs StructHSWrapper", "decode_legacy", "decode_struct")
+    print_comparison("Legacy HSWrapper vs NumpyHSWrapper", "decode_legacy", "decode_numpy")
+
+    print("\n📊 SUBSCRIBE FRAME BUILDING (100 scrips)")
+    print("-" * 70)
+    print_comparison("List-of-ints vs bytearray ByteData", "frame_build_list", "frame_build_bytearray")
     
     print()
 
@@ -451,6 +597,12 @@ def main():
     
     cache_speedup = results["api_create_no_cache"]["mean_us"] / results["api_create_with_cache"]["mean_us"]
     print(f"✅ API instance caching:  {cache_speedup:.1f}x faster with caching")
+
+    decode_speedup = results["decode_legacy"]["mean_us"] / results["decode_struct"]["mean_us"]
+    print(f"✅ Frame decoding:        {decode_speedup:.1f}x faster with struct decoder")
+
+    build_speedup = results["frame_build_list"]["mean_us"] / results["frame_build_bytearray"]["mean_us"]
+    print(f"✅ Frame building:        {build_speedup:.1f}x faster with bytearray builder")
     
     print()
     print("📈 For production trading applications, these optimizations can")
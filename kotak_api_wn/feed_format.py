@@ -0,0 +1,181 @@
+from kotak_api_wn.settings import stock_key_mapping, index_key_mapping
+
+
+class FeedFormatter:
+    """
+    Request validation and quote formatting shared by NeoWebSocket and AsyncNeoWebSocket.
+
+    Relies on the `tick_objects` attribute of the client, and on `quotes_index`, which marks the quotes being
+    formatted as index quotes.
+    """
+    tick_objects = False
+    quotes_index = None
+
+    def get_message_token(self, item):
+        """Instrument token of a decoded feed item, either a dict or a tick object."""
+        if self.tick_objects:
+            return item.instrument_token
+        return item.get('tk')
+
+    def input_validation(self, instrument_tokens):
+        valid_params = ["instrument_token", "exchange_segment"]
+        ret_obj = True
+        if len(instrument_tokens) > 0:
+            for item in instrument_tokens:
+                if ret_obj:
+                    keys_lst = list(item.keys())
+                    for key in valid_params:
+                        if key in keys_lst:
+                            pass
+                        else:
+                            ret_obj = False
+                            break
+                else:
+                    break
+        else:
+            ret_obj = False
+        return ret_obj
+
+    def quote_type_validation(self, quote_type):
+        Q_type = True
+        if quote_type:
+            if str(quote_type).strip().lower() not in ['market_depth', 'ohlc', 'ltp', '52w', 'circuit_limits',
+                                                       'scrip_details']:
+                Q_type = False
+        return Q_type
+
+    def append_ohlc_data(self, new_dict):
+        new_dict["ohlc"] = {}
+        if 'open' in new_dict.keys():
+            new_dict["ohlc"]["open"] = new_dict['open']
+            new_dict.pop('open')
+        else:
+            new_dict["ohlc"]["open"] = None
+        if 'high' in new_dict.keys():
+            new_dict["ohlc"]["high"] = new_dict['high']
+            new_dict.pop('high')
+        else:
+            new_dict["ohlc"]["high"] = None
+        if 'low' in new_dict.keys():
+            new_dict["ohlc"]["low"] = new_dict['low']
+            new_dict.pop('low')
+        else:
+            new_dict["ohlc"]["low"] = None
+        if 'close' in new_dict.keys():
+            new_dict["ohlc"]["close"] = new_dict['close']
+            new_dict.pop('close')
+        else:
+            new_dict["ohlc"]["close"] = None
+
+        return new_dict
+
+    def quote_type_filter(self, new_dict, quote_type):
+        if quote_type:
+            resp_dict = {'instrument_token': new_dict['instrument_token'],
+                         'trading_symbol': new_dict['trading_symbol'],
+                         'exchange_segment': new_dict['exchange_segment']}
+            if quote_type.strip().lower() == 'ohlc':
+                resp_dict['ohlc'] = new_dict['ohlc']
+                return resp_dict
+            elif quote_type.strip().lower() == 'ltp':
+                resp_dict['ltp'] = new_dict['last_traded_price']
+                return resp_dict
+            elif quote_type.strip().lower() == '52w':
+                resp_dict['52week_high'] = new_dict['52week_high']
+                resp_dict['52week_low'] = new_dict['52week_low']
+                return resp_dict
+            elif quote_type.strip().lower() == 'circuit_limits':
+                resp_dict['upper_circuit_limit'] = new_dict['upper_circuit_limit']
+                resp_dict['lower_circuit_limit'] = new_dict['lower_circuit_limit']
+                return resp_dict
+            elif quote_type.strip().lower() == 'scrip_details':
+                if "open_interest" in new_dict:
+                    resp_dict['open_interest'] = new_dict['open_interest']
+                resp_dict['last_traded_time'] = new_dict['last_traded_time']
+                resp_dict['ltp'] = new_dict['last_traded_price']
+                resp_dict['last_traded_quantity'] = new_dict['last_traded_quantity']
+                resp_dict['total_buy_quantity'] = new_dict['total_buy_quantity']
+                resp_dict['total_sell_quantity'] = new_dict['total_sell_quantity']
+                resp_dict['volume'] = new_dict['volume']
+                resp_dict['average_price'] = new_dict['average_price']
+                resp_dict['volume'] = new_dict['volume']
+                resp_dict['change'] = new_dict['change']
+                resp_dict['net_change_percentage'] = new_dict['net_change_percentage']
+                return resp_dict
+            else:
+                return new_dict
+        else:
+            return new_dict
+
+    def depth_resp_mapping(self, response_data):
+        final_response = []
+        for item in response_data:
+            depth_resp = {
+                'instrument_token': item['tk'],
+                'trading_symbol': item['ts'],
+                'exchange_segment': item['e'],
+                'depth': {
+                    'buy': [
+                        {'price': item['bp'], 'quantity': item['bq'], 'orders': item['bno1']},
+                        {'price': item['bp1'], 'quantity': item['bq1'], 'orders': item['bno2']},
+                        {'price': item['bp2'], 'quantity': item['bq2'], 'orders': item['bno3']},
+                        {'price': item['bp3'], 'quantity': item['bq3'], 'orders': item['bno4']},
+                        {'price': item['bp4'], 'quantity': item['bq4'], 'orders': item['bno5']},
+                    ],
+                    'sell': [
+                        {'price': item['sp'], 'quantity': item['bs'], 'orders': item['sno1']},
+                        {'price': item['sp1'], 'quantity': item['bs1'], 'orders': item['sno2']},
+                        {'price': item['sp2'], 'quantity': item['bs2'], 'orders': item['sno3']},
+                        {'price': item['sp3'], 'quantity': item['bs3'], 'orders': item['sno4']},
+                        {'price': item['sp4'], 'quantity': item['bs4'], 'orders': item['sno5']},
+                    ]
+                }
+            }
+            final_response.append(depth_resp)
+        return final_response
+
+    def quote_resp_mapper(self, response_data, quote_type=None):
+        out_resp = []
+        if len(response_data) >= 1:
+            for item in response_data:
+                if type(item) == dict:
+                    new_dict = {stock_key_mapping.get(k, k): v for k, v in item.items()}
+                    for key in list(new_dict.keys()):
+                        if key not in list(stock_key_mapping.values()):
+                            new_dict.pop(key)
+                    new_dict = self.append_ohlc_data(new_dict)
+                    if quote_type:
+                        if quote_type.strip().lower() != 'market_depth':
+                            out_resp.append(self.quote_type_filter(new_dict, quote_type))
+                    else:
+                        out_resp.append(new_dict)
+                else:
+                    out_resp = response_data
+        return out_resp
+
+    def response_format(self, response_data, quote_type):
+        # print("response formatter ",response_data)
+        # print("quote type ",quote_type)
+        out_resp = []
+        if self.tick_objects:
+            # Tick objects already carry descriptive attribute names
+            out_resp = response_data
+        elif self.quotes_index:
+            if len(response_data) >= 1:
+                for item in response_data:
+                    if type(item) == dict:
+                        new_dict = {index_key_mapping.get(k, k): v for k, v in item.items()}
+                        for key in list(new_dict.keys()):
+                            if key not in list(index_key_mapping.values()):
+                                new_dict.pop(key)
+                        out_resp.append(new_dict)
+
+        else:
+            if quote_type:
+                if quote_type.strip().lower() == 'market_depth':
+                    out_resp = self.depth_resp_mapping(response_data)
+                else:
+                    out_resp = self.quote_resp_mapper(response_data, quote_type)
+            else:
+                out_resp = self.quote_resp_mapper(response_data, quote_type)
+        return out_resp
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+
+EMPTY_ROWS = np.empty(0, dtype=np.intp)
+
+
+def expiry_display(df, exchange_segment):
+    """`pExpiryDate` as the DDMONYYYY strings search_scrip returns, or the raw column for cash segments."""
+    if exchange_segment.endswith('fo'):
+        if not (exchange_segment == 'mcx' or exchange_segment == 'mcx_fo'):
+            expiry = pd.to_datetime(df['pExpiryDate'], unit='s') + pd.DateOffset(years=10)
+            return expiry.dt.strftime('%d%b%Y')
+    elif exchange_segment == 'mcx' or exchange_segment == 'mcx_fo':
+        return pd.to_datetime(df['pExpiryDate'], unit='s').dt.strftime('%d%b%Y')
+    return df['pExpiryDate']
+
+
+def normalized_text(series):
+    """Lowercased strings of a column that may have loaded as float64 (all empty) or mixed; NaN stays NaN."""
+    values = series.astype(object)
+    return values.where(values.isna(), values.astype(str)).str.lower()
+
+
+def group_rows(keys):
+    """{key: sorted row positions} for a 1-d array of hashable keys; NaN/None keys are left out."""
+    codes, uniques = pd.factorize(keys)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return {key: order[bounds[i]:bounds[i + 1]].astype(np.intp) for i, key in enumerate(uniques)}
+
+
+class InstrumentIndex:
+    """
+    Lookup structures over one scrip master segment, built once per trading day by ScripMasterStore.index().
+
+    `frame` is the segment with `pExpiryDate` already converted to the DDMONYYYY strings search_scrip returns.
+    Next to it the index keeps the normalized symbol (`pSymbolName` lowercased and stripped), the lowercased
+    option type, the parsed expiry and the strike as float64, with hash indexes from symbol, option type and
+    expiry to row positions and the strikes sorted once for binary-search range queries. Every query returns
+    sorted row positions into `frame`, so queries combine with `intersect` and keep the file's row order.
+
+    Each structure is built on first use, so a search only pays for the columns it filters on and segments
+    without options (cash) never touch their option-type, expiry or strike columns. Text columns are
+    lowercased through `str`, because a column with no values at all loads as float64.
+    """
+
+    def __init__(self, df, exchange_segment):
+        self.exchange_segment = exchange_segment
+        frame = df.copy(deep=False)
+        if 'pExpiryDate' in frame.columns:
+            frame['pExpiryDate'] = expiry_display(frame, exchange_segment)
+        self.frame = frame
+        self._symbols = None
+        self._option_types = None
+        self._expiries = None
+        self._strikes = None
+        self._values = {}
+
+    def __len__(self):
+        return len(self.frame)
+
+    def values(self, name):
+        """Column `name` of `frame` as a NumPy array, converted once, for cheap fancy indexing by row positions."""
+        values = self._values.get(name)
+        if values is None:
+            values = self._values[name] = self.frame[name].to_numpy()
+        return values
+
+    @staticmethod
+    def intersect(*row_sets):
+        """Rows present in every given set; None stands for "no filter"."""
+        rows = None
+        for row_set in sorted((r for r in row_sets if r is not None), key=len):
+            rows = row_set if rows is None else np.intersect1d(rows, row_set, assume_unique=True)
+        return rows
+
+    def build_symbols(self):
+        self._symbols = normalized_text(self.frame['pSymbolName']).str.strip().to_numpy(dtype=object)
+        self.symbol_index = group_rows(self._symbols)
+
+    @property
+    def symbols(self):
+        """Normalized symbol (lowercased, stripped) of every row."""
+        if self._symbols is None:
+            self.build_symbols()
+        return self._symbols
+
+    def symbol_rows(self, symbol):
+        """Rows whose normalized symbol is `symbol` (compared lowercased and stripped)."""
+        if self._symbols is None:
+            self.build_symbols()
+        return self.symbol_index.get(str(symbol).lower().strip(), EMPTY_ROWS)
+
+    def symbol_search_rows(self, pattern):
+        """Rows whose normalized symbol contains the regex `pattern`, as search_scrip matches; tested per symbol."""
+        if self._symbols is None:
+            self.build_symbols()
+        symbols = pd.Series(list(self.symbol_index), dtype=object)
+        matched = symbols[symbols.str.contains(pattern) == True]  # noqa: E712, NaN means no match
+        if len(matched) == 0:
+            return EMPTY_ROWS
+        return np.sort(np.concatenate([self.symbol_index[symbol] for symbol in matched]))
+
+    def build_option_types(self):
+        self._option_types = normalized_text(self.frame['pOptionType']).to_numpy(dtype=object)
+        self.option_type_index = group_rows(self._option_types)
+
+    @property
+    def option_types(self):
+        """Lowercased option type of every row."""
+        if self._option_types is None:
+            self.build_option_types()
+        return self._option_types
+
+    def option_type_rows(self, option_types):
+        """Rows of any of the (lowercase) option types, e.g. ["ce", "pe"]."""
+        if self._option_types is None:
+            self.build_option_types()
+        row_sets = [self.option_type_index[t] for t in set(option_types) if t in self.option_type_index]
+        if not row_sets:
+            return EMPTY_ROWS
+        return row_sets[0] if len(row_sets) == 1 else np.sort(np.concatenate(row_sets))
+
+    def build_expiries(self):
+        expiries = pd.to_datetime(self.frame['pExpiryDate'], format='%d%b%Y')
+        values = expiries.to_numpy(dtype='datetime64[ns]')
+        self.expiry_index = {pd.Timestamp(key): rows for key, rows in group_rows(values).items()}
+        self.expiry_dates = np.array(sorted(self.expiry_index), dtype='datetime64[ns]')
+        self._expiries = values
+
+    @property
+    def expiries(self):
+        """Parsed expiry of every row (datetime64, NaT where missing)."""
+        if self._expiries is None:
+            self.build_expiries()
+        return self._expiries
+
+    def expiry_rows(self, start, end=None):
+        """Rows expiring on `start`, or between `start` and `end` inclusive; bounds are anything pd.to_datetime takes."""
+        if self._expiries is None:
+            self.build_expiries()
+        start = pd.Timestamp(pd.to_datetime(start))
+        if end is None:
+            return self.expiry_index.get(start, EMPTY_ROWS)
+        dates = self.expiry_dates[(self.expiry_dates >= np.datetime64(start)) &
+                                  (self.expiry_dates <= np.datetime64(pd.Timestamp(pd.to_datetime(end))))]
+        if len(dates) == 0:
+            return EMPTY_ROWS
+        return np.sort(np.concatenate([self.expiry_index[pd.Timestamp(date)] for date in dates]))
+
+    def upcoming_expiries(self, rows=None, after=None):
+        """Sorted distinct expiries of `rows` (default all rows), optionally only those on or after `after`."""
+        expiries = self.expiries if rows is None else self.expiries[rows]
+        dates = np.unique(expiries[~np.isnat(expiries)])
+        if after is not None:
+            dates = dates[dates >= np.datetime64(pd.Timestamp(after).normalize())]
+        return [pd.Timestamp(date) for date in dates]
+
+    def build_strikes(self):
+        strikes = self.frame['dStrikePrice;'].astype(float).to_numpy(dtype=np.float64)
+        self.strike_order = np.argsort(strikes, kind='stable').astype(np.intp)
+        self.sorted_strikes = strikes[self.strike_order]
+        self._strikes = strikes
+
+    @property
+    def strikes(self):
+        """Strike of every row as float64, in the file's units (paise: 100 x the rupee strike)."""
+        if self._strikes is None:
+            self.build_strikes()
+        return self._strikes
+
+    def strike_rows(self, low=None, high=None):
+        """Rows with low <= strike <= high by binary search over the sorted strikes; either bound may be None."""
+        if self._strikes is None:
+            self.build_strikes()
+        start = 0 if low is None else np.searchsorted(self.sorted_strikes, low, side='left')
+        stop = (np.searchsorted(self.sorted_strikes, np.inf, side='right') if high is None
+                else np.searchsorted(self.sorted_strikes, high, side='right'))
+        return np.sort(self.strike_order[start:stop])
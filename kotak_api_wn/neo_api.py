@@ -1,7 +1,10 @@
 import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 
 import kotak_api_wn
+from kotak_api_wn.api.order_api import TERMINAL_ORDER_STATUSES
 from kotak_api_wn.api_client import ApiClient
 from kotak_api_wn.exceptions import ApiException, ApiValueError
 
@@ -17,6 +20,12 @@ except ImportError:
     json_dumps = json.dumps
     json_loads = json.loads
 
+# Defaults applied to basket legs that omit an optional place_order field
+ORDER_LEG_DEFAULTS = {"amo": "NO", "disclosed_quantity": "0", "market_protection": "0", "pf": "N",
+                      "trigger_price": "0", "tag": None}
+ORDER_LEG_FIELDS = frozenset(["exchange_segment", "product", "price", "order_type", "quantity", "validity",
+                              "trading_symbol", "transaction_type"]).union(ORDER_LEG_DEFAULTS)
+
 
 class NeoAPI:
     """
@@ -66,6 +75,7 @@ class NeoAPI:
     self.on_error: sets the callback function for errors for Websocket.
     self.on_close: sets the callback function for connection close events for Websocket.
     self.on_open: sets the callback function for connection open events for Websocket.
+    self.on_batch: optional callback receiving each live feed frame as one columnar FeedBatch.
 
     Raises:
     ApiException: if the session initiation fails.
@@ -75,6 +85,7 @@ class NeoAPI:
         self.on_error = None
         self.on_close = None
         self.on_open = None
+        self.on_batch = None
         
         # Cache for API instances to avoid repeated instantiation
         self._api_cache = {}
@@ -109,6 +120,8 @@ class NeoAPI:
                             }
 
         self.NeoWebSocket = None
+        self.order_book_cache = None
+        self.positions_engine = None
         self.configuration.neo_fin_key = neo_fin_key
 
     def _get_api(self, api_class):
@@ -233,6 +246,75 @@ class NeoAPI:
         else:
             return {"Error Message": "Complete the 2fa process before accessing this application"}
 
+    def basket_legs(self, list_of_orders):
+        """
+            Validates every leg of a basket and maps it to OrderAPI.order_placing arguments.
+
+            Each leg is a dict of place_order keyword arguments. Raises the validation error of the first invalid
+            leg, prefixed with its position, so nothing is sent unless the whole basket is valid.
+        """
+        legs = []
+        for index, order in enumerate(list_of_orders):
+            try:
+                leg = dict(ORDER_LEG_DEFAULTS, **order)
+                unknown = set(leg) - ORDER_LEG_FIELDS
+                if unknown:
+                    raise ApiValueError("Unexpected order fields: " + ", ".join(sorted(unknown)))
+                kotak_api_wn.req_data_validation.place_order_validation(leg["exchange_segment"], leg["product"],
+                                                                          leg["price"], leg["order_type"],
+                                                                          leg["quantity"], leg["validity"],
+                                                                          leg["trading_symbol"],
+                                                                          leg["transaction_type"])
+            except (ApiValueError, KeyError, TypeError) as e:
+                raise ApiValueError(f"Order leg {index}: {e}")
+            leg["exchange_segment"] = kotak_api_wn.settings.exchange_segment[leg["exchange_segment"]]
+            leg["product"] = kotak_api_wn.settings.product[leg["product"]]
+            leg["order_type"] = kotak_api_wn.settings.order_type[leg["order_type"]]
+            legs.append(leg)
+        return legs
+
+    def place_basket_leg(self, index, leg):
+        """Places one basket leg and returns its response with the leg's round-trip time."""
+        start = time.perf_counter()
+        try:
+            response = self._get_api(kotak_api_wn.OrderAPI).order_placing(**leg)
+        except Exception as e:
+            response = {'Error': e}
+        return {"leg": index, "trading_symbol": leg["trading_symbol"], "response": response,
+                "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    def place_orders(self, list_of_orders, max_concurrency=10):
+        """
+            Places a basket of orders concurrently over the pooled HTTP session.
+
+            All legs are validated before any order is sent; an invalid leg fails the whole basket. Valid legs are
+            sent in parallel, at most `max_concurrency` at a time.
+
+            Parameters:
+            list_of_orders (list): dicts of place_order keyword arguments, e.g.
+                {"exchange_segment": "nse_fo", "product": "NRML", "price": "0", "order_type": "MKT",
+                 "quantity": "50", "validity": "DAY", "trading_symbol": "NIFTY24DEC24000CE",
+                 "transaction_type": "B"}
+            max_concurrency (int, optional): Maximum number of orders in flight at once. Defaults to 10.
+
+            Returns:
+            {"data": [...], "elapsed_ms": ...} with one result per leg in input order, each holding the leg's index,
+            trading symbol, API response and round-trip time in milliseconds.
+        """
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                legs = self.basket_legs(list_of_orders)
+            except Exception as e:
+                return {'Error': e}
+            if not legs:
+                return {"data": [], "elapsed_ms": 0.0}
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(legs)))) as executor:
+                results = list(executor.map(self.place_basket_leg, range(len(legs)), legs))
+            return {"data": results, "elapsed_ms": (time.perf_counter() - start) * 1000}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
     def cancel_order(self, order_id, amo="NO", isVerify=False):
         """
             Cancels an order with the given `order_id` using the NEO API.
@@ -254,6 +336,10 @@ class NeoAPI:
         if self.configuration.edit_token and self.configuration.edit_sid:
             try:
                 kotak_api_wn.req_data_validation.cancel_order_validation(order_id)
+                if isVerify:
+                    status_error, isVerify = self.cached_status_error(self.ready_order_book_cache(), order_id)
+                    if status_error:
+                        return status_error
                 cancel_order = self._get_api(kotak_api_wn.OrderAPI).order_cancelling(order_id=order_id,
                                                                                          isVerify=isVerify, amo=amo)
                 return cancel_order
@@ -262,6 +348,212 @@ class NeoAPI:
         else:
             return {"Error Message": "Complete the 2fa process before accessing this application"}
 
+    @staticmethod
+    def cancel_plan(order_book_resp, order_ids):
+        """
+            Checks each order id against one indexed download of the order book.
+
+            Returns (order_id, status_error) pairs in input order; status_error is the cancel_order(isVerify=True)
+            error for orders that are already rejected, cancelled or traded, and None for orders to cancel.
+        """
+        book = kotak_api_wn.OrderAPI.index_order_book(order_book_resp)
+        plan = []
+        for order_id in order_ids:
+            item = book.get(order_id.strip())
+            plan.append((order_id, kotak_api_wn.OrderAPI.terminal_status_error(item) if item else None))
+        return plan
+
+    @staticmethod
+    def open_order_ids(order_book_resp, filter=None):
+        """
+            Order ids in the order book that are not yet terminal and match `filter`.
+
+            `filter` is either a callable taking an order-book item and returning a bool, or a dict of order-book
+            fields and the values they must equal, e.g. {"trdSym": "TCS-EQ", "trnsTp": "B"}.
+        """
+        if isinstance(filter, dict):
+            fields = filter
+            filter = lambda item: all(item.get(key) == value for key, value in fields.items())
+        return [item["nOrdNo"] for item in order_book_resp.get("data") or ()
+                if item["ordSt"] not in TERMINAL_ORDER_STATUSES
+                and (filter is None or filter(item))]
+
+    def cancel_basket_leg(self, order_id, amo):
+        """Cancels one order without re-checking the order book and returns its response and round-trip time."""
+        start = time.perf_counter()
+        try:
+            response = self._get_api(kotak_api_wn.OrderAPI).order_cancelling(order_id=order_id, isVerify=False,
+                                                                             amo=amo)
+        except Exception as e:
+            response = {'Error': e}
+        return {"order_id": order_id, "skipped": False, "response": response,
+                "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    def cancel_planned(self, plan, amo, max_concurrency):
+        """Sends the cancels of a cancel_plan concurrently; skipped orders keep their status error."""
+        start = time.perf_counter()
+        results = [{"order_id": order_id, "skipped": True, "response": status_error, "elapsed_ms": 0.0}
+                   if status_error else None for order_id, status_error in plan]
+        pending = [index for index, result in enumerate(results) if result is None]
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(pending)))) as executor:
+                sent = executor.map(lambda index: self.cancel_basket_leg(plan[index][0], amo), pending)
+                for index, result in zip(pending, sent):
+                    results[index] = result
+        return {"data": results, "elapsed_ms": (time.perf_counter() - start) * 1000}
+
+    def cancel_orders(self, order_ids, amo="NO", max_concurrency=10):
+        """
+            Cancels several orders with a single order-book download.
+
+            The order book is fetched once and indexed by order number. Orders that are already rejected, cancelled
+            or traded are skipped with the same error cancel_order(isVerify=True) returns; the rest are cancelled
+            concurrently, at most `max_concurrency` at a time.
+
+            Args:
+                order_ids (list): The IDs of the orders to cancel.
+                amo (str, optional): Default is "NO".
+                max_concurrency (int, optional): Maximum number of cancels in flight at once. Defaults to 10.
+
+            Returns:
+                {"data": [...], "elapsed_ms": ...} with one result per order id in input order, each holding the
+                order id, whether it was skipped, the API response or status error, and the round-trip time.
+        """
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                for order_id in order_ids:
+                    kotak_api_wn.req_data_validation.cancel_order_validation(order_id)
+                order_book_resp = self.verification_order_book()
+                return self.cancel_planned(self.cancel_plan(order_book_resp, order_ids), amo, max_concurrency)
+            except Exception as e:
+                return {'Error': e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    def cancel_all(self, filter=None, amo="NO", max_concurrency=10):
+        """
+            Cancels every open order in the order book, optionally only those matching `filter`.
+
+            Args:
+                filter (callable or dict, optional): A callable taking an order-book item and returning True for
+                    orders to cancel, or a dict of order-book fields and required values,
+                    e.g. {"trdSym": "TCS-EQ"}. Defaults to None, which cancels all open orders.
+                amo (str, optional): Default is "NO".
+                max_concurrency (int, optional): Maximum number of cancels in flight at once. Defaults to 10.
+
+            Returns:
+                The cancel_orders result for the matching open orders.
+        """
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                order_book_resp = self.verification_order_book()
+                if "data" not in order_book_resp:
+                    return {"Message": "There is no Data in the Order Book"}
+                plan = [(order_id, None) for order_id in self.open_order_ids(order_book_resp, filter)]
+                return self.cancel_planned(plan, amo, max_concurrency)
+            except Exception as e:
+                return {'Error': e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    def enable_order_book_cache(self):
+        """
+            Keeps a local copy of the order book, indexed by order number, current from the order feed.
+
+            Connects the order feed if needed and seeds the cache from one order-book download. While the cache is
+            ready, cancel_order(isVerify=True), modify_order by order id, cancel_orders, cancel_all and order_status
+            read order statuses locally instead of downloading the order book. After a feed reconnect the cache is
+            reseeded once on its next use; while the feed is down every call falls back to the REST order book.
+
+            Returns:
+                The OrderBookCache, which can also be queried directly, or the order-book error response if the
+                seed download failed.
+        """
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            if self.order_book_cache is None:
+                self.order_book_cache = kotak_api_wn.OrderBookCache()
+            if not self.NeoWebSocket:
+                self.NeoWebSocket = kotak_api_wn.NeoWebSocket(self.configuration.edit_sid,
+                                                              self.configuration.edit_token,
+                                                              self.configuration.serverId)
+            self.NeoWebSocket.add_order_feed_listener(self.order_book_cache)
+            if self.NeoWebSocket.is_hsi_open:
+                self.order_book_cache.connected()
+            else:
+                self.subscribe_to_orderfeed()
+            order_book_resp = self._get_api(kotak_api_wn.OrderReportAPI).ordered_books()
+            if not self.order_book_cache.seed(order_book_resp):
+                # The cache stays attached to the feed and is seeded again on its next use
+                if isinstance(order_book_resp, dict):
+                    return order_book_resp
+                return {"Error": "The order book could not be downloaded to seed the cache"}
+            return self.order_book_cache
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
+    def ready_order_book_cache(self):
+        """The order-book cache if it reflects the live book, reseeding it after a feed (re)connect; else None."""
+        cache = self.order_book_cache
+        if cache is None or not cache.live:
+            return None
+        if cache.stale:
+            cache.seed(self._get_api(kotak_api_wn.OrderReportAPI).ordered_books())
+        return cache if cache.ready else None
+
+    @staticmethod
+    def cached_order_entry(cache, order_id):
+        """`{"data": [entry]}` for `order_id` from a ready cache, or None to make the caller download the book."""
+        item = cache.get(order_id) if cache is not None else None
+        return {"data": [item]} if item is not None else None
+
+    @staticmethod
+    def cached_status_error(cache, order_id):
+        """
+            Checks `order_id` against a ready cache. Returns (status_error, isVerify): the terminal-status error if
+            any, and whether the caller still has to verify against the REST order book.
+        """
+        item = cache.get(order_id) if cache is not None else None
+        if item is None:
+            return None, True
+        return kotak_api_wn.OrderAPI.terminal_status_error(item), False
+
+    def verification_order_book(self):
+        """The order book to check orders against: the cached copy when ready, else one REST download."""
+        cache = self.ready_order_book_cache()
+        if cache is not None:
+            return cache.order_book()
+        return self._get_api(kotak_api_wn.OrderReportAPI).ordered_books()
+
+    def order_status(self, order_id):
+        """
+            Retrieves the order-book entry of one order.
+
+            Answered from the order-book cache when enable_order_book_cache is active and the feed is connected,
+            otherwise from one order-book download.
+
+            Args:
+                order_id (str): The ID of the order.
+
+            Returns:
+                {"data": entry} with the order-book fields of the order.
+        """
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                kotak_api_wn.req_data_validation.order_history_validation(order_id)
+                cached = self.cached_order_entry(self.ready_order_book_cache(), order_id)
+                if cached is not None:
+                    return {"data": cached["data"][0]}
+                order_book_resp = self._get_api(kotak_api_wn.OrderReportAPI).ordered_books()
+                item = kotak_api_wn.OrderAPI.index_order_book(order_book_resp).get(order_id.strip())
+                if item is None:
+                    return {"Message": f"The Given Order Number is {order_id} and it is not matching with anyOrder "
+                                       f"of the orders"}
+                return {"data": item}
+            except Exception as e:
+                return {'Error': e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
     def order_report(self):
         """
             Retrieves a list of orders in the order book using the NEO API.
@@ -386,7 +678,8 @@ class NeoAPI:
                         exchange_segment=exchange_segment, trading_symbol=trading_symbol,
                         transaction_type=transaction_type, trigger_price=trigger_price,
                         dd=dd, market_protection=market_protection, disclosed_quantity=disclosed_quantity,
-                        filled_quantity=filled_quantity, amo=amo)
+                        filled_quantity=filled_quantity, amo=amo,
+                        order_book_resp=self.cached_order_entry(self.ready_order_book_cache(), order_id))
                     return modify_order
 
                 except Exception:
@@ -416,6 +709,34 @@ class NeoAPI:
         else:
             return {"Error Message": "Complete the 2fa process before accessing this application"}
 
+    def start_positions_engine(self, on_pnl=None, reconcile_interval=60):
+        """
+            Tracks positions and P&L locally instead of polling positions().
+
+            Loads one positions() snapshot, then applies fills from the order feed and marks open positions to
+            market from their live ticks; the order feed and live feed are connected as needed. Every
+            `reconcile_interval` seconds, and after an order-feed reconnect, the snapshot is reloaded to correct
+            drift.
+
+            Args:
+                on_pnl (callable, optional): Called on every fill and tick with
+                    {"tk": token, "pnl": P&L of that token's positions, "total_pnl": portfolio P&L}.
+                reconcile_interval (float, optional): Seconds between REST reconciliations, None or 0 to disable.
+                    Defaults to 60.
+
+            Returns:
+                The running PositionsEngine; engine.positions() lists every position with its LTP and P&L, and
+                engine.stop() detaches it.
+        """
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            if self.positions_engine is not None:
+                self.positions_engine.stop()
+            self.positions_engine = kotak_api_wn.PositionsEngine(self, on_pnl=on_pnl,
+                                                                 reconcile_interval=reconcile_interval)
+            return self.positions_engine.start()
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
     def holdings(self):
         """
             Retrieves the current holdings for the portfolio using the NEO API.
@@ -585,6 +906,42 @@ class NeoAPI:
         else:
             return {"Error Message": "Complete the 2fa process before accessing this application"}
 
+    def option_chain(self, underlying, expiry=None, strikes_around=None, spot=None, exchange_segment="nse_fo"):
+        """
+            Build the option chain of an underlying from the cached, indexed scrip master in one call.
+
+            Args:
+                underlying (str): Symbol name of the underlying, e.g. "NIFTY" (matched exactly, case-insensitive).
+                expiry (str, optional): Expiry in DDMONYYYY format (e.g. "28NOV2024"). Defaults to the nearest
+                    expiry from today.
+                strikes_around (int, optional): Number of strikes to return on each side of the at-the-money
+                    strike. Requires spot. Defaults to all strikes.
+                spot (float, optional): Spot price of the underlying, used to find the at-the-money strike.
+                exchange_segment (str, optional): Derivatives segment. Defaults to "nse_fo".
+
+            Returns:
+                dict: {"underlying", "exchange_segment", "expiry", "spot", "atm_strike", "strikes", "instrument_tokens"}
+                where "strikes" lists {"strike", "CE", "PE"} in ascending strike order, each contract being
+                {"instrument_token", "trading_symbol", "lot_size"}, and "instrument_tokens" can be passed straight
+                to subscribe(). On failure the dictionary instead holds one of:
+                    "error": a list of {"code", "message"} when strikes_around comes without spot or no
+                        contracts match the arguments, or the ApiException raised while loading the scrip master;
+                    "Error": any other exception, e.g. an unknown exchange_segment;
+                    "Error Message": when the 2FA login has not been completed.
+        """
+        if self.configuration.edit_token and self.configuration.edit_sid:
+            try:
+                exchange_segment = kotak_api_wn.settings.exchange_segment[exchange_segment]
+                return self._get_api(kotak_api_wn.ScripSearch).option_chain(underlying=underlying,
+                                                                            exchange_segment=exchange_segment,
+                                                                            expiry=expiry,
+                                                                            strikes_around=strikes_around,
+                                                                            spot=spot)
+            except Exception as e:
+                return {"Error": e}
+        else:
+            return {"Error Message": "Complete the 2fa process before accessing this application"}
+
     def quotes(self, instrument_tokens, quote_type=None, isIndex=False, session_token=None, sid=None,
                server_id=None):
         """
@@ -687,6 +1044,7 @@ class NeoAPI:
             self.NeoWebSocket.on_error = self.__on_error
             self.NeoWebSocket.on_open = self.__on_open
             self.NeoWebSocket.on_close = self.__on_close
+            self.NeoWebSocket.on_batch = self.on_batch
 
     def subscribe(self, instrument_tokens, isIndex=False, isDepth=False):
 
@@ -0,0 +1,158 @@
+import threading
+
+from kotak_api_wn.api.order_api import TERMINAL_ORDER_STATUSES
+
+# Try to use orjson for faster JSON parsing
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    import json
+    json_loads = json.loads
+
+
+ORDER_MESSAGE_TYPES = frozenset(["order"])
+
+
+def order_feed_item(message):
+    """The order-book-shaped order of an order-feed message, or None for acks, heartbeats and other messages."""
+    if not message:
+        return None
+    if isinstance(message, (str, bytes)):
+        try:
+            message = json_loads(message)
+        except ValueError:
+            return None
+    if not isinstance(message, dict) or message.get("type") not in ORDER_MESSAGE_TYPES:
+        return None
+    item = message.get("data")
+    if isinstance(item, (str, bytes)):
+        try:
+            item = json_loads(item)
+        except ValueError:
+            return None
+    if not isinstance(item, dict) or not item.get("nOrdNo"):
+        return None
+    return item
+
+
+class OrderBookCache:
+    """
+    Local order book keyed by order number (`nOrdNo`), seeded from one `ordered_books()` download and kept
+    current from the HSI order feed.
+
+    Entries are the order-book item dicts the REST API returns; an order-feed update is merged into the entry
+    for its order number, so fields the feed omits keep their order-book values. When both sides carry the
+    `updRecvTm` receive timestamp, an update older than the stored entry is ignored, which lets the feed be
+    connected before the seed download without the seed overwriting newer fills.
+
+    The cache is only `ready` once it has been seeded after the feed connected. Each (re)connect marks it
+    `stale`, because updates sent while the feed was down are lost; callers reseed it before trusting it again.
+    All methods are safe to call from the websocket thread and the caller's thread.
+    """
+    def __init__(self):
+        self._orders = {}
+        self._lock = threading.RLock()
+        self.seeded = False
+        self.live = False
+        self.stale = True
+        self.updates = 0
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __contains__(self, order_id):
+        return str(order_id).strip() in self._orders
+
+    @property
+    def ready(self):
+        return self.seeded and self.live and not self.stale
+
+    @staticmethod
+    def is_newer(item, current):
+        new_time, old_time = item.get("updRecvTm"), current.get("updRecvTm")
+        if new_time is None or old_time is None:
+            return True
+        try:
+            return int(new_time) >= int(old_time)
+        except (TypeError, ValueError):
+            return True
+
+    def merge(self, item):
+        order_id = str(item["nOrdNo"])
+        current = self._orders.get(order_id)
+        if current is None:
+            self._orders[order_id] = dict(item)
+        elif self.is_newer(item, current):
+            current.update(item)
+        else:
+            return None
+        return self._orders[order_id]
+
+    def seed(self, order_book_resp):
+        """
+        Load an `ordered_books()` response. Orders already updated by the feed keep their newer state.
+        Returns False, leaving the cache unseeded, if the response has no order list (including the None
+        `ordered_books()` returns when the request fails).
+        """
+        if not isinstance(order_book_resp, dict) or ("data" not in order_book_resp and
+                                                     order_book_resp.get("stat") != "Ok"):
+            return False
+        with self._lock:
+            for item in order_book_resp.get("data") or ():
+                self.merge(item)
+            self.seeded = True
+            self.stale = False
+        return True
+
+    def apply(self, message):
+        """
+        Merge one order-feed message, as received by `NeoWebSocket.on_hsi_message`, and return the updated
+        order-book entry. Connection acks, heartbeats and non-order messages are ignored and return None.
+        """
+        item = order_feed_item(message)
+        if item is None:
+            return None
+        with self._lock:
+            entry = self.merge(item)
+            if entry is not None:
+                self.updates += 1
+                entry = dict(entry)
+        return entry
+
+    def connected(self):
+        # Updates sent before this connection were never seen, so the cache needs a seed taken after it
+        self.live = True
+        self.stale = True
+
+    def disconnected(self):
+        self.live = False
+        self.stale = True
+
+    def get(self, order_id):
+        """Copy of the entry for `order_id`, or None if the order is not in the cache."""
+        with self._lock:
+            item = self._orders.get(str(order_id).strip())
+            return dict(item) if item is not None else None
+
+    def status(self, order_id):
+        item = self._orders.get(str(order_id).strip())
+        return item.get("ordSt") if item is not None else None
+
+    def is_terminal(self, order_id):
+        return self.status(order_id) in TERMINAL_ORDER_STATUSES
+
+    def open_orders(self):
+        with self._lock:
+            return [dict(item) for item in self._orders.values() if item.get("ordSt") not in TERMINAL_ORDER_STATUSES]
+
+    def order_book(self):
+        """The cached orders as an `ordered_books()`-shaped response, with copies of the entries."""
+        with self._lock:
+            return {"stat": "Ok", "stCode": 200, "data": [dict(item) for item in self._orders.values()]}
+
+    def clear(self):
+        with self._lock:
+            self._orders.clear()
+            self.seeded = False
+            self.stale = True
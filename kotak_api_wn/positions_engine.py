@@ -0,0 +1,353 @@
+import threading
+import time
+from array import array
+
+import kotak_api_wn
+from kotak_api_wn.order_book_cache import order_feed_item
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Per-row numeric columns, float64
+POSITION_COLUMNS = ("buy_qty", "sell_qty", "buy_amt", "sell_amt", "factor", "ltp")
+
+
+def position_number(row, *names):
+    """Sum of the named numeric fields of a positions/order-book row, which the API sends as strings."""
+    total = 0.0
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ""):
+            total += float(value)
+    return total
+
+
+def position_factor(row):
+    """multiplier * (genNum / genDen) * (prcNum / prcDen), the scale between price * quantity and amount."""
+    factor = float(row.get("multiplier") or 1)
+    if row.get("genNum") and row.get("genDen"):
+        factor *= float(row["genNum"]) / float(row["genDen"])
+    if row.get("prcNum") and row.get("prcDen"):
+        factor *= float(row["prcNum"]) / float(row["prcDen"])
+    return factor
+
+
+def position_key(row):
+    return str(row.get("exSeg")), str(row.get("tok")), str(row.get("prod"))
+
+
+class PositionsEngine:
+    """
+    Local positions and P&L, started from one `position_init()` snapshot and then kept current from the order
+    feed and the live ticks of the instruments held.
+
+    Each position (exchange segment, token, product) is a row of float64 columns: buy/sell quantity, buy/sell
+    amount, the price factor and the last traded price. P&L follows the broker's formula,
+
+        pnl = (sell_amt - buy_amt) + (buy_qty - sell_qty) * ltp * factor
+
+    and is evaluated over the whole column set at once (NumPy when installed, array('d') otherwise). A fill is
+    the growth of an order's cumulative `fldQty` in the order feed; the quantities already filled when the
+    snapshot was taken are recorded from the order book, so they are not counted twice. A tick only writes the
+    LTP of the rows of its token, then `on_pnl` is called with that token's P&L and the portfolio total. Ticks
+    come from token listeners, which leave the caller's own set_token_handler handlers in place, or from the
+    FeedBatch rows when the client decodes the feed in batch mode.
+
+    Every `reconcile_interval` seconds, and after each order-feed reconnect, the snapshot is reloaded from REST
+    with the current LTPs kept; `last_drift` is how far the local total had moved from the broker's figures.
+    Open rows that have not ticked yet have NaN LTP and are left out of the total and counted in `unpriced`.
+    """
+
+    def __init__(self, client, on_pnl=None, reconcile_interval=60.0):
+        self.client = client
+        self.on_pnl = on_pnl
+        self.reconcile_interval = reconcile_interval
+        self.keys = []
+        self.rows = {}
+        self.details = []
+        self.token_rows = {}
+        self.watched = set()
+        self.fills = {}
+        self.last_drift = 0.0
+        self.reconciled_at = None
+        self.live = False
+        self.running = False
+        self._timer = None
+        self._lock = threading.RLock()
+        for name in POSITION_COLUMNS:
+            setattr(self, name, self.column([]))
+
+    @staticmethod
+    def column(values):
+        if np is not None:
+            return np.array(values, dtype=np.float64)
+        return array('d', values)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def load(self, positions_resp, order_book_resp):
+        """
+        Replace the rows with a `position_init()` snapshot and the fill baseline with an `ordered_books()` response.
+        LTPs already received are kept. Returns the drift of the previous local total from the reloaded one.
+        """
+        rows = positions_resp.get("data") or []
+        with self._lock:
+            previous_total = self.total_pnl() if self.keys else None
+            ltp_by_key = {key: self.ltp[index] for key, index in self.rows.items()}
+            self.keys = [position_key(row) for row in rows]
+            self.rows = {key: index for index, key in enumerate(self.keys)}
+            self.details = [{"trdSym": row.get("trdSym"), "exSeg": row.get("exSeg"), "tok": row.get("tok"),
+                             "prod": row.get("prod")} for row in rows]
+            self.buy_qty = self.column([position_number(row, "flBuyQty", "cfBuyQty") for row in rows])
+            self.sell_qty = self.column([position_number(row, "flSellQty", "cfSellQty") for row in rows])
+            self.buy_amt = self.column([position_number(row, "buyAmt", "cfBuyAmt") for row in rows])
+            self.sell_amt = self.column([position_number(row, "sellAmt", "cfSellAmt") for row in rows])
+            self.factor = self.column([position_factor(row) for row in rows])
+            self.ltp = self.column([ltp_by_key.get(key, float("nan")) for key in self.keys])
+            self.index_tokens()
+            self.fills = {str(item["nOrdNo"]): self.fill_of(item) for item in order_book_resp.get("data") or ()}
+            self.reconciled_at = time.time()
+            if previous_total is not None:
+                self.last_drift = previous_total - self.total_pnl()
+            return self.last_drift
+
+    def index_tokens(self):
+        token_rows = {}
+        for index, (_, token, _) in enumerate(self.keys):
+            token_rows.setdefault(token, []).append(index)
+        if np is not None:
+            token_rows = {token: np.array(indices, dtype=np.intp) for token, indices in token_rows.items()}
+        self.token_rows = token_rows
+
+    @staticmethod
+    def fill_of(item):
+        quantity = position_number(item, "fldQty")
+        return quantity, quantity * position_number(item, "avgPrc")
+
+    def add_row(self, item):
+        key = position_key(item)
+        self.rows[key] = len(self.keys)
+        self.keys.append(key)
+        self.details.append({"trdSym": item.get("trdSym"), "exSeg": item.get("exSeg"), "tok": item.get("tok"),
+                             "prod": item.get("prod")})
+        values = {"factor": position_factor(item), "ltp": float("nan")}
+        for name in POSITION_COLUMNS:
+            current = getattr(self, name)
+            if np is not None:
+                setattr(self, name, np.append(current, values.get(name, 0.0)))
+            else:
+                current.append(values.get(name, 0.0))
+        self.index_tokens()
+        return self.rows[key]
+
+    # Order-feed listener interface, see NeoWebSocket.add_order_feed_listener
+
+    def apply(self, message):
+        """Apply the new fill quantity of an order-feed update and return the affected row, or None."""
+        item = order_feed_item(message)
+        if item is None or not item.get("fldQty"):
+            return None
+        order_id = str(item["nOrdNo"])
+        new_row = False
+        with self._lock:
+            quantity, value = self.fill_of(item)
+            previous_quantity, previous_value = self.fills.get(order_id, (0.0, 0.0))
+            if quantity <= previous_quantity:
+                return None
+            self.fills[order_id] = (quantity, value)
+            index = self.rows.get(position_key(item))
+            if index is None:
+                index = self.add_row(item)
+                new_row = True
+            amount = (value - previous_value) * self.factor[index]
+            if item.get("trnsTp") == "B":
+                self.buy_qty[index] += quantity - previous_quantity
+                self.buy_amt[index] += amount
+            else:
+                self.sell_qty[index] += quantity - previous_quantity
+                self.sell_amt[index] += amount
+        token = str(item.get("tok"))
+        if new_row and self.running:
+            self.watch([index])
+        self.publish(token)
+        return index
+
+    def connected(self):
+        # Fills sent while the order feed was down are lost, so resync from REST off the websocket thread
+        if self.live is False and self.reconciled_at is not None and self.running:
+            threading.Thread(target=self.reconcile, kwargs={"reschedule": False}, daemon=True).start()
+        self.live = True
+
+    def disconnected(self):
+        self.live = False
+
+    def on_tick(self, item):
+        """Token handler: mark the rows of the tick's token to its LTP and publish the P&L."""
+        if isinstance(item, dict):
+            token, price = item.get('tk'), item.get('ltp')
+        else:
+            token, price = item.instrument_token, item.ltp
+        if price in (None, ""):
+            return
+        token = str(token)
+        with self._lock:
+            rows = self.token_rows.get(token)
+            if rows is None:
+                return
+            price = float(price)
+            if np is not None:
+                self.ltp[rows] = price
+            else:
+                for index in rows:
+                    self.ltp[index] = price
+        self.publish(token)
+
+    def on_batch(self, batch):
+        """Batch listener: on_tick for every row of a FeedBatch, as token listeners get no ticks in batch mode."""
+        touched = {}
+        with self._lock:
+            for token, price in zip(batch.tokens, batch.ltp):
+                token = str(token)
+                rows = self.token_rows.get(token)
+                if rows is None or price != price:
+                    continue
+                price = float(price)
+                if np is not None:
+                    self.ltp[rows] = price
+                else:
+                    for index in rows:
+                        self.ltp[index] = price
+                touched[token] = None
+        for token in touched:
+            self.publish(token)
+
+    def pnl_values(self):
+        """P&L of every row, NaN for open rows without an LTP yet."""
+        if np is not None:
+            net = self.buy_qty - self.sell_qty
+            return (self.sell_amt - self.buy_amt) + np.where(net == 0, 0.0, net * self.ltp * self.factor)
+        return [(sell_amt - buy_amt) + (0.0 if buy_qty == sell_qty else (buy_qty - sell_qty) * ltp * factor)
+                for buy_qty, sell_qty, buy_amt, sell_amt, factor, ltp
+                in zip(self.buy_qty, self.sell_qty, self.buy_amt, self.sell_amt, self.factor, self.ltp)]
+
+    @staticmethod
+    def priced_sum(values):
+        if np is not None:
+            return float(np.nansum(values))
+        return sum(value for value in values if value == value)
+
+    def total_pnl(self):
+        with self._lock:
+            return self.priced_sum(self.pnl_values())
+
+    def token_pnl(self, token):
+        with self._lock:
+            rows = self.token_rows.get(str(token))
+            if rows is None:
+                return 0.0
+            values = self.pnl_values()
+            return self.priced_sum([values[index] for index in rows])
+
+    @property
+    def unpriced(self):
+        with self._lock:
+            return sum(1 for buy_qty, sell_qty, ltp in zip(self.buy_qty, self.sell_qty, self.ltp)
+                       if buy_qty != sell_qty and ltp != ltp)
+
+    def publish(self, token):
+        if self.on_pnl is None:
+            return
+        with self._lock:
+            values = self.pnl_values()
+            rows = self.token_rows.get(token)
+            token_pnl = self.priced_sum([values[index] for index in rows]) if rows is not None else 0.0
+            update = {"tk": token, "pnl": token_pnl, "total_pnl": self.priced_sum(values)}
+        self.on_pnl(update)
+
+    def positions(self):
+        """One dict per position with its quantities, amounts, LTP and P&L."""
+        with self._lock:
+            values = self.pnl_values()
+            return [dict(detail, buy_qty=float(self.buy_qty[index]), sell_qty=float(self.sell_qty[index]),
+                         net_qty=float(self.buy_qty[index] - self.sell_qty[index]),
+                         buy_amt=float(self.buy_amt[index]), sell_amt=float(self.sell_amt[index]),
+                         ltp=float(self.ltp[index]), pnl=float(values[index]))
+                    for index, detail in enumerate(self.details)]
+
+    def snapshot(self):
+        """REST snapshot used to (re)load the engine: positions plus the order book for the fill baseline."""
+        positions_resp = self.client._get_api(kotak_api_wn.PositionsAPI).position_init()
+        # Always the blocking API classes: the engine runs on its own threads, also under AsyncNeoAPI whose
+        # verification_order_book is a coroutine
+        cache = self.client.order_book_cache
+        if cache is not None and cache.ready:
+            return positions_resp, cache.order_book()
+        return positions_resp, self.client._get_api(kotak_api_wn.OrderReportAPI).ordered_books()
+
+    def watch(self, indices):
+        """Subscribe the live feed for the rows at `indices` and add on_tick as a token listener for them."""
+        instruments = {}
+        for index in indices:
+            segment, token, _ = self.keys[index]
+            instruments[token] = {"instrument_token": token, "exchange_segment": segment}
+        if not instruments:
+            return
+        self.client.subscribe(instrument_tokens=list(instruments.values()))
+        for token in instruments:
+            self.client.NeoWebSocket.add_token_listener(token, self.on_tick)
+        self.watched.update(instruments)
+
+    def start(self):
+        """Load the snapshot, attach to the order feed and live feed, and schedule reconciliation."""
+        client = self.client
+        if not client.NeoWebSocket:
+            client.NeoWebSocket = kotak_api_wn.NeoWebSocket(client.configuration.edit_sid,
+                                                            client.configuration.edit_token,
+                                                            client.configuration.serverId)
+        client.NeoWebSocket.add_order_feed_listener(self)
+        client.NeoWebSocket.add_batch_listener(self.on_batch)
+        if client.NeoWebSocket.is_hsi_open:
+            self.live = True
+        else:
+            client.subscribe_to_orderfeed()
+        self.load(*self.snapshot())
+        self.running = True
+        self.watch([index for index in range(len(self.keys))
+                    if self.buy_qty[index] != self.sell_qty[index]])
+        self.schedule()
+        return self
+
+    def schedule(self):
+        if self.running and self.reconcile_interval:
+            self._timer = threading.Timer(self.reconcile_interval, self.reconcile)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def reconcile(self, reschedule=True):
+        """Reload from REST to correct drift; a failed download keeps the local state until the next run."""
+        try:
+            known = set(self.keys)
+            self.load(*self.snapshot())
+            if self.running:
+                self.watch([index for index, key in enumerate(self.keys) if key not in known])
+        except Exception as e:
+            if self.client.on_error:
+                self.client.on_error(e)
+        finally:
+            if reschedule:
+                self.schedule()
+
+    def stop(self):
+        self.running = False
+        if self._timer is not None:
+            self._timer.cancel()
+        socket = self.client.NeoWebSocket
+        if socket is not None:
+            socket.remove_order_feed_listener(self)
+            socket.remove_batch_listener(self.on_batch)
+            for token in self.watched:
+                socket.remove_token_listener(token, self.on_tick)
+        self.watched.clear()
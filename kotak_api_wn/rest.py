@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 
+import asyncio
 import logging
 import re
 from six.moves.urllib.parse import urlencode
@@ -21,6 +22,11 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
 
 class RESTClientObject(object):
     """REST API Client with connection pooling and optimized performance.
@@ -122,3 +128,114 @@ class RESTClientObject(object):
             self.session.close()
 
 
+class AsyncResponse(object):
+    """A fully read aiohttp response exposing the parts of `requests.Response` the API classes use."""
+
+    def __init__(self, status_code, text, headers):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    def json(self):
+        return json_loads(self.text)
+
+
+class AsyncRESTClientObject(object):
+    """asyncio counterpart of RESTClientObject on a pooled aiohttp session.
+
+    Requests are built exactly as RESTClientObject builds them and retried on the same
+    status codes, so the async API classes can share the request construction of their
+    synchronous counterparts.
+
+    Attributes:
+        configuration (dict): configuration for the API client
+        session (aiohttp.ClientSession): shared session, created on first use inside the running loop
+    """
+
+    RETRIES = 3
+    BACKOFF_FACTOR = 0.1
+    RETRY_STATUSES = frozenset([500, 502, 503, 504])
+
+    def __init__(self, configuration, pool_maxsize=20):
+        """
+        Initialize the API client with a configuration dictionary.
+
+        :param configuration: dictionary of configuration parameters
+        :param pool_maxsize: maximum number of simultaneous connections in the pool
+        """
+        if aiohttp is None:
+            raise ImportError("AsyncRESTClientObject requires aiohttp. Install with: pip install kotak_api_wn[async]")
+        self.configuration = configuration
+        self.pool_maxsize = pool_maxsize
+        self.session = None
+        self._json_pattern = re.compile(r'json', re.IGNORECASE)
+        self._form_pattern = re.compile(r'x-www-form-urlencoded', re.IGNORECASE)
+
+    def get_session(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_maxsize))
+        return self.session
+
+    async def request(self, method, url, query_params=None, headers=None,
+                      body=None):
+        """Perform a request to the REST API on the shared session.
+
+        :param method: HTTP request method (e.g. GET, POST, PUT)
+        :param url: URL for the API endpoint
+        :param query_params: (optional) query parameters for the API endpoint
+        :param headers: (optional) headers for the API request
+        :param body: (optional) request body for the API request
+        :return: AsyncResponse with the status, headers and body text
+        :raises: ApiException in case of a request error
+        """
+        method = method.upper()
+        assert method in ['GET', 'HEAD', 'DELETE', 'POST', 'PUT',
+                          'PATCH', 'OPTIONS']
+
+        headers = headers or {}
+
+        if 'Content-Type' not in headers:
+            headers['Content-Type'] = 'application/json'
+
+        if query_params:
+            url = f"{url}?{urlencode(query_params)}"
+
+        if method in ['POST', 'PUT', 'PATCH', 'DELETE']:
+            # RESTClientObject sends every body-carrying method as a POST
+            method = 'POST'
+            if self._json_pattern.search(headers['Content-Type']):
+                request_body = json_dumps(body) if body is not None else None
+            elif self._form_pattern.search(headers['Content-Type']):
+                request_body = {"jData": json_dumps(body)} if body is not None else {}
+            else:
+                msg = """In-Valid Content-Type in the Header Parameters"""
+                raise ApiException(status=0, reason=msg)
+        elif method == 'GET':
+            request_body = None
+        else:
+            msg = """Cannot call the API with the provided HTTP Method"""
+            raise ApiException(status=0, reason=msg)
+
+        attempt = 0
+        while True:
+            try:
+                async with self.get_session().request(method, url, headers=headers, data=request_body) as response:
+                    text = await response.text()
+                    if response.status not in self.RETRY_STATUSES or attempt >= self.RETRIES:
+                        return AsyncResponse(response.status, text, response.headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.RETRIES:
+                    msg = "{0}\n{1}".format(type(e).__name__, str(e))
+                    raise ApiException(status=0, reason=msg)
+            await asyncio.sleep(self.BACKOFF_FACTOR * (2 ** attempt))
+            attempt += 1
+
+    async def close(self):
+        """Close the session and release connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
@@ -0,0 +1,207 @@
+import datetime
+import io
+import os
+import shutil
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+import requests
+
+import kotak_api_wn
+from kotak_api_wn.exceptions import ApiException
+from kotak_api_wn.instrument_index import InstrumentIndex
+
+# Try to use orjson for faster JSON serialization
+try:
+    import orjson
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode('utf-8')
+    json_loads = orjson.loads
+except ImportError:
+    import json
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+IST = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+# The exchanges publish the next day's contracts overnight; before this time of day (IST) the cached files
+# still belong to the previous trading day
+SCRIP_MASTER_ROLLOVER = datetime.timedelta(hours=8, minutes=30)
+SCRIP_MASTER_CACHE_ENV = "KOTAK_API_WN_CACHE_DIR"
+DOWNLOAD_TIMEOUT = 120
+
+
+def default_cache_dir():
+    root = os.environ.get(SCRIP_MASTER_CACHE_ENV) or os.path.join(os.path.expanduser("~"), ".cache", "kotak_api_wn")
+    return os.path.join(root, "scrip_master")
+
+
+def trading_day(now=None):
+    """The trading day the scrip master files published at `now` belong to, as YYYY-MM-DD."""
+    now = now or datetime.datetime.now(IST)
+    return (now.astimezone(IST) - SCRIP_MASTER_ROLLOVER).date().isoformat()
+
+
+def read_scrip_csv(csv_text):
+    """Parse a scrip master CSV exactly as ScripSearch always has."""
+    df = pd.read_csv(io.StringIO(csv_text))
+    return df.rename(columns=lambda x: x.strip())
+
+
+class ScripMasterStore:
+    """
+    Scrip master segment files downloaded once per trading day and kept on disk as one .npy file per column.
+
+    A segment is stored in `<cache_dir>/<segment>/<version>/`: numeric columns are plain .npy arrays that are
+    memory-mapped on load, string columns are fixed-width unicode arrays with a null mask, and anything else is
+    pickled. `<cache_dir>/<segment>/manifest.json` names the current version with its trading day, source URL
+    and the ETag / Last-Modified validators of the download. The manifest is replaced atomically, so concurrent
+    processes either see the old or the new version.
+
+    When the trading day rolls over the file paths are fetched again; if the URL is unchanged, a conditional GET
+    answered with 304 only restamps the manifest. Loaded frames, and the InstrumentIndex built over each, are
+    also kept in memory for the trading day; callers must not modify them in place.
+    """
+    MANIFEST = "manifest.json"
+
+    def __init__(self, api_client, cache_dir=None):
+        self.api_client = api_client
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.frames = {}
+        self.indexes = {}
+        self._lock = threading.Lock()
+
+    def segment_dir(self, exchange_segment):
+        return os.path.join(self.cache_dir, exchange_segment.lower())
+
+    def read_manifest(self, exchange_segment):
+        try:
+            with open(os.path.join(self.segment_dir(exchange_segment), self.MANIFEST), "rb") as f:
+                return json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def write_manifest(self, exchange_segment, manifest):
+        directory = self.segment_dir(exchange_segment)
+        fd, path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(json_dumps(manifest))
+        os.replace(path, os.path.join(directory, self.MANIFEST))
+
+    def frame(self, exchange_segment):
+        """The scrip master DataFrame of `exchange_segment` (e.g. "nse_fo") for the current trading day."""
+        day = trading_day()
+        cached = self.frames.get(exchange_segment)
+        if cached is not None and cached[0] == day:
+            return cached[1]
+        with self._lock:
+            cached = self.frames.get(exchange_segment)
+            if cached is not None and cached[0] == day:
+                return cached[1]
+            manifest = self.read_manifest(exchange_segment)
+            if manifest is None or manifest.get("trading_day") != day:
+                manifest = self.refresh(exchange_segment, manifest, day)
+            df = self.load(exchange_segment, manifest)
+            self.frames[exchange_segment] = (day, df)
+            return df
+
+    def index(self, exchange_segment):
+        """The InstrumentIndex of the segment's current frame, built once per trading day."""
+        df = self.frame(exchange_segment)
+        cached = self.indexes.get(exchange_segment)
+        if cached is not None and cached[0] is df:
+            return cached[1]
+        index = InstrumentIndex(df, exchange_segment)
+        self.indexes[exchange_segment] = (df, index)
+        return index
+
+    def segment_url(self, exchange_segment):
+        """URL of the segment's CSV from the scrip master file paths, matched as ScripSearch always has."""
+        scrip_report = kotak_api_wn.ScripMasterAPI(self.api_client).scrip_master_init()
+        if "filesPaths" not in scrip_report:
+            raise ApiException(status=0, reason="Scrip master file paths are not available: " + str(scrip_report))
+        return [file for file in scrip_report["filesPaths"] if exchange_segment.lower() in file.lower()][0]
+
+    def refresh(self, exchange_segment, manifest, day):
+        """Download the segment unless the server confirms the cached copy is current, and return the manifest."""
+        url = self.segment_url(exchange_segment)
+        headers = {}
+        if manifest is not None and manifest.get("url") == url:
+            if manifest.get("etag"):
+                headers["If-None-Match"] = manifest["etag"]
+            if manifest.get("last_modified"):
+                headers["If-Modified-Since"] = manifest["last_modified"]
+        session = getattr(self.api_client.rest_client, "session", None)
+        if not isinstance(session, requests.Session):
+            session = requests
+        response = session.get(url, headers=headers, timeout=DOWNLOAD_TIMEOUT)
+        os.makedirs(self.segment_dir(exchange_segment), exist_ok=True)
+        if response.status_code == 304 and headers:
+            manifest = dict(manifest, trading_day=day)
+            self.write_manifest(exchange_segment, manifest)
+            return manifest
+        response.raise_for_status()
+        version = self.save(exchange_segment, read_scrip_csv(response.text), day)
+        manifest = dict(version, trading_day=day, url=url, etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"))
+        previous = self.read_manifest(exchange_segment)
+        self.write_manifest(exchange_segment, manifest)
+        if previous and previous.get("version") and previous["version"] != manifest["version"]:
+            # Another process may still have the old version mapped; removal is best effort
+            shutil.rmtree(os.path.join(self.segment_dir(exchange_segment), previous["version"]), ignore_errors=True)
+        return manifest
+
+    def save(self, exchange_segment, df, day):
+        """Write `df` column by column into a new version directory and describe it."""
+        directory = tempfile.mkdtemp(prefix=day + "-", dir=self.segment_dir(exchange_segment))
+        columns = []
+        for index, name in enumerate(df.columns):
+            series = df[name]
+            values = series.to_numpy()
+            path = os.path.join(directory, str(index))
+            if values.dtype != object:
+                np.save(path + ".npy", values, allow_pickle=False)
+                kind = "array"
+            else:
+                missing = pd.isna(values)
+                if all(isinstance(value, str) for value in values[~missing]):
+                    np.save(path + ".npy", np.where(missing, "", values).astype(str), allow_pickle=False)
+                    np.save(path + ".mask.npy", missing, allow_pickle=False)
+                    kind = "str"
+                else:
+                    np.save(path + ".npy", values, allow_pickle=True)
+                    kind = "object"
+            columns.append({"name": name, "kind": kind, "dtype": str(series.dtype)})
+        return {"version": os.path.basename(directory), "rows": len(df), "columns": columns}
+
+    def load(self, exchange_segment, manifest):
+        directory = os.path.join(self.segment_dir(exchange_segment), manifest["version"])
+        data = {}
+        for index, column in enumerate(manifest["columns"]):
+            path = os.path.join(directory, str(index))
+            if column["kind"] == "array":
+                data[column["name"]] = np.load(path + ".npy", mmap_mode="r")
+                continue
+            if column["kind"] == "str":
+                values = np.load(path + ".npy", mmap_mode="r").astype(object)
+                values[np.load(path + ".mask.npy")] = np.nan
+            else:
+                values = np.load(path + ".npy", allow_pickle=True)
+            series = pd.Series(values, dtype=object)
+            if column["dtype"] != "object":
+                series = series.astype(column["dtype"])
+            data[column["name"]] = series
+        return pd.DataFrame(data, copy=False)
+
+    def clear(self, exchange_segment=None):
+        """Drop the in-memory and on-disk copies of one segment, or of every segment."""
+        with self._lock:
+            if exchange_segment is None:
+                self.frames.clear()
+                self.indexes.clear()
+                shutil.rmtree(self.cache_dir, ignore_errors=True)
+            else:
+                self.frames.pop(exchange_segment, None)
+                self.indexes.pop(exchange_segment, None)
+                shutil.rmtree(self.segment_dir(exchange_segment), ignore_errors=True)
@@ -174,5 +174,12 @@ help_functions = {
     13: 'help("search_scrip")',
     14: 'help("order_report")',
     15: 'help("subscribe_to_orderfeed")',
-    16: 'help()'
+    16: 'help("place_orders")',
+    17: 'help("cancel_orders")',
+    18: 'help("cancel_all")',
+    19: 'help("enable_order_book_cache")',
+    20: 'help("order_status")',
+    21: 'help("start_positions_engine")',
+    22: 'help("option_chain")',
+    23: 'help()'
 }
@@ -0,0 +1,166 @@
+import bisect
+import hashlib
+import threading
+from functools import partial
+
+from kotak_api_wn.NeoWebSocket import NeoWebSocket
+from kotak_api_wn.settings import ReqTypeValues
+from kotak_api_wn.subscription_registry import SubscriptionRegistry
+
+
+class ShardedNeoWebSocket:
+    """
+    Live feed spread over several HSM connections, each with its own 3000-subscription budget.
+
+    Every shard is a `NeoWebSocket` with its own socket, opened the first time a subscription is
+    routed to it. Instruments are placed on a consistent-hash ring keyed by `segment|token`, so a
+    given instrument always prefers the same shard and adding shards moves only a fraction of them;
+    when the preferred shard is full the next shard on the ring takes it. Callbacks from all shards
+    are serialised under one lock, so `on_message` sees a single stream in arrival order.
+    """
+    VIRTUAL_NODES = 160
+
+    @staticmethod
+    def ring_point(name):
+        return int.from_bytes(hashlib.md5(name.encode()).digest()[:8], 'big')
+
+    def __init__(self, sid, token, server_id, max_connections=4, decoder=None, output_mode=None,
+                 epoch_dates=False, tick_objects=False):
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        self.on_message = None
+        self.on_error = None
+        self.on_close = None
+        self.on_open = None
+        self.on_batch = None
+        self.lock = threading.RLock()
+        self.shards = [NeoWebSocket(sid, token, server_id, decoder=decoder, output_mode=output_mode,
+                                    epoch_dates=epoch_dates, tick_objects=tick_objects)
+                       for _ in range(max_connections)]
+        for shard in self.shards:
+            shard.on_message = partial(self.emit, "on_message")
+            shard.on_error = partial(self.emit, "on_error")
+            shard.on_close = partial(self.emit, "on_close")
+            shard.on_open = partial(self.emit, "on_open")
+        self.ring, self.ring_orders = self.build_ring(max_connections)
+
+    @classmethod
+    def build_ring(cls, shard_count):
+        """Hash ring points and, for each point, every shard index in the order the ring visits them."""
+        points = sorted((cls.ring_point("shard-" + str(shard) + "#" + str(node)), shard)
+                        for shard in range(shard_count) for node in range(cls.VIRTUAL_NODES))
+        ring = [point for point, _ in points]
+        orders = []
+        for start in range(len(points)):
+            order = []
+            for offset in range(len(points)):
+                shard = points[(start + offset) % len(points)][1]
+                if shard not in order:
+                    order.append(shard)
+                    if len(order) == shard_count:
+                        break
+            orders.append(tuple(order))
+        return ring, orders
+
+    def shard_order(self, exchange_segment, instrument_token):
+        """Shard indices for an instrument, preferred shard first."""
+        point = self.ring_point(str(exchange_segment) + "|" + str(instrument_token))
+        return self.ring_orders[bisect.bisect(self.ring, point) % len(self.ring)]
+
+    def emit(self, callback_name, *args):
+        callback = getattr(self, callback_name)
+        if callback:
+            with self.lock:
+                callback(*args)
+
+    def emit_to(self, handler, *args):
+        with self.lock:
+            handler(*args)
+
+    def __len__(self):
+        return sum(len(shard.subscriptions) for shard in self.shards)
+
+    @property
+    def capacity(self):
+        return len(self.shards) * SubscriptionRegistry.MAX_SUBSCRIPTIONS
+
+    @property
+    def connections(self):
+        """Shards that currently hold at least one subscription."""
+        return [shard for shard in self.shards if len(shard.subscriptions)]
+
+    def find_shard(self, key):
+        """The shard already subscribed to registry `key`, or None."""
+        for index in self.shard_order(key[0], key[1]):
+            if key in self.shards[index].subscriptions:
+                return self.shards[index]
+        return None
+
+    def get_live_feed(self, instrument_tokens, isIndex=False, isDepth=False):
+        if not self.shards[0].input_validation(instrument_tokens):
+            self.emit("on_error", Exception("Invalid Inputs"))
+            return
+        subscription_type = ReqTypeValues.get("SCRIP_SUBS")
+        if isIndex:
+            subscription_type = ReqTypeValues.get("INDEX_SUBS")
+        if isDepth:
+            subscription_type = ReqTypeValues.get("DEPTH_SUBS")
+
+        budgets = [SubscriptionRegistry.MAX_SUBSCRIPTIONS - len(shard.subscriptions) for shard in self.shards]
+        placed = {}
+        rejected = []
+        seen = set()
+        for item in instrument_tokens:
+            key = (item['exchange_segment'], item['instrument_token'], subscription_type)
+            order = self.shard_order(key[0], key[1])
+            if key in seen or any(key in self.shards[index].subscriptions for index in order):
+                continue
+            seen.add(key)
+            for index in order:
+                if budgets[index] > 0:
+                    budgets[index] -= 1
+                    placed.setdefault(index, []).append(item)
+                    break
+            else:
+                rejected.append(item)
+
+        if self.on_batch:
+            for shard in self.shards:
+                shard.on_batch = partial(self.emit, "on_batch")
+        for index, items in placed.items():
+            self.shards[index].get_live_feed(items, isIndex, isDepth)
+        if rejected:
+            self.emit("on_error", Exception("Subscription limit of " + str(self.capacity) + " reached across " +
+                                            str(len(self.shards)) + " connections, " + str(len(rejected)) +
+                                            " tokens were not subscribed"))
+
+    def un_subscribe_list(self, instrument_tokens, isIndex=False, isDepth=False):
+        if not self.shards[0].input_validation(instrument_tokens):
+            return
+        subscription_type = ReqTypeValues.get("SCRIP_SUBS")
+        if isIndex:
+            subscription_type = ReqTypeValues.get("INDEX_SUBS")
+        if isDepth:
+            subscription_type = ReqTypeValues.get("DEPTH_SUBS")
+
+        grouped = {}
+        for item in instrument_tokens:
+            shard = self.find_shard((item['exchange_segment'], item['instrument_token'], subscription_type))
+            if shard is None:
+                print("The Given Token is not in Subscription list")
+            else:
+                grouped.setdefault(id(shard), (shard, []))[1].append(item)
+        for shard, items in grouped.values():
+            shard.un_subscribe_list(items, isIndex, isDepth)
+
+    def get_quotes(self, instrument_tokens, quote_type=None, isIndex=None):
+        # Snapshots are one-off, so reuse a connection that is already open rather than opening another
+        shard = next((shard for shard in self.shards if shard.is_hsw_open == 1), self.shards[0])
+        shard.get_quotes(instrument_tokens, quote_type, isIndex)
+
+    def set_token_handler(self, instrument_token, handler):
+        """Route feed items for `instrument_token` to `handler(item)` on whichever shard carries it."""
+        if handler is not None:
+            handler = partial(self.emit_to, handler)
+        for shard in self.shards:
+            shard.set_token_handler(instrument_token, handler)
@@ -0,0 +1,107 @@
+class SubscriptionRegistry:
+    """
+    Live feed subscriptions keyed by (exchange_segment, instrument_token, subscription_type).
+
+    Every subscription is assigned to one of the HSM channels 2-16 (200 scrips each, lowest
+    channel with room first), and a reverse index from channel to its members keeps subscribe,
+    unsubscribe and membership checks O(1) instead of scanning a list of up to 3000 dicts.
+    Values are the `{'instrument_token', 'exchange_segment', 'subscription_type'}` dicts the
+    websocket layer sends, stored as given.
+
+    `tokens` is a frozenset of the subscribed tokens as strings (the form they arrive in on the
+    feed). It is rebuilt at most once after a run of changes, so the per-frame filter is a plain
+    set lookup against an immutable snapshot that is safe to read from the websocket thread.
+    """
+    CHANNELS = range(2, 17)
+    CHANNEL_CAPACITY = 200
+    MAX_SUBSCRIPTIONS = 3000
+
+    def __init__(self):
+        self._entries = {}
+        self._channels = {channel: {} for channel in self.CHANNELS}
+        self._token_counts = {}
+        self._tokens = frozenset()
+
+    @staticmethod
+    def key_of(value):
+        return value['exchange_segment'], value['instrument_token'], value['subscription_type']
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def _free_channel(self):
+        for channel, members in self._channels.items():
+            if len(members) < self.CHANNEL_CAPACITY:
+                return channel
+        return None
+
+    def add(self, value):
+        """Register `value` and return its channel, or None if it is already subscribed or every channel is full."""
+        key = self.key_of(value)
+        if key in self._entries:
+            return None
+        channel = self._free_channel()
+        if channel is None:
+            return None
+        self._entries[key] = channel
+        self._channels[channel][key] = value
+        token = str(value['instrument_token'])
+        count = self._token_counts.get(token, 0)
+        self._token_counts[token] = count + 1
+        if not count:
+            self._tokens = None
+        return channel
+
+    def remove(self, key):
+        """Drop the subscription for `key` and return the channel it was on, or None if it was not subscribed."""
+        channel = self._entries.pop(key, None)
+        if channel is None:
+            return None
+        del self._channels[channel][key]
+        token = str(key[1])
+        count = self._token_counts[token] - 1
+        if count:
+            self._token_counts[token] = count
+        else:
+            del self._token_counts[token]
+            self._tokens = None
+        return channel
+
+    def clear(self):
+        self._entries.clear()
+        for members in self._channels.values():
+            members.clear()
+        self._token_counts.clear()
+        self._tokens = frozenset()
+
+    def channel_of(self, key):
+        return self._entries.get(key)
+
+    @property
+    def tokens(self):
+        tokens = self._tokens
+        if tokens is None:
+            tokens = self._tokens = frozenset(self._token_counts)
+        return tokens
+
+    def has_token(self, token):
+        """True if any segment/subscription type is subscribed for `token`."""
+        return str(token) in self.tokens
+
+    def channel_members(self, channel):
+        """Values subscribed on `channel`, in subscription order."""
+        return list(self._channels[channel].values())
+
+    def channel_tokens(self):
+        """Non-empty channels mapped to their subscribed values."""
+        return {channel: list(members.values()) for channel, members in self._channels.items() if members}
+
+    def values(self):
+        for members in self._channels.values():
+            yield from members.values()
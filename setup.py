@@ -48,12 +48,14 @@ setup(
     extras_require={
         'fast': [
             'orjson>=3.8.0',  # 3-10x faster JSON serialization
+            'numpy>=1.21.0',  # Vectorized market-data frame decoding
         ],
         'async': [
             'aiohttp>=3.8.0',  # Async HTTP support
         ],
         'all': [
             'orjson>=3.8.0',
+            'numpy>=1.21.0',
             'aiohttp>=3.8.0',
         ],
         'dev': [